@@ -0,0 +1,48 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerAccountBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_code', models.CharField(max_length=20, unique=True)),
+                ('debit_total', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('credit_total', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerBalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_code', models.CharField(max_length=20)),
+                ('as_of', models.DateTimeField()),
+                ('debit_total', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('credit_total', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['account_code', 'created_at'], name='ledger_ledg_account_39f1ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerbalancecheckpoint',
+            index=models.Index(fields=['account_code', '-as_of'], name='ledger_ledg_account_bc0367_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ledgerbalancecheckpoint',
+            unique_together={('account_code', 'as_of')},
+        ),
+    ]
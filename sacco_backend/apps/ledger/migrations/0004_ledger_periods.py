@@ -0,0 +1,43 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ledger', '0003_account_balances'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('closed_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['start_date'],
+                'unique_together': {('start_date', 'end_date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerPeriodBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_code', models.CharField(max_length=20)),
+                ('debit_total', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('credit_total', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='ledger.ledgerperiod')),
+            ],
+            options={
+                'unique_together': {('period', 'account_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0004_ledger_periods'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledgerentry',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, max_digits=15),
+        ),
+    ]
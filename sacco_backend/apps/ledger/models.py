@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 from apps.transactions.models import Transaction
@@ -13,9 +14,73 @@ class LedgerEntry(models.Model):
     account_code = models.CharField(max_length=20)
     entry_type = models.CharField(max_length=10, choices=ENTRY_TYPES)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=15, decimal_places=2)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['account_code', 'created_at'])
+        ]
+
+    def __str__(self):
+        return f"{self.transaction.transaction_ref} - {self.entry_type}"
+
+
+class LedgerAccountBalance(models.Model):
+    """Running totals per account, updated in the same transaction as the entries."""
+    account_code = models.CharField(max_length=20, unique=True)
+    debit_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    credit_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.account_code} - {self.balance}"
+
+
+class LedgerBalanceCheckpoint(models.Model):
+    """Cumulative account totals for all entries created before `as_of`."""
+    account_code = models.CharField(max_length=20)
+    as_of = models.DateTimeField()
+    debit_total = models.DecimalField(max_digits=15, decimal_places=2)
+    credit_total = models.DecimalField(max_digits=15, decimal_places=2)
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['account_code', 'as_of']
+        indexes = [
+            models.Index(fields=['account_code', '-as_of'])
+        ]
+
+    def __str__(self):
+        return f"{self.account_code} @ {self.as_of} - {self.balance}"
+
+
+class LedgerPeriod(models.Model):
+    """A closed accounting period whose per-account totals are frozen in LedgerPeriodBalance."""
+    start_date = models.DateField()
+    end_date = models.DateField()
+    closed_at = models.DateTimeField(auto_now_add=True)
+    closed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+
+    class Meta:
+        ordering = ['start_date']
+        unique_together = ['start_date', 'end_date']
+
+    def __str__(self):
+        return f"{self.start_date} - {self.end_date}"
+
+
+class LedgerPeriodBalance(models.Model):
+    period = models.ForeignKey(LedgerPeriod, on_delete=models.CASCADE, related_name='balances')
+    account_code = models.CharField(max_length=20)
+    debit_total = models.DecimalField(max_digits=15, decimal_places=2)
+    credit_total = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        unique_together = ['period', 'account_code']
+
     def __str__(self):
-        return f"{self.transaction.transaction_ref} - {self.entry_type}"
\ No newline at end of file
+        return f"{self.period} - {self.account_code}"
@@ -0,0 +1,9 @@
+# apps/ledger/tasks.py
+from celery import shared_task
+
+from shared.services.ledger_service import LedgerService
+
+
+@shared_task
+def create_ledger_balance_checkpoints():
+    return LedgerService.create_balance_checkpoints()
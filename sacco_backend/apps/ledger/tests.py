@@ -1,12 +1,13 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from decimal import Decimal
-from datetime import date
+from datetime import date, timedelta
 
 from apps.authentication.models import Role
 from apps.members.models import Member
 from apps.transactions.models import Transaction
-from apps.ledger.models import LedgerEntry
+from apps.ledger.models import LedgerEntry, LedgerAccountBalance, LedgerBalanceCheckpoint
 from shared.services.ledger_service import LedgerService
 
 User = get_user_model()
@@ -128,4 +129,100 @@ class LedgerEntryModelTest(TestCase):
         # Verify FEE credit entry
         fee_entry = entries.get(account_code=LedgerService.ACCOUNT_CODES['FEES_INCOME'])
         self.assertEqual(fee_entry.entry_type, 'CREDIT')
-        self.assertEqual(fee_entry.amount, Decimal('1000'))
\ No newline at end of file
+        self.assertEqual(fee_entry.amount, Decimal('1000'))
+
+    def test_running_balance_maintained_by_entry_writers(self):
+        transaction = Transaction.objects.create(
+            transaction_ref='TXN20240101003',
+            member=self.member,
+            transaction_type='WITHDRAWAL',
+            amount=Decimal('20000'),
+            payment_method='CASH',
+            status='COMPLETED'
+        )
+
+        LedgerService.create_withdrawal_entries(transaction, Decimal('500'))
+
+        # Seeded from the two entries created in setUp, then updated by the posting
+        balance = LedgerAccountBalance.objects.get(account_code=LedgerService.ACCOUNT_CODES['CASH'])
+        self.assertEqual(balance.balance, Decimal('80000'))
+        self.assertEqual(LedgerService.get_account_balance('1000'), Decimal('80000'))
+        self.assertEqual(LedgerService.get_account_balance('2000'), Decimal('-79500'))
+
+        savings_entry = LedgerEntry.objects.get(
+            transaction=transaction,
+            account_code=LedgerService.ACCOUNT_CODES['SAVINGS']
+        )
+        self.assertEqual(savings_entry.balance_after, Decimal('-79500'))
+
+    def test_get_account_balance_as_of_date_uses_checkpoint(self):
+        LedgerService.create_balance_checkpoints(timezone.now() + timedelta(seconds=1))
+        LedgerEntry.objects.filter(pk=self.debit_entry.pk).delete()
+
+        # Entries removed after the checkpoint no longer affect the as-of balance
+        balance = LedgerService.get_account_balance('1000', timezone.localdate() + timedelta(days=1))
+        self.assertEqual(balance, Decimal('100000'))
+        self.assertEqual(
+            LedgerBalanceCheckpoint.objects.filter(account_code='2000').get().balance,
+            Decimal('-100000')
+        )
+
+    def test_generate_trial_balance(self):
+        today = timezone.localdate()
+        trial_balance = LedgerService.generate_trial_balance(today, today)
+
+        accounts = {account['account_code']: account for account in trial_balance['accounts']}
+        self.assertEqual(accounts['1000']['account_name'], 'CASH')
+        self.assertEqual(accounts['1000']['debit_total'], Decimal('100000'))
+        self.assertEqual(accounts['2000']['credit_total'], Decimal('100000'))
+        self.assertEqual(trial_balance['totals']['net_balance'], Decimal('0'))
+
+    def test_trial_balance_reuses_closed_period_totals(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        LedgerEntry.objects.update(created_at=timezone.now() - timedelta(days=1))
+        period = LedgerService.close_period(today - timedelta(days=30), yesterday, closed_by=self.user)
+        self.assertEqual(period.balances.count(), 2)
+
+        with self.assertRaises(ValueError):
+            LedgerService.close_period(yesterday, yesterday)
+        # Today and later are still open for posting
+        with self.assertRaises(ValueError):
+            LedgerService.close_period(today, today + timedelta(days=1))
+
+        # Closed totals are frozen, so the period is read from the snapshot rather than the raw entries
+        LedgerEntry.objects.filter(pk=self.credit_entry.pk).update(amount=Decimal('1'))
+        trial_balance = LedgerService.generate_trial_balance(today - timedelta(days=365), today)
+
+        self.assertEqual(trial_balance['totals']['total_debits'], Decimal('100000'))
+        self.assertEqual(trial_balance['totals']['total_credits'], Decimal('100000'))
+
+    def test_post_journal_rejects_unbalanced_lines(self):
+        with self.assertRaises(ValueError):
+            LedgerService.post_journal([
+                {
+                    'transaction': self.transaction,
+                    'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                    'entry_type': 'DEBIT',
+                    'amount': Decimal('500'),
+                    'description': 'Unbalanced'
+                }
+            ])
+        self.assertEqual(LedgerEntry.objects.count(), 2)
+
+    def test_post_journal_writes_all_lines_in_one_insert(self):
+        transaction = Transaction.objects.create(
+            transaction_ref='TXN20240101004',
+            member=self.member,
+            transaction_type='DEPOSIT',
+            amount=Decimal('10000'),
+            payment_method='CASH',
+            status='COMPLETED'
+        )
+        LedgerService.create_deposit_entries(transaction, Decimal('100'))
+
+        # Lock balances, update balances, insert entries
+        with self.assertNumQueries(3):
+            LedgerService.create_deposit_entries(transaction, Decimal('100'))
+
+        self.assertEqual(LedgerService.get_account_balance('1000'), Decimal('120000'))
@@ -1,3 +1,4 @@
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -37,13 +38,43 @@ class LedgerEntryViewSet(viewsets.ModelViewSet):
         if not account_code:
             return Response({'error': 'Account code is required'}, status=400)
 
-        balance = LedgerService.get_account_balance(account_code)
+        as_of_date = request.query_params.get('as_of_date')
+        if as_of_date:
+            as_of_date = parse_date(as_of_date)
+            if not as_of_date:
+                return Response({'error': 'Invalid as_of_date, expected YYYY-MM-DD'}, status=400)
+
+        balance = LedgerService.get_account_balance(account_code, as_of_date)
         return Response({'balance': balance})
 
     @action(detail=False, methods=['get'])
     def trial_balance(self, request):
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        start_date = parse_date(request.query_params.get('start_date') or '')
+        end_date = parse_date(request.query_params.get('end_date') or '')
+        if not start_date or not end_date:
+            return Response({'error': 'start_date and end_date are required (YYYY-MM-DD)'}, status=400)
 
         trial_balance = LedgerService.generate_trial_balance(start_date, end_date)
         return Response(trial_balance)
+
+    @action(detail=False, methods=['post'])
+    def close_period(self, request):
+        if request.user.role.name not in ['ACCOUNTANT', 'ADMIN']:
+            return Response({'error': 'Not allowed to close ledger periods'}, status=403)
+
+        start_date = parse_date(request.data.get('start_date') or '')
+        end_date = parse_date(request.data.get('end_date') or '')
+        if not start_date or not end_date:
+            return Response({'error': 'start_date and end_date are required (YYYY-MM-DD)'}, status=400)
+
+        try:
+            period = LedgerService.close_period(start_date, end_date, closed_by=request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        return Response({
+            'id': period.id,
+            'start_date': period.start_date,
+            'end_date': period.end_date,
+            'closed_at': period.closed_at
+        }, status=201)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='repayment_method',
+            field=models.CharField(choices=[('DECLINING_BALANCE', 'Declining Balance'), ('FLAT_RATE', 'Flat Rate'), ('INTEREST_ONLY', 'Interest Only')], default='DECLINING_BALANCE', max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0005_repayment_allocation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanrepayment',
+            index=models.Index(fields=['status', 'due_date'], name='loans_loanr_status_16414b_idx'),
+        ),
+    ]
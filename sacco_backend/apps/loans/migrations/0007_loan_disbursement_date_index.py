@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0006_repayment_status_due_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['disbursement_date'], name='loans_loan_disburs_33922a_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0007_loan_disbursement_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loandisbursementbatch',
+            name='skipped_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
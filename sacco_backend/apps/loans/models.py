@@ -15,6 +15,12 @@ class Loan(models.Model):
         ('DEFAULTED', 'Defaulted')
     ]
 
+    REPAYMENT_METHOD_CHOICES = [
+        ('DECLINING_BALANCE', 'Declining Balance'),
+        ('FLAT_RATE', 'Flat Rate'),
+        ('INTEREST_ONLY', 'Interest Only')
+    ]
+
     reference = models.CharField(max_length=50, unique=True)
     disbursement_transaction = models.OneToOneField(
         'transactions.Transaction',
@@ -27,6 +33,7 @@ class Loan(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     interest_rate = models.DecimalField(max_digits=5, decimal_places=2)
     term_months = models.IntegerField()
+    repayment_method = models.CharField(max_length=20, choices=REPAYMENT_METHOD_CHOICES, default='DECLINING_BALANCE')
     status = models.CharField(max_length=20, choices=LOAN_STATUS_CHOICES)
     application_date = models.DateTimeField(auto_now_add=True)
     approval_date = models.DateTimeField(null=True)
@@ -40,6 +47,9 @@ class Loan(models.Model):
 
     class Meta:
         ordering = ['-application_date']
+        indexes = [
+            models.Index(fields=['disbursement_date'])
+        ]
 
     def __str__(self):
         return f'{self.loan_type} - {self.amount}'
@@ -77,9 +87,13 @@ class LoanRepayment(models.Model):
     PAYMENT_STATUS = [
         ('PENDING', 'Pending'),
         ('PROCESSING', 'Processing'),
+        ('PARTIAL', 'Partially Paid'),
+        ('PAID', 'Paid'),
+        ('OVERDUE', 'Overdue'),
         ('COMPLETED', 'Completed'),
         ('FAILED', 'Failed')
     ]
+    OPEN_STATUSES = ['PENDING', 'PARTIAL', 'OVERDUE']
 
     loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='repayments')
     transaction = models.OneToOneField(
@@ -94,6 +108,9 @@ class LoanRepayment(models.Model):
     principal_component = models.DecimalField(max_digits=12, decimal_places=2)
     interest_component = models.DecimalField(max_digits=12, decimal_places=2)
     penalty_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    principal_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    interest_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    penalty_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     payment_date = models.DateTimeField(null=True)
     status = models.CharField(max_length=20, choices=PAYMENT_STATUS, default='PENDING')
     payment_method = models.CharField(max_length=20, null=True)
@@ -102,6 +119,49 @@ class LoanRepayment(models.Model):
 
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            # Serves the portfolio delinquency scan
+            models.Index(fields=['status', 'due_date'])
+        ]
 
     def __str__(self):
         return f'{self.loan.reference} - {self.amount}'
+
+
+class LoanDisbursementBatch(models.Model):
+    """Progress of a chunked bulk disbursement of approved loans."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed')
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    loan_ids = models.JSONField(default=list)
+    chunk_size = models.PositiveIntegerField(default=500)
+    payment_method = models.CharField(max_length=20, default='BANK_TRANSFER')
+    total_loans = models.PositiveIntegerField(default=0)
+    disbursed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    completed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def processed_count(self):
+        return self.disbursed_count + self.failed_count + self.skipped_count
+
+    @property
+    def progress(self):
+        if not self.total_loans:
+            return 100
+        return round(self.processed_count * 100 / self.total_loans)
+
+    def __str__(self):
+        return f'Disbursement batch {self.id} - {self.status}'
@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import Loan, LoanApplication, LoanRepayment
+
+from apps.transactions.models import Transaction
+from .models import Loan, LoanApplication, LoanDisbursementBatch, LoanRepayment
 
 class LoanSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,4 +21,58 @@ class LoanRepaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = LoanRepayment
         fields = '__all__'
-        read_only_fields = ['processed_date', 'processed_by']
\ No newline at end of file
+        read_only_fields = ['processed_date', 'processed_by']
+
+class LoanDisbursementBatchSerializer(serializers.ModelSerializer):
+    MAX_BATCH_SIZE = 50000
+
+    loan_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    chunk_size = serializers.IntegerField(min_value=1, max_value=2000, required=False)
+    payment_method = serializers.ChoiceField(choices=Transaction.PAYMENT_METHODS, required=False)
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = LoanDisbursementBatch
+        fields = [
+            'id', 'status', 'loan_ids', 'chunk_size', 'payment_method', 'total_loans',
+            'disbursed_count', 'failed_count', 'skipped_count', 'progress', 'errors', 'created_by',
+            'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'status', 'total_loans', 'disbursed_count', 'failed_count', 'skipped_count', 'errors',
+            'created_by', 'created_at', 'started_at', 'completed_at'
+        ]
+
+    def validate_loan_ids(self, value):
+        if len(value) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"A batch may contain at most {self.MAX_BATCH_SIZE} loans")
+        return value
+
+
+class RepaymentItemSerializer(serializers.Serializer):
+    loan_id = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    payment_reference = serializers.CharField(max_length=50)
+    payment_method = serializers.ChoiceField(choices=Transaction.PAYMENT_METHODS, required=False)
+
+
+class RepaymentBatchSerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 50000
+
+    repayments = RepaymentItemSerializer(many=True, allow_empty=False)
+
+    def validate_repayments(self, value):
+        if len(value) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"A batch may contain at most {self.MAX_BATCH_SIZE} repayments")
+        return value
+
+
+class EligibilityScreenSerializer(serializers.Serializer):
+    MAX_MEMBERS = 50000
+
+    member_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_member_ids(self, value):
+        if len(value) > self.MAX_MEMBERS:
+            raise serializers.ValidationError(f"At most {self.MAX_MEMBERS} members can be screened at once")
+        return value
@@ -0,0 +1,67 @@
+# apps/loans/services/allocation.py
+from dataclasses import dataclass
+from decimal import Decimal
+
+from ..models import LoanRepayment
+
+ZERO = Decimal('0.00')
+
+
+@dataclass
+class Allocation:
+    repayment: LoanRepayment
+    penalty: Decimal = ZERO
+    interest: Decimal = ZERO
+    principal: Decimal = ZERO
+
+    @property
+    def total(self) -> Decimal:
+        return self.penalty + self.interest + self.principal
+
+
+class RepaymentAllocator:
+    """Splits a payment over open installments, oldest first.
+
+    Within each installment the payment settles the penalty, then
+    interest, then principal before moving on to the next due date.
+    Works purely in memory; callers persist the result.
+    """
+
+    @staticmethod
+    def outstanding(repayment: LoanRepayment) -> tuple[Decimal, Decimal, Decimal]:
+        return (
+            repayment.penalty_amount - repayment.penalty_paid,
+            repayment.interest_component - repayment.interest_paid,
+            repayment.principal_component - repayment.principal_paid
+        )
+
+    @staticmethod
+    def allocate(installments: list[LoanRepayment], amount: Decimal) -> tuple[list[Allocation], Decimal]:
+        """Return the per-installment allocations and any unallocated remainder."""
+        allocations = []
+        remaining = amount
+        for repayment in sorted(installments, key=lambda r: (r.due_date, r.id or 0)):
+            if remaining <= 0:
+                break
+
+            parts = []
+            for due in RepaymentAllocator.outstanding(repayment):
+                paid = min(max(due, ZERO), remaining)
+                parts.append(paid)
+                remaining -= paid
+
+            allocation = Allocation(repayment, *parts)
+            if allocation.total > 0:
+                allocations.append(allocation)
+        return allocations, remaining
+
+    @staticmethod
+    def apply(allocation: Allocation, payment_date, payment_method: str) -> None:
+        """Record ``allocation`` on its installment (unsaved)."""
+        repayment = allocation.repayment
+        repayment.penalty_paid += allocation.penalty
+        repayment.interest_paid += allocation.interest
+        repayment.principal_paid += allocation.principal
+        repayment.status = 'PAID' if not any(RepaymentAllocator.outstanding(repayment)) else 'PARTIAL'
+        repayment.payment_date = payment_date
+        repayment.payment_method = payment_method
@@ -0,0 +1,104 @@
+# apps/loans/services/amortization.py
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+from shared.utils.date_utils import add_months
+
+CENT = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class Installment:
+    number: int
+    due_date: date
+    amount: Decimal
+    principal: Decimal
+    interest: Decimal
+    balance_after: Decimal
+
+
+class AmortizationService:
+    DECLINING_BALANCE = 'DECLINING_BALANCE'
+    FLAT_RATE = 'FLAT_RATE'
+    INTEREST_ONLY = 'INTEREST_ONLY'
+
+    @staticmethod
+    def build_schedule(
+            principal: Decimal,
+            annual_rate: Decimal,
+            term_months: int,
+            start_date: date,
+            method: str = DECLINING_BALANCE
+    ) -> list[Installment]:
+        """Compute the whole repayment schedule in memory.
+
+        Every amount is rounded to the cent as it is produced and the final
+        installment takes whatever principal is left, so the principal
+        components always sum exactly to ``principal``.
+        """
+        if term_months < 1:
+            raise ValueError("Loan term must be at least one month")
+
+        principal = AmortizationService._round(Decimal(principal))
+        monthly_rate = Decimal(annual_rate) / 1200
+        builders = {
+            AmortizationService.DECLINING_BALANCE: AmortizationService._declining_balance,
+            AmortizationService.FLAT_RATE: AmortizationService._flat_rate,
+            AmortizationService.INTEREST_ONLY: AmortizationService._interest_only,
+        }
+        if method not in builders:
+            raise ValueError(f"Unknown repayment method {method}")
+
+        components = builders[method](principal, monthly_rate, term_months)
+
+        schedule = []
+        balance = principal
+        for number, (principal_part, interest) in enumerate(components, start=1):
+            balance -= principal_part
+            schedule.append(Installment(
+                number=number,
+                due_date=add_months(start_date, number),
+                amount=principal_part + interest,
+                principal=principal_part,
+                interest=interest,
+                balance_after=balance
+            ))
+        return schedule
+
+    @staticmethod
+    def _round(amount: Decimal) -> Decimal:
+        return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def _declining_balance(principal: Decimal, monthly_rate: Decimal, term_months: int) -> list[tuple]:
+        # Equal installments; interest accrues on the outstanding balance
+        if monthly_rate:
+            growth = (1 + monthly_rate) ** term_months
+            payment = AmortizationService._round(principal * monthly_rate * growth / (growth - 1))
+        else:
+            payment = AmortizationService._round(principal / term_months)
+
+        components = []
+        balance = principal
+        for number in range(1, term_months + 1):
+            interest = AmortizationService._round(balance * monthly_rate)
+            principal_part = balance if number == term_months else min(payment - interest, balance)
+            components.append((principal_part, interest))
+            balance -= principal_part
+        return components
+
+    @staticmethod
+    def _flat_rate(principal: Decimal, monthly_rate: Decimal, term_months: int) -> list[tuple]:
+        # Interest is charged on the original principal every month
+        interest = AmortizationService._round(principal * monthly_rate)
+        # Rounded down so the last installment never goes negative
+        principal_part = (principal / term_months).quantize(CENT, rounding=ROUND_DOWN)
+        last = principal - principal_part * (term_months - 1)
+        return [(principal_part, interest)] * (term_months - 1) + [(last, interest)]
+
+    @staticmethod
+    def _interest_only(principal: Decimal, monthly_rate: Decimal, term_months: int) -> list[tuple]:
+        # Interest each month, the whole principal with the last installment
+        interest = AmortizationService._round(principal * monthly_rate)
+        return [(Decimal('0.00'), interest)] * (term_months - 1) + [(principal, interest)]
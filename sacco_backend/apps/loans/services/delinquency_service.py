@@ -0,0 +1,107 @@
+# apps/loans/services/delinquency_service.py
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Count, Exists, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Loan, LoanRepayment
+
+
+class DelinquencyService:
+    ACTIVE_LOAN_STATUSES = ['DISBURSED', 'DEFAULTED']
+    PAR_BUCKETS = (1, 30, 60, 90)
+    DEFAULT_AFTER_DAYS = 90
+
+    @staticmethod
+    @transaction.atomic
+    def scan(as_of: Optional[date] = None) -> dict:
+        """Age the whole active portfolio with a handful of set-based statements.
+
+        Open installments past due become OVERDUE, each active loan's
+        missed_payments_count is recomputed from its overdue installments,
+        and disbursed loans whose oldest overdue installment is more than
+        DEFAULT_AFTER_DAYS late are marked DEFAULTED. Returns the counts and
+        the PAR buckets as of ``as_of``.
+        """
+        as_of = as_of or timezone.localdate()
+
+        overdue_installments = LoanRepayment.objects.filter(
+            status__in=['PENDING', 'PARTIAL'],
+            due_date__lt=as_of,
+            loan__status__in=DelinquencyService.ACTIVE_LOAN_STATUSES
+        ).update(status='OVERDUE')
+
+        overdue = LoanRepayment.objects.filter(loan=OuterRef('pk'), status='OVERDUE')
+        missed = overdue.values('loan').annotate(total=Count('id')).values('total')
+        updated_loans = Loan.objects.filter(
+            status__in=DelinquencyService.ACTIVE_LOAN_STATUSES
+        ).filter(
+            Q(Exists(overdue)) | Q(missed_payments_count__gt=0)
+        ).update(missed_payments_count=Coalesce(Subquery(missed), Value(0)))
+
+        default_cutoff = as_of - timedelta(days=DelinquencyService.DEFAULT_AFTER_DAYS)
+        defaulted = Loan.objects.filter(status='DISBURSED').filter(
+            Exists(overdue.filter(due_date__lt=default_cutoff))
+        ).update(status='DEFAULTED')
+
+        return {
+            'as_of': as_of,
+            'overdue_installments': overdue_installments,
+            'loans_updated': updated_loans,
+            'loans_defaulted': defaulted,
+            **DelinquencyService.portfolio_at_risk(as_of)
+        }
+
+    @staticmethod
+    def aged_loans(as_of: date):
+        """Active loans annotated with the due date of their oldest open installment past due."""
+        oldest_due = LoanRepayment.objects.filter(
+            loan=OuterRef('pk'),
+            status__in=LoanRepayment.OPEN_STATUSES,
+            due_date__lt=as_of
+        ).values('loan').annotate(oldest=Min('due_date')).values('oldest')
+
+        return Loan.objects.filter(
+            status__in=DelinquencyService.ACTIVE_LOAN_STATUSES
+        ).annotate(oldest_due=Subquery(oldest_due))
+
+    @staticmethod
+    def par_aggregates(as_of: date) -> dict:
+        """``par_<days>`` Sum expressions for use with ``aged_loans``."""
+        zero = Value(Decimal('0'))
+        return {
+            f'par_{days}': Coalesce(
+                Sum('outstanding_balance', filter=Q(oldest_due__lte=as_of - timedelta(days=days))),
+                zero
+            )
+            for days in DelinquencyService.PAR_BUCKETS
+        }
+
+    @staticmethod
+    def portfolio_at_risk(as_of: Optional[date] = None) -> dict:
+        """Outstanding balance by days past due of each loan's oldest open installment.
+
+        PAR N covers loans at least N days past due, as an amount and as a
+        share of the active portfolio, all from one aggregate query.
+        """
+        as_of = as_of or timezone.localdate()
+        totals = DelinquencyService.aged_loans(as_of).aggregate(
+            portfolio=Coalesce(Sum('outstanding_balance'), Value(Decimal('0'))),
+            **DelinquencyService.par_aggregates(as_of)
+        )
+
+        portfolio = totals['portfolio']
+        return {
+            'portfolio_outstanding': portfolio,
+            'par': {
+                days: {
+                    'amount': totals[f'par_{days}'],
+                    'ratio': (totals[f'par_{days}'] / portfolio).quantize(Decimal('0.0001')) if portfolio else Decimal('0')
+                }
+                for days in DelinquencyService.PAR_BUCKETS
+            }
+        }
@@ -0,0 +1,155 @@
+# apps/loans/services/disbursement_service.py
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.loans.models import Loan, LoanDisbursementBatch, LoanRepayment
+from apps.loans.services.loan_service import LoanService
+from apps.outbox.services.outbox_service import OutboxService
+from apps.transactions.models import Transaction
+from shared.services.ledger_service import LedgerService
+from shared.utils.reference_generator import get_reference_generator
+
+
+class LoanDisbursementService:
+    DEFAULT_CHUNK_SIZE = 500
+
+    @staticmethod
+    def create_batch(
+            loan_ids: Optional[list[int]] = None,
+            created_by=None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            payment_method: str = 'BANK_TRANSFER'
+    ) -> LoanDisbursementBatch:
+        """Record a batch over ``loan_ids``, or over every approved loan if none are given."""
+        if loan_ids is None:
+            loan_ids = list(Loan.objects.filter(status='APPROVED').order_by('id').values_list('id', flat=True))
+        loan_ids = sorted(set(loan_ids))
+
+        return LoanDisbursementBatch.objects.create(
+            loan_ids=loan_ids,
+            chunk_size=chunk_size,
+            payment_method=payment_method,
+            total_loans=len(loan_ids),
+            created_by=created_by
+        )
+
+    @staticmethod
+    def chunks(batch: LoanDisbursementBatch) -> list[list[int]]:
+        return [
+            batch.loan_ids[start:start + batch.chunk_size]
+            for start in range(0, len(batch.loan_ids), batch.chunk_size)
+        ]
+
+    @staticmethod
+    @transaction.atomic
+    def disburse_chunk(batch_id: int, loan_ids: list[int]) -> dict:
+        batch = LoanDisbursementBatch.objects.only('payment_method', 'created_by').get(pk=batch_id)
+        result = LoanDisbursementService.disburse_loans(
+            loan_ids,
+            payment_method=batch.payment_method,
+            created_by_id=batch.created_by_id
+        )
+        LoanDisbursementService._record_progress(batch_id, result)
+        return result
+
+    @staticmethod
+    @transaction.atomic
+    def disburse_loans(
+            loan_ids: list[int],
+            payment_method: str = 'BANK_TRANSFER',
+            created_by_id: Optional[int] = None
+    ) -> dict:
+        """Disburse approved loans with bulk writes.
+
+        Loans are locked with SKIP LOCKED, so concurrent chunks (or a
+        single-loan disbursement racing a batch) never wait on, or disburse,
+        the same loan twice; approved loans held by another disbursement are
+        reported as skipped rather than failed. Schedules, disbursement
+        transactions, ledger lines and outbox events are each written with
+        one statement. The ledger posting, which locks the shared account
+        balance rows, comes last to keep that lock short.
+        """
+        loans = LoanDisbursementService._lock_approved(loan_ids)
+        unlocked = set(loan_ids) - {loan.id for loan in loans}
+        # Still approved but not lockable: another disbursement holds the row
+        skipped = sorted(Loan.objects.filter(id__in=unlocked, status='APPROVED').values_list('id', flat=True))
+        errors = [
+            {'loan_id': loan_id, 'error': 'Loan is not approved'}
+            for loan_id in sorted(unlocked - set(skipped))
+        ]
+
+        now = timezone.now()
+        generator = get_reference_generator()
+        disbursed, repayments, transactions = [], [], []
+        for loan in loans:
+            loan.status = 'DISBURSED'
+            loan.disbursement_date = now
+            try:
+                repayments.extend(LoanService.build_repayments(loan))
+            except ValueError as e:
+                errors.append({'loan_id': loan.id, 'error': str(e)})
+                continue
+
+            transactions.append(Transaction(
+                transaction_ref=generator.next('TXN'),
+                member_id=loan.member_id,
+                transaction_type='LOAN_DISBURSEMENT',
+                amount=loan.amount,
+                payment_method=payment_method,
+                status='COMPLETED',
+                processed_date=now,
+                description=f"Loan disbursement - {loan.reference}",
+                created_by_id=created_by_id
+            ))
+            disbursed.append(loan)
+
+        if disbursed:
+            Transaction.objects.bulk_create(transactions)
+            for loan, _transaction in zip(disbursed, transactions):
+                loan.disbursement_transaction = _transaction
+
+            LoanRepayment.objects.bulk_create(repayments)
+            Loan.objects.bulk_update(disbursed, [
+                'status', 'disbursement_date', 'disbursement_transaction', 'total_interest',
+                'total_amount_payable', 'outstanding_balance', 'next_payment_date'
+            ])
+            OutboxService.publish_many(
+                ('loan.disbursed', {
+                    'loan_id': loan.id,
+                    'member_id': loan.member_id,
+                    'loan_type': loan.loan_type,
+                    'amount': str(loan.amount),
+                    'disbursed_on': timezone.localdate(loan.disbursement_date).isoformat()
+                })
+                for loan in disbursed
+            )
+            LedgerService.post_journal([
+                line for loan in disbursed for line in LedgerService.loan_disbursement_lines(loan)
+            ])
+
+        return {'disbursed': [loan.id for loan in disbursed], 'skipped': skipped, 'errors': errors}
+
+    @staticmethod
+    def _lock_approved(loan_ids: list[int]) -> list[Loan]:
+        return list(
+            Loan.objects.select_for_update(skip_locked=True).filter(
+                id__in=loan_ids,
+                status='APPROVED'
+            ).order_by('id')
+        )
+
+    @staticmethod
+    def _record_progress(batch_id: int, result: dict) -> None:
+        batch = LoanDisbursementBatch.objects.select_for_update().get(pk=batch_id)
+        batch.disbursed_count += len(result['disbursed'])
+        batch.failed_count += len(result['errors'])
+        batch.skipped_count += len(result['skipped'])
+        batch.errors.extend(result['errors'])
+        if batch.processed_count >= batch.total_loans:
+            batch.status = 'COMPLETED'
+            batch.completed_at = timezone.now()
+        batch.save(update_fields=[
+            'disbursed_count', 'failed_count', 'skipped_count', 'errors', 'status', 'completed_at'
+        ])
@@ -1,15 +1,16 @@
 # apps/loans/services/loan_service.py
 import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime
 from decimal import Decimal
 from typing import Tuple
 
 from django.db import transaction
 
 from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.amortization import AmortizationService
+from apps.loans.services.eligibility_service import LoanEligibilityService
 from apps.members.models import Member
 from apps.notifications.services.notification_service import NotificationService
-from apps.risk_management.models import RiskProfile
 
 logger = logging.getLogger(__name__)
 
@@ -34,82 +35,39 @@ class LoanService:
         return loan
 
     @staticmethod
-    @transaction.atomic
-    def disburse_loan(loan: Loan):
-        loan.status = 'DISBURSED'
-        loan.disbursement_date = datetime.now()
-        loan.save()
-
-        # Create repayment schedule
-        monthly_payment = LoanService.calculate_monthly_payment(
-            loan.amount, loan.interest_rate, loan.term_months
+    def build_repayments(loan: Loan) -> list[LoanRepayment]:
+        """Unsaved repayment rows for ``loan``; also sets the loan's schedule totals."""
+        schedule = AmortizationService.build_schedule(
+            principal=loan.amount,
+            annual_rate=loan.interest_rate,
+            term_months=loan.term_months,
+            start_date=loan.disbursement_date.date(),
+            method=loan.repayment_method
         )
 
-        for month in range(1, loan.term_months + 1):
-            due_date = loan.disbursement_date.date() + timedelta(days=30 * month)
-
-            # Calculate principal and interest components (simplified)
-            # In a real system, you would use an amortization schedule
-            remaining_months = loan.term_months - month + 1
-            interest_component = (loan.amount * (loan.interest_rate / 12 / 100)).quantize(Decimal('0.01'))
-            principal_component = (monthly_payment - interest_component).quantize(Decimal('0.01'))
+        loan.total_interest = sum(installment.interest for installment in schedule)
+        loan.total_amount_payable = loan.amount + loan.total_interest
+        loan.outstanding_balance = loan.total_amount_payable
+        loan.next_payment_date = schedule[0].due_date
 
-            LoanRepayment.objects.create(
+        return [
+            LoanRepayment(
                 loan=loan,
-                reference=f"RP{loan.reference[2:]}-{month:02d}",
-                due_date=due_date,
-                amount=monthly_payment,
-                principal_component=principal_component,
-                interest_component=interest_component,
+                reference=f"RP{loan.reference[2:]}-{installment.number:02d}",
+                due_date=installment.due_date,
+                amount=installment.amount,
+                principal_component=installment.principal,
+                interest_component=installment.interest,
                 penalty_amount=Decimal('0.00')
             )
-
-        NotificationService.send_loan_disbursement_notification(loan.member)
-        return loan
+            for installment in schedule
+        ]
 
     @staticmethod
     async def check_eligibility(member: Member) -> Tuple[bool, str]:
         """Check if member is eligible for a loan"""
         try:
-            # Check membership duration
-            membership_duration = (date.today() - member.registration_date).days
-            if membership_duration < 90:  # 3 months minimum
-                return False, "Minimum membership period not met (3 months required)"
-
-            # Check existing loans
-            active_loans = await Loan.objects.filter(
-                member=member,
-                status__in=['PENDING', 'APPROVED', 'DISBURSED']
-            ).acount()
-
-            if active_loans > 0:
-                return False, "Has existing active loan"
-
-            # Check minimum savings requirement
-            savings_balance = member.savings_account.balance
-            if savings_balance < Decimal('100000'):  # Minimum 100,000 UGX
-                return False, "Insufficient savings balance (min. 100,000 UGX)"
-
-            # Check payment history
-            defaulted_loans = await Loan.objects.filter(
-                member=member,
-                status='DEFAULTED'
-            ).acount()
-
-            if defaulted_loans > 0:
-                return False, "Previous loan defaults found"
-
-            # Check KYC status
-            if not member.is_verified:
-                return False, "KYC verification incomplete"
-
-            # Get credit score
-            risk_profile = await RiskProfile.objects.filter(member=member).afirst()
-            if risk_profile and risk_profile.credit_score < 600:
-                return False, "Credit score below minimum requirement"
-
-            return True, "Eligible for loan"
-
+            return await LoanEligibilityService.acheck(member)
         except Exception as e:
             logger.error(f"Error checking loan eligibility for member {member.id}: {str(e)}")
             return False, "Error checking eligibility"
\ No newline at end of file
@@ -1,53 +1,208 @@
 # apps/loans/services/repayment_service.py
-from django.db import transaction
-from datetime import date
+from collections import defaultdict
 from decimal import Decimal
-from ..models import LoanRepayment, Loan
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
 from apps.transactions.models import Transaction
+from shared.services.ledger_service import LedgerService
+from shared.utils.reference_generator import get_reference_generator
+from .allocation import RepaymentAllocator
+from ..models import LoanRepayment, Loan
 
 
 class RepaymentService:
+    REPAYABLE_LOAN_STATUSES = ('DISBURSED', 'DEFAULTED')
+    BULK_UPDATE_BATCH_SIZE = 1000
+
     @staticmethod
     @transaction.atomic
-    def process_repayment(loan_id: int, amount: Decimal, payment_reference: str) -> list[LoanRepayment]:
-        loan = Loan.objects.select_for_update().get(id=loan_id)
-        due_repayments = loan.repayments.filter(
-            status__in=['PENDING', 'OVERDUE']
-        ).order_by('due_date')
+    def process_repayment(
+            loan_id: int,
+            amount: Decimal,
+            payment_reference: str,
+            payment_method: str = 'CASH',
+            created_by=None
+    ) -> list[LoanRepayment]:
+        """Apply one payment to a loan and return the installments it touched."""
+        results, touched = RepaymentService._allocate([{
+            'loan_id': loan_id,
+            'amount': amount,
+            'payment_reference': payment_reference,
+            'payment_method': payment_method
+        }], created_by)
+
+        if results[0]['status'] == 'FAILED':
+            raise ValueError(results[0]['error'])
+        return touched[0]
+
+    @staticmethod
+    @transaction.atomic
+    def process_repayments(items: list[dict], created_by=None) -> list[dict]:
+        """Apply a file of payments (e.g. payroll deductions) with bulk writes.
+
+        Each item has loan_id, amount, payment_reference and optionally
+        payment_method. Items that cannot be applied are reported and
+        skipped. Returns one result dict per item, in input order.
+        """
+        results, _ = RepaymentService._allocate(items, created_by)
+        return results
+
+    @staticmethod
+    def _allocate(items: list[dict], created_by) -> tuple[list[dict], dict[int, list[LoanRepayment]]]:
+        loans = {
+            loan.id: loan
+            for loan in Loan.objects.select_for_update().filter(
+                id__in={item['loan_id'] for item in items}
+            ).order_by('id')
+        }
+        installments = defaultdict(list)
+        for repayment in LoanRepayment.objects.filter(
+                loan_id__in=loans.keys(),
+                status__in=LoanRepayment.OPEN_STATUSES
+        ).order_by('due_date', 'id'):
+            installments[repayment.loan_id].append(repayment)
 
-        remaining_amount = amount
-        processed_repayments = []
+        now = timezone.now()
+        generator = get_reference_generator()
+        results, touched = [], {}
+        transactions, postings = [], []
+        touched_installments, touched_loans = {}, {}
 
-        for repayment in due_repayments:
-            if remaining_amount <= 0:
-                break
+        for index, item in enumerate(items):
+            loan = loans.get(item['loan_id'])
+            amount = Decimal(item['amount'])
+            reference = item['payment_reference']
+            payment_method = item.get('payment_method', 'CASH')
 
-            if remaining_amount >= repayment.amount:
-                payment_amount = repayment.amount
+            error = None
+            allocations = []
+            if loan is None:
+                error = "Loan not found"
+            elif loan.status not in RepaymentService.REPAYABLE_LOAN_STATUSES:
+                error = f"Loan is {loan.status.lower()} and cannot accept repayments"
+            elif amount <= 0:
+                error = "Repayment amount must be positive"
             else:
-                payment_amount = remaining_amount
+                open_installments = [
+                    r for r in installments[loan.id] if r.status in LoanRepayment.OPEN_STATUSES
+                ]
+                allocations, remaining = RepaymentAllocator.allocate(open_installments, amount)
+                if remaining > 0:
+                    error = f"Payment exceeds the amount due by {remaining}"
 
-            repayment.status = 'PAID' if payment_amount >= repayment.amount else 'PENDING'
-            repayment.payment_date = date.today()
-            repayment.payment_reference = payment_reference
-            repayment.save()
+            if error:
+                results.append({'index': index, 'loan_id': item['loan_id'], 'status': 'FAILED', 'error': error})
+                continue
 
-            remaining_amount -= payment_amount
-            processed_repayments.append(repayment)
+            for allocation in allocations:
+                RepaymentAllocator.apply(allocation, now, payment_method)
+                # Per-installment audit trail of the payment that last touched it
+                allocation.repayment.receipt_number = reference
+                touched_installments[allocation.repayment.id] = allocation.repayment
+            touched[index] = [allocation.repayment for allocation in allocations]
 
-        Transaction.objects.create(
-            member=loan.member,
-            transaction_type='LOAN_REPAYMENT',
-            amount=amount,
-            reference=payment_reference
-        )
+            principal = sum(a.principal for a in allocations)
+            interest = sum(a.interest for a in allocations)
+            penalty = sum(a.penalty for a in allocations)
+
+            _transaction = Transaction(
+                transaction_ref=generator.next('TXN'),
+                member_id=loan.member_id,
+                transaction_type='LOAN_REPAYMENT',
+                amount=amount,
+                payment_method=payment_method,
+                status='COMPLETED',
+                processed_date=now,
+                external_reference=reference,
+                description=f"Loan repayment - {loan.reference}",
+                created_by=created_by
+            )
+            transactions.append(_transaction)
+            postings.append((_transaction, principal, interest, penalty, loan.reference))
+
+            # Kept in memory for the results; the row is recomputed in _update_loans
+            loan.outstanding_balance -= principal + interest
+            touched_loans[loan.id] = loan
+
+            results.append({
+                'index': index,
+                'loan_id': loan.id,
+                'status': 'COMPLETED',
+                'transaction_ref': _transaction.transaction_ref,
+                'principal': principal,
+                'interest': interest,
+                'penalty': penalty,
+                'outstanding_balance': loan.outstanding_balance
+            })
+
+        if transactions:
+            Transaction.objects.bulk_create(transactions)
+            RepaymentService._save_installments(touched_installments.values(), now)
+            RepaymentService._update_loans(touched_loans.keys(), now.date())
+            LedgerService.post_journal([
+                line for posting in postings for line in LedgerService.loan_allocation_lines(*posting)
+            ])
+
+        return results, touched
+
+    @staticmethod
+    def _save_installments(installments, payment_date) -> None:
+        """Persist allocated installments.
+
+        Status, payment date and method are shared by many rows and are
+        written with one UPDATE per (status, method) group; settled rows
+        also copy their components into the paid columns. The payment
+        reference differs per payment and goes through bulk_update, along
+        with the amounts of partially paid installments (at most one per
+        payment).
+        """
+        installments = list(installments)
+        groups, partial = defaultdict(list), []
+        for repayment in installments:
+            groups[(repayment.status, repayment.payment_method)].append(repayment.id)
+            if repayment.status != 'PAID':
+                partial.append(repayment)
 
-        RepaymentService._update_loan_status(loan)
-        return processed_repayments
+        for (status, payment_method), ids in groups.items():
+            values = {'status': status, 'payment_date': payment_date, 'payment_method': payment_method}
+            if status == 'PAID':
+                values.update(
+                    principal_paid=F('principal_component'),
+                    interest_paid=F('interest_component'),
+                    penalty_paid=F('penalty_amount')
+                )
+            LoanRepayment.objects.filter(id__in=ids).update(**values)
+
+        LoanRepayment.objects.bulk_update(
+            partial,
+            ['principal_paid', 'interest_paid', 'penalty_paid', 'receipt_number'],
+            batch_size=RepaymentService.BULK_UPDATE_BATCH_SIZE
+        )
+        LoanRepayment.objects.bulk_update(
+            [repayment for repayment in installments if repayment.status == 'PAID'],
+            ['receipt_number'],
+            batch_size=RepaymentService.BULK_UPDATE_BATCH_SIZE
+        )
 
     @staticmethod
-    def _update_loan_status(loan: Loan):
-        unpaid_repayments = loan.repayments.exclude(status='PAID').count()
-        if unpaid_repayments == 0:
-            loan.status = 'COMPLETED'
-            loan.save()
\ No newline at end of file
+    def _update_loans(loan_ids, payment_date) -> None:
+        """Refresh balance, next due date and status of every touched loan in one UPDATE."""
+        repayments = LoanRepayment.objects.filter(loan=OuterRef('pk'))
+        open_repayments = repayments.filter(status__in=LoanRepayment.OPEN_STATUSES)
+        paid = repayments.values('loan').annotate(
+            total=Sum(F('principal_paid') + F('interest_paid'))
+        ).values('total')
+
+        Loan.objects.filter(id__in=loan_ids).update(
+            outstanding_balance=F('total_amount_payable') - Coalesce(Subquery(paid), Value(Decimal('0'))),
+            last_payment_date=payment_date,
+            next_payment_date=Subquery(open_repayments.order_by('due_date').values('due_date')[:1]),
+            status=Case(
+                When(~Exists(open_repayments), then=Value('COMPLETED')),
+                default=F('status')
+            )
+        )
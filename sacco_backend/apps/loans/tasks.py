@@ -1,21 +1,47 @@
 from celery import shared_task
 from django.utils import timezone
-from .models import Loan
-from .services.loan_service import LoanService
+from .models import LoanDisbursementBatch
+from .services.delinquency_service import DelinquencyService
+from .services.disbursement_service import LoanDisbursementService
 
 @shared_task
-def check_loan_status(loan_id):
-    loan = Loan.objects.get(id=loan_id)
-    if loan.status == 'DISBURSED':
-        repayments = loan.repayments.filter(due_date__lt=timezone.now(), status='UNPAID')
-        if repayments.exists():
-            loan.status = 'DEFAULTED'
-            loan.save()
+def scan_loan_delinquency():
+    result = DelinquencyService.scan()
+    return {
+        'overdue_installments': result['overdue_installments'],
+        'loans_defaulted': result['loans_defaulted']
+    }
 
 @shared_task
 def process_loan_disbursement(loan_id):
-    loan = Loan.objects.get(id=loan_id)
-    LoanService.disburse_loan(loan)
+    # Shares the locked batch path, so a concurrent batch cannot disburse the loan twice
+    return LoanDisbursementService.disburse_loans([loan_id])
+
+@shared_task
+def start_loan_disbursement_batch(batch_id):
+    batch = LoanDisbursementBatch.objects.get(id=batch_id)
+    LoanDisbursementBatch.objects.filter(id=batch_id, status='PENDING').update(
+        status='RUNNING',
+        started_at=timezone.now()
+    )
+    chunks = LoanDisbursementService.chunks(batch)
+    if not chunks:
+        LoanDisbursementBatch.objects.filter(id=batch_id).update(status='COMPLETED', completed_at=timezone.now())
+        return 0
+
+    # One task per chunk so throughput grows with the number of workers
+    for loan_ids in chunks:
+        disburse_loan_chunk.delay(batch_id, loan_ids)
+    return len(chunks)
+
+@shared_task
+def disburse_loan_chunk(batch_id, loan_ids):
+    result = LoanDisbursementService.disburse_chunk(batch_id, loan_ids)
+    return {
+        'disbursed': len(result['disbursed']),
+        'skipped': len(result['skipped']),
+        'failed': len(result['errors'])
+    }
 
 @shared_task
 def generate_loan_reports():
@@ -0,0 +1,106 @@
+# apps/loans/tests/test_delinquency.py
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.delinquency_service import DelinquencyService
+from apps.loans.services.loan_service import LoanService
+from apps.members.models import Member
+
+User = get_user_model()
+
+
+class DelinquencyServiceTest(TestCase):
+    AS_OF = date(2024, 6, 30)
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='arrears@example.com',
+            password='testpass123',
+            first_name='Arrears',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000080',
+            national_id='ARREARS1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024ARREARS',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Trader',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='ARREARS1',
+            membership_number='SACCOM2024ARREARS',
+            membership_type='INDIVIDUAL'
+        )
+        # Oldest overdue installment 71 days late
+        self.late = self._loan('LN2024LATE', date(2024, 3, 20), term_months=3)
+        # Oldest overdue installment 107 days late
+        self.defaulting = self._loan('LN2024DEFAULT', date(2024, 2, 15), term_months=6)
+        self.current = self._loan('LN2024CURRENT', date(2024, 6, 25), term_months=6)
+
+        first = self.late.repayments.order_by('due_date').first()
+        LoanRepayment.objects.filter(pk=first.pk).update(status='PARTIAL')
+
+    def _loan(self, reference, disbursed_on, term_months):
+        loan = Loan(
+            reference=reference,
+            member=self.member,
+            loan_type='PERSONAL',
+            amount=Decimal('600000'),
+            interest_rate=Decimal('12.00'),
+            term_months=term_months,
+            status='DISBURSED',
+            disbursement_date=timezone.make_aware(datetime.combine(disbursed_on, datetime.min.time()))
+        )
+        repayments = LoanService.build_repayments(loan)
+        loan.save()
+        LoanRepayment.objects.bulk_create(repayments)
+        return loan
+
+    def test_scan_ages_portfolio(self):
+        # Savepoint, three UPDATEs, one aggregate, release
+        with self.assertNumQueries(6):
+            result = DelinquencyService.scan(self.AS_OF)
+
+        self.assertEqual(result['overdue_installments'], 7)
+        self.assertEqual(result['loans_defaulted'], 1)
+
+        self.late.refresh_from_db()
+        self.defaulting.refresh_from_db()
+        self.current.refresh_from_db()
+        self.assertEqual((self.late.status, self.late.missed_payments_count), ('DISBURSED', 3))
+        self.assertEqual((self.defaulting.status, self.defaulting.missed_payments_count), ('DEFAULTED', 4))
+        self.assertEqual((self.current.status, self.current.missed_payments_count), ('DISBURSED', 0))
+        self.assertFalse(self.late.repayments.exclude(status='OVERDUE').exists())
+
+        late, defaulting = self.late.outstanding_balance, self.defaulting.outstanding_balance
+        self.assertEqual(result['portfolio_outstanding'], late + defaulting + self.current.outstanding_balance)
+        self.assertEqual(
+            {days: bucket['amount'] for days, bucket in result['par'].items()},
+            {1: late + defaulting, 30: late + defaulting, 60: late + defaulting, 90: defaulting}
+        )
+
+        # A second run finds nothing new
+        self.assertEqual(DelinquencyService.scan(self.AS_OF)['overdue_installments'], 0)
+
+    def test_missed_count_resets_once_arrears_are_cleared(self):
+        DelinquencyService.scan(self.AS_OF)
+        self.late.repayments.update(status='PAID')
+
+        DelinquencyService.scan(self.AS_OF)
+
+        self.late.refresh_from_db()
+        self.assertEqual(self.late.missed_payments_count, 0)
+        self.assertEqual(DelinquencyService.portfolio_at_risk(self.AS_OF)['par'][1]['amount'],
+                         self.defaulting.outstanding_balance)
@@ -0,0 +1,142 @@
+# apps/loans/tests/test_disbursement.py
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.authentication.models import Role
+from apps.ledger.models import LedgerEntry
+from apps.loans.models import Loan, LoanDisbursementBatch, LoanRepayment
+from apps.loans.services.disbursement_service import LoanDisbursementService
+from apps.loans.tasks import process_loan_disbursement, start_loan_disbursement_batch
+from apps.members.models import Member
+from apps.outbox.models import OutboxEvent
+from apps.transactions.models import Transaction
+
+User = get_user_model()
+
+
+class LoanDisbursementServiceTest(TestCase):
+    def setUp(self):
+        self.officer = User.objects.create_user(
+            email='officer@example.com',
+            password='testpass123',
+            first_name='Loan',
+            last_name='Officer',
+            role=Role.objects.create(name='LOAN_OFFICER'),
+            phone_number='+256700000040',
+            national_id='DISB0'
+        )
+        member_role = Role.objects.create(name='MEMBER')
+        self.loans = []
+        for index in range(4):
+            user = User.objects.create_user(
+                email=f'borrower{index}@example.com',
+                password='testpass123',
+                first_name='Borrower',
+                last_name=str(index),
+                role=member_role,
+                phone_number=f'+25670000005{index}',
+                national_id=f'DISB{index + 1}'
+            )
+            member = Member.objects.create(
+                user=user,
+                member_number=f'M2024DISB{index}',
+                date_of_birth=date(1990, 1, 1),
+                marital_status='SINGLE',
+                employment_status='EMPLOYED',
+                occupation='Teacher',
+                monthly_income=Decimal('900000'),
+                physical_address='Test Address',
+                city='Kampala',
+                district='Central',
+                national_id=f'DISB{index + 1}',
+                membership_number=f'SACCOM2024DISB{index}',
+                membership_type='INDIVIDUAL'
+            )
+            self.loans.append(Loan.objects.create(
+                reference=f'LN2024DISB{index}',
+                member=member,
+                loan_type='PAYROLL',
+                amount=Decimal('600000'),
+                interest_rate=Decimal('12.00'),
+                term_months=6,
+                status='APPROVED' if index < 3 else 'PENDING',
+                total_amount_payable=Decimal('0'),
+                total_interest=Decimal('0'),
+                outstanding_balance=Decimal('0')
+            ))
+        self.loan_ids = [loan.id for loan in self.loans]
+        OutboxEvent.objects.all().delete()
+
+    def test_chunk_disburses_approved_loans_in_bulk(self):
+        batch = LoanDisbursementService.create_batch(self.loan_ids, created_by=self.officer)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = LoanDisbursementService.disburse_chunk(batch.id, self.loan_ids)
+
+        self.assertEqual(result['disbursed'], self.loan_ids[:3])
+        self.assertEqual([error['loan_id'] for error in result['errors']], [self.loan_ids[3]])
+        for table in ('loans_loanrepayment', 'transactions_transaction', 'ledger_ledgerentry'):
+            inserts = [q for q in queries.captured_queries if q['sql'].startswith(f'INSERT INTO "{table}"')]
+            self.assertEqual(len(inserts), 1, table)
+
+        self.assertEqual(LoanRepayment.objects.count(), 18)
+        self.assertEqual(
+            Transaction.objects.filter(transaction_type='LOAN_DISBURSEMENT', created_by=self.officer).count(), 3
+        )
+        self.assertEqual(LedgerEntry.objects.count(), 6)
+        self.assertEqual(OutboxEvent.objects.filter(topic='loan.disbursed').count(), 3)
+
+        loan = Loan.objects.get(id=self.loan_ids[0])
+        self.assertEqual(loan.status, 'DISBURSED')
+        self.assertIsNotNone(loan.disbursement_transaction)
+        self.assertEqual(loan.outstanding_balance, loan.amount + loan.total_interest)
+
+        batch.refresh_from_db()
+        self.assertEqual((batch.disbursed_count, batch.failed_count, batch.progress), (3, 1, 100))
+        self.assertEqual(batch.status, 'COMPLETED')
+
+    def test_loans_locked_elsewhere_are_skipped_not_failed(self):
+        batch = LoanDisbursementService.create_batch(self.loan_ids, created_by=self.officer)
+        lock_approved = LoanDisbursementService._lock_approved
+
+        # SQLite has no row locks; drop the second loan as SKIP LOCKED would while another chunk holds it
+        with patch.object(
+            LoanDisbursementService, '_lock_approved',
+            side_effect=lambda loan_ids: [loan for loan in lock_approved(loan_ids) if loan.id != self.loan_ids[1]]
+        ):
+            result = LoanDisbursementService.disburse_chunk(batch.id, self.loan_ids)
+
+        self.assertEqual(result['disbursed'], [self.loan_ids[0], self.loan_ids[2]])
+        self.assertEqual(result['skipped'], [self.loan_ids[1]])
+        self.assertEqual(result['errors'], [{'loan_id': self.loan_ids[3], 'error': 'Loan is not approved'}])
+        self.assertEqual(Loan.objects.get(id=self.loan_ids[1]).status, 'APPROVED')
+
+        batch.refresh_from_db()
+        self.assertEqual((batch.disbursed_count, batch.failed_count, batch.skipped_count), (2, 1, 1))
+        self.assertEqual(batch.status, 'COMPLETED')
+
+    def test_single_loan_task_is_idempotent(self):
+        process_loan_disbursement(self.loan_ids[0])
+        result = process_loan_disbursement(self.loan_ids[0])
+
+        self.assertEqual(result['disbursed'], [])
+        self.assertEqual(Transaction.objects.filter(transaction_type='LOAN_DISBURSEMENT').count(), 1)
+        self.assertEqual(LoanRepayment.objects.count(), 6)
+
+    def test_start_task_fans_out_chunks(self):
+        batch = LoanDisbursementService.create_batch(chunk_size=2)
+
+        with patch('apps.loans.tasks.disburse_loan_chunk') as chunk_task:
+            start_loan_disbursement_batch(batch.id)
+
+        self.assertEqual(
+            [call.args for call in chunk_task.delay.call_args_list],
+            [(batch.id, self.loan_ids[:2]), (batch.id, self.loan_ids[2:3])]
+        )
+        self.assertEqual(LoanDisbursementBatch.objects.get(id=batch.id).status, 'RUNNING')
@@ -0,0 +1,122 @@
+# apps/loans/tests/test_eligibility.py
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.loans.models import Loan
+from apps.loans.services.eligibility_service import LoanEligibilityService
+from apps.loans.services.loan_service import LoanService
+from apps.members.models import Member
+from apps.risk_management.models import RiskProfile
+from apps.savings.models import SavingsAccount
+
+User = get_user_model()
+
+
+class LoanEligibilityServiceTest(TestCase):
+    def setUp(self):
+        self.role = Role.objects.create(name='MEMBER')
+        self.eligible = self._member('ELIG1')
+        self.borrower = self._member('ELIG2')
+        self.newcomer = self._member('ELIG3', joined_days_ago=30)
+        self.low_score = self._member('ELIG4', credit_score=450)
+        self.low_savings = self._member('ELIG5', balance='50000')
+
+        Loan.objects.create(
+            reference='LN2024ELIG2',
+            member=self.borrower,
+            loan_type='PERSONAL',
+            amount=Decimal('500000'),
+            interest_rate=Decimal('12.00'),
+            term_months=12,
+            status='DISBURSED',
+            total_amount_payable=Decimal('560000'),
+            total_interest=Decimal('60000'),
+            outstanding_balance=Decimal('560000')
+        )
+
+    def _member(self, code, joined_days_ago=365, balance='200000', credit_score=720):
+        user = User.objects.create_user(
+            email=f'{code.lower()}@example.com',
+            password='testpass123',
+            first_name='Eligibility',
+            last_name=code,
+            role=self.role,
+            phone_number=f'+2567000001{code[-1]}0',
+            national_id=code
+        )
+        member = Member.objects.create(
+            user=user,
+            member_number=f'M2024{code}',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Farmer',
+            monthly_income=Decimal('800000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id=code,
+            membership_number=f'SACCOM2024{code}',
+            membership_type='INDIVIDUAL',
+            is_verified=True
+        )
+        account = SavingsAccount.objects.create(
+            member=member,
+            account_number=f'SA{code}',
+            account_type='REGULAR',
+            balance=Decimal(balance),
+            interest_rate=Decimal('5.00'),
+            status='ACTIVE',
+            minimum_balance=Decimal('10000')
+        )
+        RiskProfile.objects.create(
+            member=member,
+            credit_score=credit_score,
+            risk_level='LOW',
+            last_assessment_date=timezone.now(),
+            next_assessment_date=timezone.now(),
+            factors={}
+        )
+        Member.objects.filter(pk=member.pk).update(
+            savings_account=account,
+            registration_date=date.today() - timedelta(days=joined_days_ago)
+        )
+        member.refresh_from_db()
+        return member
+
+    def test_screen_evaluates_members_in_one_query(self):
+        members = [self.eligible, self.borrower, self.newcomer, self.low_score, self.low_savings]
+
+        with self.assertNumQueries(1):
+            results = list(LoanEligibilityService.screen(member.id for member in members))
+
+        self.assertEqual(
+            [(result['member_number'], result['eligible'], result['reason']) for result in results],
+            [
+                ('M2024ELIG1', True, "Eligible for loan"),
+                ('M2024ELIG2', False, "Has existing active loan"),
+                ('M2024ELIG3', False, "Minimum membership period not met (3 months required)"),
+                ('M2024ELIG4', False, "Credit score below minimum requirement"),
+                ('M2024ELIG5', False, "Insufficient savings balance (min. 100,000 UGX)"),
+            ]
+        )
+
+    def test_single_member_checks(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(LoanEligibilityService.check(self.eligible), (True, "Eligible for loan"))
+
+        self.assertEqual(
+            async_to_sync(LoanService.check_eligibility)(self.borrower),
+            (False, "Has existing active loan")
+        )
+
+    def test_missing_risk_profile_does_not_block(self):
+        RiskProfile.objects.filter(member=self.eligible).delete()
+
+        self.assertEqual(LoanEligibilityService.check(self.eligible), (True, "Eligible for loan"))
@@ -0,0 +1,131 @@
+# apps/loans/tests/test_repayments.py
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.ledger.models import LedgerEntry
+from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.loan_service import LoanService
+from apps.loans.services.repayment_service import RepaymentService
+from apps.members.models import Member
+from shared.services.ledger_service import LedgerService
+
+User = get_user_model()
+
+
+class RepaymentServiceTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            email='repay@example.com',
+            password='testpass123',
+            first_name='Repay',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000060',
+            national_id='REPAY1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024REPAY',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Nurse',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='REPAY1',
+            membership_number='SACCOM2024REPAY',
+            membership_type='INDIVIDUAL'
+        )
+        self.loan = self._disbursed_loan('LN2024REPAY0')
+
+    def _disbursed_loan(self, reference):
+        loan = Loan(
+            reference=reference,
+            member=self.member,
+            loan_type='PAYROLL',
+            amount=Decimal('300000'),
+            interest_rate=Decimal('12.00'),
+            term_months=3,
+            status='DISBURSED',
+            disbursement_date=timezone.now()
+        )
+        repayments = LoanService.build_repayments(loan)
+        loan.save()
+        LoanRepayment.objects.bulk_create(repayments)
+        return loan
+
+    def test_payment_settles_penalty_then_interest_then_principal(self):
+        first = self.loan.repayments.order_by('due_date').first()
+        first.penalty_amount = Decimal('2000')
+        first.save()
+
+        touched = RepaymentService.process_repayment(
+            self.loan.id, Decimal('2000') + first.interest_component + Decimal('500'), 'PAYROLL-001'
+        )
+
+        self.assertEqual([r.id for r in touched], [first.id])
+        first.refresh_from_db()
+        self.assertEqual(first.penalty_paid, Decimal('2000'))
+        self.assertEqual(first.interest_paid, first.interest_component)
+        self.assertEqual(first.principal_paid, Decimal('500'))
+        self.assertEqual(first.status, 'PARTIAL')
+        self.assertEqual(first.receipt_number, 'PAYROLL-001')
+
+        self.loan.refresh_from_db()
+        self.assertEqual(
+            self.loan.outstanding_balance,
+            self.loan.total_amount_payable - first.interest_component - Decimal('500')
+        )
+        self.assertEqual(self.loan.last_payment_date, timezone.now().date())
+        self.assertEqual(
+            LedgerEntry.objects.get(account_code=LedgerService.ACCOUNT_CODES['PENALTY_INCOME']).amount,
+            Decimal('2000')
+        )
+
+    def test_full_payment_completes_loan(self):
+        RepaymentService.process_repayment(self.loan.id, self.loan.total_amount_payable, 'PAYROLL-002')
+
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.status, 'COMPLETED')
+        self.assertEqual(self.loan.outstanding_balance, Decimal('0'))
+        self.assertIsNone(self.loan.next_payment_date)
+        self.assertFalse(self.loan.repayments.exclude(status='PAID').exists())
+
+    def test_overpayment_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RepaymentService.process_repayment(self.loan.id, self.loan.total_amount_payable + 1, 'PAYROLL-003')
+
+        self.assertFalse(self.loan.repayments.exclude(status='PENDING').exists())
+
+    def test_payroll_file_updates_loans_in_bulk(self):
+        loans = [self.loan] + [self._disbursed_loan(f'LN2024REPAY{n}') for n in range(1, 5)]
+        items = [
+            {'loan_id': loan.id, 'amount': Decimal('60000'), 'payment_reference': f'PR-{loan.id}-{n}'}
+            for loan in loans for n in range(2)
+        ] + [{'loan_id': 0, 'amount': Decimal('1'), 'payment_reference': 'PR-MISSING'}]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = RepaymentService.process_repayments(items)
+
+        self.assertEqual([r['status'] for r in results].count('COMPLETED'), 10)
+        self.assertEqual(results[-1]['error'], 'Loan not found')
+        loan_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "loans_loan"')]
+        self.assertEqual(len(loan_updates), 1)
+
+        for loan in Loan.objects.filter(id__in=[loan.id for loan in loans]):
+            # Two payments of 60000 pay off the first installment and part of the second
+            self.assertEqual(loan.outstanding_balance, loan.total_amount_payable - Decimal('120000'))
+            self.assertEqual(list(loan.repayments.values_list('status', flat=True)), ['PAID', 'PARTIAL', 'PENDING'])
+            self.assertEqual(
+                list(loan.repayments.values_list('receipt_number', flat=True)),
+                [f'PR-{loan.id}-1', f'PR-{loan.id}-1', None]
+            )
@@ -4,13 +4,19 @@ from decimal import Decimal
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
+from django.db import connection
+from django.db.models import Sum
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 
 from apps.authentication.models import Role
+from apps.loans.services.amortization import AmortizationService
+from apps.loans.services.disbursement_service import LoanDisbursementService
 from apps.loans.services.loan_service import LoanService
 from apps.loans.models import Loan, LoanRepayment
 from apps.members.models import Member
+from apps.outbox.models import OutboxEvent
 from apps.risk_management.models import RiskProfile
 
 User = get_user_model()
@@ -120,9 +126,11 @@ class LoanServiceTest(TestCase):
         LoanService.approve_loan(self.loan, self.user)
 
         # Test loan disbursement process
-        disbursed_loan = LoanService.disburse_loan(self.loan)
+        result = LoanDisbursementService.disburse_loans([self.loan.id])
+        disbursed_loan = Loan.objects.get(pk=self.loan.pk)
 
         # Assertions
+        self.assertEqual(result, {'disbursed': [self.loan.id], 'skipped': [], 'errors': []})
         self.assertEqual(disbursed_loan.status, 'DISBURSED')
         self.assertIsNotNone(disbursed_loan.disbursement_date)
 
@@ -130,8 +138,29 @@ class LoanServiceTest(TestCase):
         repayments = LoanRepayment.objects.filter(loan=disbursed_loan)
         self.assertEqual(repayments.count(), 12)  # 12 monthly payments
 
-        # Verify notification was sent
-        self.mock_notification_service.send_loan_disbursement_notification.assert_called_once_with(self.member)
+        # The member is notified from the outbox once the disbursement commits
+        self.assertTrue(OutboxEvent.objects.filter(topic='loan.disbursed', payload__loan_id=self.loan.id).exists())
+
+        # A second request finds the loan no longer approved
+        self.assertEqual(LoanDisbursementService.disburse_loans([self.loan.id])['disbursed'], [])
+
+    def test_disbursement_inserts_schedule_once(self):
+        Loan.objects.filter(pk=self.loan.pk).update(term_months=60, status='APPROVED')
+
+        with CaptureQueriesContext(connection) as queries:
+            LoanDisbursementService.disburse_loans([self.loan.id])
+
+        repayment_inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "loans_loanrepayment"')
+        ]
+        self.assertEqual(len(repayment_inserts), 1)
+        self.assertEqual(LoanRepayment.objects.filter(loan=self.loan).count(), 60)
+
+        self.loan.refresh_from_db()
+        principal = LoanRepayment.objects.filter(loan=self.loan).aggregate(total=Sum('principal_component'))
+        self.assertEqual(principal['total'], self.loan.amount)
+        self.assertEqual(self.loan.outstanding_balance, self.loan.amount + self.loan.total_interest)
 
     @patch('apps.loans.services.loan_service.Loan.objects.filter')
     @patch('apps.risk_management.models.RiskProfile.objects.filter')
@@ -200,4 +229,42 @@ class LoanServiceTest(TestCase):
         if not member.is_verified:
             return False, "KYC verification incomplete"
 
-        return True, "Eligible for loan"
\ No newline at end of file
+        return True, "Eligible for loan"
+
+
+class AmortizationServiceTest(TestCase):
+    def _schedule(self, method, principal='1000000', rate='15.00', term=12):
+        return AmortizationService.build_schedule(
+            Decimal(principal), Decimal(rate), term, datetime(2024, 1, 31).date(), method
+        )
+
+    def test_declining_balance_schedule(self):
+        schedule = self._schedule(AmortizationService.DECLINING_BALANCE)
+
+        self.assertEqual(schedule[0].amount, Decimal('90258.31'))
+        self.assertEqual(schedule[0].interest, Decimal('12500.00'))
+        # Interest falls as the balance is paid down
+        self.assertTrue(all(a.interest > b.interest for a, b in zip(schedule, schedule[1:])))
+        self.assertEqual(sum(i.principal for i in schedule), Decimal('1000000.00'))
+        self.assertEqual(schedule[-1].balance_after, Decimal('0.00'))
+
+    def test_flat_rate_schedule(self):
+        schedule = self._schedule(AmortizationService.FLAT_RATE, principal='100000', term=3)
+
+        self.assertEqual([i.principal for i in schedule], [Decimal('33333.33'), Decimal('33333.33'), Decimal('33333.34')])
+        self.assertEqual({i.interest for i in schedule}, {Decimal('1250.00')})
+
+    def test_interest_only_schedule(self):
+        schedule = self._schedule(AmortizationService.INTEREST_ONLY, term=6)
+
+        self.assertEqual(sum(i.principal for i in schedule[:-1]), Decimal('0'))
+        self.assertEqual(schedule[-1].amount, Decimal('1012500.00'))
+
+    def test_zero_rate_and_month_end_dates(self):
+        schedule = self._schedule(AmortizationService.DECLINING_BALANCE, principal='1000', rate='0', term=3)
+
+        self.assertEqual([i.amount for i in schedule], [Decimal('333.33'), Decimal('333.33'), Decimal('333.34')])
+        self.assertEqual(
+            [i.due_date for i in schedule],
+            [datetime(2024, 2, 29).date(), datetime(2024, 3, 31).date(), datetime(2024, 4, 30).date()]
+        )
@@ -1,13 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import LoanViewSet, LoanRepaymentViewSet, LoanApplicationViewSet
+from .views import LoanViewSet, LoanRepaymentViewSet, LoanApplicationViewSet, LoanDisbursementBatchViewSet
 
 router = DefaultRouter()
 
 router.register(r'loans', LoanViewSet)
 router.register(r'loan_repayments',LoanRepaymentViewSet)
 router.register(r'loan_applications', LoanApplicationViewSet)
+router.register(r'loan_disbursement_batches', LoanDisbursementBatchViewSet)
 
 
 urlpatterns = [
@@ -1,10 +1,24 @@
-from rest_framework import viewsets, status
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Loan, LoanApplication, LoanRepayment
-from .serializers import LoanSerializer, LoanApplicationSerializer, LoanRepaymentSerializer
+from .models import Loan, LoanApplication, LoanDisbursementBatch, LoanRepayment
+from .serializers import (
+    LoanSerializer,
+    LoanApplicationSerializer,
+    LoanDisbursementBatchSerializer,
+    LoanRepaymentSerializer,
+    EligibilityScreenSerializer,
+    RepaymentBatchSerializer
+)
+from .services.delinquency_service import DelinquencyService
+from .services.disbursement_service import LoanDisbursementService
+from .services.eligibility_service import LoanEligibilityService
 from .services.loan_service import LoanService
+from .services.repayment_service import RepaymentService
+from .tasks import start_loan_disbursement_batch
 
 
 class LoanViewSet(viewsets.ModelViewSet):
@@ -38,9 +52,56 @@ class LoanViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        loan = LoanService.disburse_loan(loan)
+        # Same locked path as disbursement batches, so a manual request
+        # racing a batch chunk cannot disburse twice
+        result = LoanDisbursementService.disburse_loans([loan.id], created_by_id=request.user.id)
+        if result['skipped']:
+            return Response(
+                {'error': 'Loan is already being disbursed'},
+                status=status.HTTP_409_CONFLICT
+            )
+        if result['errors']:
+            return Response(
+                {'error': result['errors'][0]['error']},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        loan.refresh_from_db()
         return Response(LoanSerializer(loan).data)
 
+    @action(detail=False, methods=['get'])
+    def portfolio_at_risk(self, request):
+        if request.user.role.name not in ['LOAN_OFFICER', 'MANAGER', 'ADMIN']:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        as_of = request.query_params.get('as_of')
+        if as_of:
+            as_of = parse_date(as_of)
+            if as_of is None:
+                return Response(
+                    {'error': 'as_of must be a date (YYYY-MM-DD)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(DelinquencyService.portfolio_at_risk(as_of))
+
+    @action(detail=False, methods=['post'])
+    def eligibility(self, request):
+        if request.user.role.name not in ['LOAN_OFFICER', 'MANAGER', 'ADMIN']:
+            return Response(
+                {'error': 'Only loan officers can screen members for eligibility'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = EligibilityScreenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = list(LoanEligibilityService.screen(serializer.validated_data['member_ids']))
+        return Response({
+            'total': len(results),
+            'eligible': sum(1 for result in results if result['eligible']),
+            'results': results
+        })
+
 
 class LoanApplicationViewSet(viewsets.ModelViewSet):
     queryset = LoanApplication.objects.all()
@@ -52,3 +113,61 @@ class LoanRepaymentViewSet(viewsets.ModelViewSet):
     queryset = LoanRepayment.objects.all()
     serializer_class = LoanRepaymentSerializer
     permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        if request.user.role.name not in ['LOAN_OFFICER', 'ACCOUNTANT', 'ADMIN']:
+            return Response(
+                {'error': 'Only loan officers and accountants can post repayment files'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = RepaymentBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = RepaymentService.process_repayments(
+            serializer.validated_data['repayments'],
+            created_by=request.user
+        )
+        completed = sum(1 for result in results if result['status'] == 'COMPLETED')
+        return Response(
+            {
+                'total': len(results),
+                'completed': completed,
+                'failed': len(results) - completed,
+                'results': results
+            },
+            status=status.HTTP_201_CREATED if completed else status.HTTP_400_BAD_REQUEST
+        )
+
+
+class LoanDisbursementBatchViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet
+):
+    queryset = LoanDisbursementBatch.objects.all()
+    serializer_class = LoanDisbursementBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        if request.user.role.name not in ['LOAN_OFFICER', 'ADMIN']:
+            return Response(
+                {'error': 'Only loan officers can start disbursement batches'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            batch = LoanDisbursementService.create_batch(
+                loan_ids=serializer.validated_data.get('loan_ids'),
+                created_by=request.user,
+                chunk_size=serializer.validated_data.get('chunk_size', LoanDisbursementService.DEFAULT_CHUNK_SIZE),
+                payment_method=serializer.validated_data.get('payment_method', 'BANK_TRANSFER')
+            )
+            transaction.on_commit(lambda: start_loan_disbursement_batch.delay(batch.id))
+
+        return Response(self.get_serializer(batch).data, status=status.HTTP_202_ACCEPTED)
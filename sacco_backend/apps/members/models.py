@@ -129,3 +129,52 @@ class MemberDocument(models.Model):
 
     def __str__(self):
         return f"{self.document_type} - {self.member.user.get_full_name()}"
+
+
+class MemberImport(models.Model):
+    """A background job registering members in bulk from an uploaded spreadsheet."""
+    FORMAT_CHOICES = [
+        ('CSV', 'CSV'),
+        ('XLSX', 'Excel')
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed')
+    ]
+
+    file = models.FileField(upload_to='member_imports/')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    account_type = models.CharField(max_length=20, default='REGULAR')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.PositiveSmallIntegerField(default=0)
+    total_rows = models.PositiveIntegerField(null=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(null=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='member_imports'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"Member import #{self.id} - {self.status}"
+
+
+class MemberImportError(models.Model):
+    """A spreadsheet row that was rejected, with its field errors."""
+    member_import = models.ForeignKey(MemberImport, on_delete=models.CASCADE, related_name='row_errors')
+    row_number = models.PositiveIntegerField()
+    errors = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['row_number']
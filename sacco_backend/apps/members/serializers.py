@@ -1,5 +1,12 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Member, NextOfKin, MemberDocument
+
+from apps.savings.models import SavingsAccount
+from .models import Member, NextOfKin, MemberDocument, MemberImport, MemberImportError
+
+User = get_user_model()
 
 class NextOfKinSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,4 +27,77 @@ class MemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = Member
         fields = '__all__'
-        read_only_fields = ['user', 'member_number', 'registration_date']
\ No newline at end of file
+        read_only_fields = ['user', 'member_number', 'registration_date']
+
+
+class MemberImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MemberImport
+        fields = [
+            'id', 'file', 'format', 'account_type', 'status', 'progress', 'total_rows', 'processed_rows',
+            'created_count', 'error_count', 'error_message', 'created_at', 'completed_at'
+        ]
+        read_only_fields = fields
+
+
+class MemberImportErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MemberImportError
+        fields = ['row_number', 'errors']
+
+
+class MemberImportRequestSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=[choice for choice, _ in MemberImport.FORMAT_CHOICES], required=False)
+    account_type = serializers.ChoiceField(
+        choices=[choice for choice, _ in SavingsAccount.ACCOUNT_TYPES], default='REGULAR'
+    )
+
+    def validate(self, attrs):
+        if 'format' not in attrs:
+            # Fall back to the file extension
+            extension = attrs['file'].name.rsplit('.', 1)[-1].upper()
+            if extension not in dict(MemberImport.FORMAT_CHOICES):
+                raise serializers.ValidationError({'format': 'Upload a .csv or .xlsx file or give the format'})
+            attrs['format'] = extension
+        return attrs
+
+
+class MemberImportRowSerializer(serializers.Serializer):
+    """One spreadsheet row: the member, their user account and an optional next of kin."""
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=50)
+    last_name = serializers.CharField(max_length=50)
+    phone_number = serializers.CharField(max_length=17, validators=[User.phone_regex])
+    national_id = serializers.CharField(max_length=20)
+    gender = serializers.ChoiceField(choices=User.GENDER_CHOICES, required=False)
+    date_of_birth = serializers.DateField()
+    marital_status = serializers.ChoiceField(choices=Member.MARITAL_STATUS_CHOICES)
+    employment_status = serializers.ChoiceField(choices=Member.EMPLOYMENT_STATUS_CHOICES)
+    occupation = serializers.CharField(max_length=100)
+    monthly_income = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0'))
+    physical_address = serializers.CharField()
+    postal_address = serializers.CharField(max_length=100, required=False)
+    city = serializers.CharField(max_length=100)
+    district = serializers.CharField(max_length=100)
+    membership_type = serializers.ChoiceField(choices=Member.MEMBER_TYPES, default='INDIVIDUAL')
+
+    kin_full_name = serializers.CharField(max_length=100, required=False)
+    kin_relationship = serializers.ChoiceField(choices=NextOfKin.RELATIONSHIP_CHOICES, required=False)
+    kin_phone_number = serializers.CharField(max_length=15, required=False)
+    kin_email = serializers.EmailField(required=False)
+    kin_physical_address = serializers.CharField(required=False)
+    kin_national_id = serializers.CharField(max_length=20, required=False)
+    kin_percentage_share = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('100'), default=Decimal('100')
+    )
+
+    KIN_REQUIRED = ['kin_relationship', 'kin_phone_number', 'kin_physical_address', 'kin_national_id']
+
+    def validate(self, attrs):
+        if 'kin_full_name' in attrs:
+            missing = {field: ['Required when kin_full_name is given.'] for field in self.KIN_REQUIRED
+                       if field not in attrs}
+            if missing:
+                raise serializers.ValidationError(missing)
+        return attrs
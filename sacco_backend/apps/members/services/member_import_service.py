@@ -0,0 +1,314 @@
+# apps/members/services/member_import_service.py
+import csv
+import io
+import logging
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.savings.models import SavingsAccount
+from apps.savings.services.account_service import SavingsAccountService
+from apps.savings.services.rate_table import InterestRateTable
+from ..models import Member, MemberImport, MemberImportError, NextOfKin
+from ..serializers import MemberImportRowSerializer
+from .member_service import MemberService
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class MemberImportService:
+    """Registers members in bulk from a CSV or XLSX upload.
+
+    The file is streamed row by row (openpyxl in read-only mode for XLSX)
+    and handled in chunks: each chunk is validated, checked for clashes
+    with existing users and earlier rows, and its users, members, next of
+    kin and savings accounts are bulk-created in one transaction with
+    member and account numbers reserved up front. Rejected rows are stored
+    as MemberImportError rows, so a corrected file can be re-imported:
+    members already created come back as duplicates rather than twice.
+    """
+    FORMATS = ('CSV', 'XLSX')
+    CHUNK_SIZE = 500
+    # Unique user and member fields checked against the database and the file
+    UNIQUE_FIELDS = ('email', 'phone_number', 'national_id')
+
+    @staticmethod
+    def create(file, format: str, account_type: str = 'REGULAR', created_by=None) -> MemberImport:
+        return MemberImport.objects.create(
+            file=file, format=format.upper(), account_type=account_type, created_by=created_by
+        )
+
+    @staticmethod
+    def run(import_id: int) -> MemberImport:
+        # Claiming with a conditional UPDATE makes a repeated task delivery a no-op
+        claimed = MemberImport.objects.filter(pk=import_id, status='PENDING').update(
+            status='PROCESSING', progress=0, updated_at=timezone.now()
+        )
+        job = MemberImport.objects.get(pk=import_id)
+        if not claimed:
+            return job
+
+        try:
+            if InterestRateTable.minimum_balance(job.account_type) is None:
+                raise ValueError(f"No interest rate is configured for {job.account_type} accounts")
+
+            MemberImportService._update(job, total_rows=MemberImportService._count_rows(job))
+            role, _ = Role.objects.get_or_create(name='MEMBER')
+            seen = {field: set() for field in MemberImportService.UNIQUE_FIELDS}
+            rows = MemberImportService._rows(job)
+            while True:
+                chunk = list(islice(rows, MemberImportService.CHUNK_SIZE))
+                if not chunk:
+                    break
+                created, errors = MemberImportService._import_chunk(job, chunk, role, seen)
+                MemberImportService._record(job, len(chunk), created, errors)
+        except Exception as e:
+            logger.error(f"Member import {job.id} failed: {str(e)}")
+            MemberImportService._update(job, status='FAILED', error_message=str(e), completed_at=timezone.now())
+            return job
+
+        MemberImportService._update(job, status='COMPLETED', progress=100, completed_at=timezone.now())
+        return job
+
+    @staticmethod
+    def _import_chunk(job: MemberImport, chunk: List[Tuple[int, dict]], role: Role,
+                      seen: Dict[str, Set[str]]) -> Tuple[int, List[MemberImportError]]:
+        valid, errors = [], {}
+        for row_number, row in chunk:
+            serializer = MemberImportRowSerializer(data=row)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                data['email'] = User.objects.normalize_email(data['email'])
+                valid.append((row_number, data))
+            else:
+                errors[row_number] = serializer.errors
+
+        valid = MemberImportService._reject_duplicates(valid, seen, errors)
+        if valid:
+            try:
+                with transaction.atomic():
+                    MemberImportService._create(job, [data for _, data in valid], role)
+            except IntegrityError as e:
+                # Lost a race with a registration made while the chunk was checked
+                for row_number, _ in valid:
+                    errors[row_number] = {'non_field_errors': [f"Could not be saved: {str(e)}"]}
+                valid = []
+
+        # Only saved rows make later rows duplicates
+        for _, data in valid:
+            for field in MemberImportService.UNIQUE_FIELDS:
+                seen[field].add(data[field])
+
+        row_errors = [
+            MemberImportError(member_import=job, row_number=row_number, errors=row_error)
+            for row_number, row_error in sorted(errors.items())
+        ]
+        MemberImportError.objects.bulk_create(row_errors)
+        return len(valid), row_errors
+
+    @staticmethod
+    def _reject_duplicates(valid: list, seen: Dict[str, Set[str]], errors: dict) -> list:
+        """Drop rows clashing with existing users or members, or with earlier accepted rows of the file."""
+        taken = {}
+        for field in MemberImportService.UNIQUE_FIELDS:
+            values = [data[field] for _, data in valid]
+            taken[field] = set(User.objects.filter(**{f'{field}__in': values}).values_list(field, flat=True))
+        taken['national_id'] |= set(
+            Member.objects.filter(national_id__in=[data['national_id'] for _, data in valid])
+            .values_list('national_id', flat=True)
+        )
+
+        accepted, chunk = [], {field: set() for field in MemberImportService.UNIQUE_FIELDS}
+        for row_number, data in valid:
+            clashes = {}
+            for field in MemberImportService.UNIQUE_FIELDS:
+                if data[field] in taken[field]:
+                    clashes[field] = ['Already registered.']
+                elif data[field] in seen[field] or data[field] in chunk[field]:
+                    clashes[field] = ['Duplicates an earlier row.']
+            if clashes:
+                errors[row_number] = clashes
+                continue
+            for field in MemberImportService.UNIQUE_FIELDS:
+                chunk[field].add(data[field])
+            accepted.append((row_number, data))
+        return accepted
+
+    @staticmethod
+    def _create(job: MemberImport, rows: List[dict], role: Role) -> None:
+        users = []
+        for data in rows:
+            user = User(
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                phone_number=data['phone_number'],
+                national_id=data['national_id'],
+                gender=data.get('gender'),
+                date_of_birth=data['date_of_birth'],
+                role=role
+            )
+            # Members set a password through the reset flow; hashing one per row would dominate the import
+            user.set_unusable_password()
+            users.append(user)
+        users = User.objects.bulk_create(users)
+
+        member_numbers = MemberService.allocate_member_numbers(len(rows))
+        members = Member.objects.bulk_create([
+            Member(
+                user=user,
+                member_number=member_number,
+                membership_number=f"SACCO{member_number}",
+                date_of_birth=data['date_of_birth'],
+                marital_status=data['marital_status'],
+                employment_status=data['employment_status'],
+                occupation=data['occupation'],
+                monthly_income=data['monthly_income'],
+                physical_address=data['physical_address'],
+                postal_address=data.get('postal_address'),
+                city=data['city'],
+                district=data['district'],
+                national_id=data['national_id'],
+                membership_type=data['membership_type']
+            )
+            for user, member_number, data in zip(users, member_numbers, rows)
+        ])
+
+        NextOfKin.objects.bulk_create([
+            NextOfKin(
+                member=member,
+                full_name=data['kin_full_name'],
+                relationship=data['kin_relationship'],
+                phone_number=data['kin_phone_number'],
+                email=data.get('kin_email'),
+                physical_address=data['kin_physical_address'],
+                national_id=data['kin_national_id'],
+                percentage_share=data['kin_percentage_share']
+            )
+            for member, data in zip(members, rows) if 'kin_full_name' in data
+        ])
+
+        account_numbers = SavingsAccountService.allocate_account_numbers(len(rows))
+        accounts = SavingsAccount.objects.bulk_create([
+            SavingsAccount(
+                member=member,
+                account_number=account_number,
+                account_type=job.account_type,
+                balance=0,
+                interest_rate=InterestRateTable.resolve(job.account_type, 0) or 0,
+                status='ACTIVE',
+                minimum_balance=SavingsAccountService.MINIMUM_BALANCE
+            )
+            for member, account_number in zip(members, account_numbers)
+        ])
+        for member, account in zip(members, accounts):
+            member.savings_account = account
+        Member.objects.bulk_update(members, ['savings_account'])
+
+    @staticmethod
+    def _rows(job: MemberImport) -> Iterator[Tuple[int, dict]]:
+        """Yield (row number, {column: value}) with blank cells dropped; row 1 is the header."""
+        with default_storage.open(job.file.name, 'rb') as source:
+            if job.format == 'CSV':
+                records = csv.reader(io.TextIOWrapper(source, encoding='utf-8-sig', newline=''))
+            else:
+                # Optional dependency: only needed when XLSX is uploaded
+                import openpyxl
+
+                workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+                records = workbook.active.iter_rows(values_only=True)
+
+            header = [str(column or '').strip().lower() for column in next(records, [])]
+            for row_number, record in enumerate(records, start=2):
+                row = {
+                    column: MemberImportService._cell(value)
+                    for column, value in zip(header, record) if column
+                }
+                row = {column: value for column, value in row.items() if value != ''}
+                if row:
+                    yield row_number, row
+
+    @staticmethod
+    def _cell(value) -> str:
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            value = value.date()
+        if isinstance(value, date):
+            return value.isoformat()
+        return str(value).strip()
+
+    @staticmethod
+    def _count_rows(job: MemberImport) -> Optional[int]:
+        if job.format == 'XLSX':
+            import openpyxl
+
+            with default_storage.open(job.file.name, 'rb') as source:
+                # Read-only sheets report their size from the dimension record without loading rows
+                max_row = openpyxl.load_workbook(source, read_only=True).active.max_row
+            return max(max_row - 1, 0) if max_row else None
+
+        with default_storage.open(job.file.name, 'rb') as source:
+            return max(sum(1 for _ in source) - 1, 0)
+
+    @staticmethod
+    def _record(job: MemberImport, processed: int, created: int, errors: list) -> None:
+        MemberImport.objects.filter(pk=job.pk).update(
+            processed_rows=F('processed_rows') + processed,
+            created_count=F('created_count') + created,
+            error_count=F('error_count') + len(errors),
+            updated_at=timezone.now()
+        )
+        job.processed_rows += processed
+        job.created_count += created
+        job.error_count += len(errors)
+        if job.total_rows:
+            MemberImportService._update(job, progress=min(99, 100 * job.processed_rows // job.total_rows))
+        else:
+            MemberImportService._push(job)
+
+    @staticmethod
+    def _update(job: MemberImport, **fields) -> None:
+        for name, value in fields.items():
+            setattr(job, name, value)
+        MemberImport.objects.filter(pk=job.pk).update(updated_at=timezone.now(), **fields)
+        MemberImportService._push(job)
+
+    @staticmethod
+    def _push(job: MemberImport) -> None:
+        channel_layer = get_channel_layer()
+        if channel_layer is None or job.created_by_id is None:
+            return
+
+        # Progress is also on the row, so a lost push only delays subscribers
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f"notifications_{job.created_by_id}",
+                {'type': 'notify', 'data': MemberImportService.progress_event(job)}
+            )
+        except Exception as e:
+            logger.warning(f"Could not push progress for member import {job.id}: {str(e)}")
+
+    @staticmethod
+    def progress_event(job: MemberImport) -> dict:
+        return {
+            'event': 'member_import.progress',
+            'import_id': job.id,
+            'status': job.status,
+            'progress': job.progress,
+            'processed_rows': job.processed_rows,
+            'created_count': job.created_count,
+            'error_count': job.error_count,
+            'error': job.error_message
+        }
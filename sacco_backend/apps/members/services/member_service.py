@@ -1,16 +1,35 @@
 from django.db import transaction
+from apps.sequences.services.sequence_service import NumberSequenceService
 from ..models import Member, NextOfKin, MemberDocument
 from datetime import datetime
-import uuid
 
 
 class MemberService:
     @staticmethod
     def generate_member_number():
         """Generate unique member number"""
+        return MemberService.allocate_member_numbers(1)[0]
+
+    @staticmethod
+    def allocate_member_numbers(count):
+        """Reserve ``count`` consecutive member numbers"""
         year = datetime.now().year
-        random_suffix = uuid.uuid4().hex[:6].upper()
-        return f"M{year}{random_suffix}"
+        numbers = NumberSequenceService.allocate(
+            f"members.member_number.{year}", count, start=lambda: MemberService._member_number_seed(year)
+        )
+        return [f"M{year}{str(number).zfill(6)}" for number in numbers]
+
+    @staticmethod
+    def _member_number_seed(year):
+        """First sequence value past numbers issued this year before the sequence existed.
+
+        Those were M<year> plus six random hex characters; only all-digit
+        suffixes can collide with sequence numbers.
+        """
+        suffixes = Member.objects.filter(
+            member_number__regex=rf'^M{year}[0-9]{{6}}$'
+        ).values_list('member_number', flat=True)
+        return max((int(number[-6:]) for number in suffixes), default=0) + 1
 
     @staticmethod
     @transaction.atomic
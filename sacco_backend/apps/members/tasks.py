@@ -0,0 +1,10 @@
+# apps/members/tasks.py
+from celery import shared_task
+
+from apps.members.services.member_import_service import MemberImportService
+
+
+@shared_task
+def import_members(import_id):
+    job = MemberImportService.run(import_id)
+    return {'import_id': job.id, 'status': job.status, 'created': job.created_count, 'errors': job.error_count}
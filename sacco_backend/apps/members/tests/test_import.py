@@ -0,0 +1,233 @@
+import csv
+import io
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import xlsxwriter
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Role
+from apps.members.models import Member, MemberImport, NextOfKin
+from apps.members.services.member_import_service import MemberImportService
+from apps.members.tasks import import_members
+from apps.savings.models import InterestRate, SavingsAccount
+from apps.savings.services.rate_table import InterestRateTable
+
+User = get_user_model()
+
+COLUMNS = [
+    'email', 'first_name', 'last_name', 'phone_number', 'national_id', 'date_of_birth', 'marital_status',
+    'employment_status', 'occupation', 'monthly_income', 'physical_address', 'city', 'district',
+    'kin_full_name', 'kin_relationship', 'kin_phone_number', 'kin_physical_address', 'kin_national_id'
+]
+
+
+def member_row(n, **overrides):
+    row = {
+        'email': f'staff{n}@employer.example.com',
+        'first_name': 'Staff',
+        'last_name': f'Member{n}',
+        'phone_number': f'+2567010{n:05d}',
+        'national_id': f'IMPORT{n:05d}',
+        'date_of_birth': '1990-04-01',
+        'marital_status': 'SINGLE',
+        'employment_status': 'EMPLOYED',
+        'occupation': 'Clerk',
+        'monthly_income': '850000',
+        'physical_address': 'Plot 1, Industrial Area',
+        'city': 'Kampala',
+        'district': 'Central',
+        'kin_full_name': '',
+        'kin_relationship': '',
+        'kin_phone_number': '',
+        'kin_physical_address': '',
+        'kin_national_id': ''
+    }
+    row.update(overrides)
+    return [row[column] for column in COLUMNS]
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+)
+class MemberImportServiceTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='onboarding@example.com',
+            password='testpass123',
+            first_name='Onboarding',
+            last_name='Admin',
+            role=Role.objects.create(name='ADMIN'),
+            phone_number='+256700000120',
+            national_id='ONBOARD1'
+        )
+        InterestRate.objects.create(
+            account_type='REGULAR', minimum_balance=Decimal('0'), rate=Decimal('3.00'), effective_date=date(2024, 1, 1)
+        )
+        # Test rollbacks do not fire model signals
+        self.addCleanup(InterestRateTable.invalidate)
+
+    def _csv(self, rows):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+        return ContentFile(output.getvalue().encode(), name='members.csv')
+
+    def _import(self, upload, format='CSV'):
+        job = MemberImportService.create(upload, format, created_by=self.admin)
+        import_members(job.id)
+        job.refresh_from_db()
+        return job
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        User.objects.create_user(
+            email='existing@example.com', password='x', first_name='Existing', last_name='User',
+            phone_number='+256700000121', national_id='IMPORT00005'
+        )
+        rows = [
+            member_row(1, kin_full_name='Jane Kin', kin_relationship='SPOUSE', kin_phone_number='+256700000999',
+                       kin_physical_address='Plot 1', kin_national_id='KIN00001'),
+            member_row(2),
+            member_row(4, email='staff2@employer.example.com'),
+            member_row(3, date_of_birth='01/04/1990'),
+            member_row(5),
+            member_row(6, kin_full_name='Half Kin'),
+            member_row(7),
+        ]
+
+        with patch.object(MemberImportService, 'CHUNK_SIZE', 3):
+            job = self._import(self._csv(rows))
+
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual((job.total_rows, job.processed_rows, job.progress), (7, 7, 100))
+        self.assertEqual((job.created_count, job.error_count), (3, 4))
+
+        errors = {error.row_number: error.errors for error in job.row_errors.all()}
+        self.assertEqual(sorted(errors), [4, 5, 6, 7])
+        self.assertEqual(errors[4], {'email': ['Duplicates an earlier row.']})
+        self.assertIn('date_of_birth', errors[5])
+        self.assertEqual(errors[6], {'national_id': ['Already registered.']})
+        self.assertIn('kin_relationship', errors[7])
+
+        members = Member.objects.filter(national_id__startswith='IMPORT').select_related('user', 'savings_account')
+        self.assertEqual(sorted(member.national_id for member in members), ['IMPORT00001', 'IMPORT00002', 'IMPORT00007'])
+        for member in members:
+            self.assertEqual(member.user.role.name, 'MEMBER')
+            self.assertFalse(member.user.has_usable_password())
+            self.assertEqual(member.membership_number, f'SACCO{member.member_number}')
+            self.assertEqual(member.savings_account.member_id, member.id)
+            self.assertEqual(member.savings_account.status, 'ACTIVE')
+            self.assertEqual(member.savings_account.interest_rate, Decimal('3.00'))
+        self.assertEqual(len({member.member_number for member in members}), 3)
+        self.assertEqual(SavingsAccount.objects.count(), 3)
+        self.assertEqual(list(NextOfKin.objects.values_list('member__national_id', 'full_name')),
+                         [('IMPORT00001', 'Jane Kin')])
+
+    def test_reimporting_reports_duplicates(self):
+        upload = self._csv([member_row(n) for n in range(1, 4)])
+        self.assertEqual(self._import(upload).created_count, 3)
+
+        job = self._import(self._csv([member_row(n) for n in range(1, 4)]))
+
+        self.assertEqual((job.created_count, job.error_count), (0, 3))
+        self.assertEqual(Member.objects.count(), 3)
+
+    def test_only_saved_rows_make_later_rows_duplicates(self):
+        User.objects.create_user(
+            email='existing@example.com', password='x', first_name='Existing', last_name='User',
+            phone_number='+256700000121', national_id='EXISTING1'
+        )
+        create = MemberImportService._create
+        failures = [IntegrityError('UNIQUE constraint failed')]
+
+        def create_failing_once(*args):
+            if failures:
+                raise failures.pop()
+            return create(*args)
+
+        rows = [
+            member_row(1, email='existing@example.com'),
+            member_row(2, phone_number='+256701000001'),
+            member_row(2),
+            member_row(3),
+        ]
+        # The rejected first row does not block its phone number, and the rolled
+        # back first chunk does not block the second row being imported again
+        with patch.object(MemberImportService, 'CHUNK_SIZE', 2), \
+                patch.object(MemberImportService, '_create', side_effect=create_failing_once):
+            job = self._import(self._csv(rows))
+
+        self.assertEqual((job.created_count, job.error_count), (2, 2))
+        errors = {error.row_number: error.errors for error in job.row_errors.all()}
+        self.assertEqual(errors[2], {'email': ['Already registered.']})
+        self.assertIn('Could not be saved', errors[3]['non_field_errors'][0])
+        self.assertEqual(
+            sorted(Member.objects.values_list('national_id', flat=True)), ['IMPORT00002', 'IMPORT00003']
+        )
+
+    def test_imports_xlsx(self):
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output)
+        worksheet = workbook.add_worksheet()
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        worksheet.write_row(0, 0, COLUMNS)
+        for row_number, n in enumerate(range(1, 3), start=1):
+            row = member_row(n)
+            worksheet.write_row(row_number, 0, row)
+            # Spreadsheets hold dates and amounts as cells, not text
+            worksheet.write_datetime(row_number, COLUMNS.index('date_of_birth'), date(1988, 2, 29), date_format)
+            worksheet.write_number(row_number, COLUMNS.index('monthly_income'), 1200000)
+        workbook.close()
+
+        job = self._import(ContentFile(output.getvalue(), name='members.xlsx'), 'XLSX')
+
+        self.assertEqual((job.status, job.created_count, job.error_count), ('COMPLETED', 2, 0))
+        member = Member.objects.get(national_id='IMPORT00001')
+        self.assertEqual((member.date_of_birth, member.monthly_income), (date(1988, 2, 29), Decimal('1200000')))
+
+    def test_fails_without_rates_for_account_type(self):
+        job = MemberImportService.create(self._csv([member_row(1)]), 'CSV', account_type='FIXED')
+
+        MemberImportService.run(job.id)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.error_message, 'No interest rate is configured for FIXED accounts')
+        self.assertFalse(Member.objects.exists())
+
+    def test_import_endpoint_queues_job(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+
+        with patch('apps.members.views.import_members') as task, self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse('member-import-list'), {'file': self._csv([member_row(1)])})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data['status'], response.data['format']), ('PENDING', 'CSV'))
+        task.delay.assert_called_once_with(response.data['id'])
+
+        MemberImportService.run(response.data['id'])
+        response = client.get(reverse('member-import-errors', args=[response.data['id']]))
+        self.assertEqual((response.status_code, response.data['count']), (200, 0))
+
+    def test_import_endpoint_requires_manager(self):
+        clerk = User.objects.create_user(
+            email='clerk@example.com', password='x', first_name='Clerk', last_name='User',
+            role=Role.objects.create(name='MEMBER'), phone_number='+256700000122', national_id='CLERK1'
+        )
+        client = APIClient()
+        client.force_authenticate(user=clerk)
+
+        response = client.post(reverse('member-import-list'), {'file': self._csv([member_row(1)])})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(MemberImport.objects.exists())
@@ -2,7 +2,8 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from apps.authentication.models import Role
 from ..models import Member, NextOfKin, MemberDocument
-from datetime import date
+from ..services.member_service import MemberService
+from datetime import date, datetime
 from decimal import Decimal
 
 User = get_user_model()
@@ -80,4 +81,27 @@ class MemberModelTest(TestCase):
 
         self.assertEqual(document.member, member)
         self.assertEqual(document.document_type, 'ID')
-        self.assertFalse(document.is_verified)
\ No newline at end of file
+        self.assertFalse(document.is_verified)
+
+    def test_member_numbers_continue_past_legacy_numbers(self):
+        # Numbers issued before the sequence were M<year> plus six random hex characters
+        year = datetime.now().year
+        for n, member_number in enumerate([f'M{year}004219', f'M{year}00a9f3', f'M{year - 1}999999']):
+            user = User.objects.create_user(
+                email=f'legacy{n}@example.com',
+                password='testpass123',
+                role=self.role,
+                phone_number=f'+25670000100{n}',
+                national_id=f'LEGACY{n}'
+            )
+            Member.objects.create(**{
+                **self.member_data,
+                'user': user,
+                'member_number': member_number,
+                'membership_number': f'SACCO{member_number}',
+                'national_id': f'LEGACY{n}'
+            })
+
+        self.assertEqual(
+            MemberService.allocate_member_numbers(2), [f'M{year}004220', f'M{year}004221']
+        )
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MemberViewSet, NextOfKinViewSet
+from .views import MemberViewSet, NextOfKinViewSet, MemberImportViewSet
 
 router = DefaultRouter()
 router.register(r'members', MemberViewSet)
 router.register(r'next-of-kin', NextOfKinViewSet)
+router.register(r'member-imports', MemberImportViewSet, basename='member-import')
 
 urlpatterns = [
     path('', include(router.urls)),
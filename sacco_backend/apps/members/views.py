@@ -3,9 +3,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
-from .models import Member, NextOfKin, MemberDocument
-from .serializers import MemberSerializer, NextOfKinSerializer, MemberDocumentSerializer
+from .models import Member, NextOfKin, MemberDocument, MemberImport
+from .serializers import (
+    MemberSerializer, NextOfKinSerializer, MemberDocumentSerializer, MemberImportSerializer,
+    MemberImportErrorSerializer, MemberImportRequestSerializer
+)
+from .services.member_import_service import MemberImportService
 from .services.member_service import MemberService
+from .tasks import import_members
 
 
 class MemberViewSet(viewsets.ModelViewSet):
@@ -82,3 +87,36 @@ class NextOfKinViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return NextOfKin.objects.filter(member__user=self.request.user)
+
+
+class MemberImportViewSet(viewsets.ReadOnlyModelViewSet):
+    """Bulk member onboarding from CSV or XLSX uploads, processed in the background."""
+    serializer_class = MemberImportSerializer
+    permission_classes = [IsAuthenticated]
+    allowed_roles = ['MANAGER', 'ADMIN']
+
+    def get_queryset(self):
+        return MemberImport.objects.filter(created_by=self.request.user).order_by('-created_at')
+
+    def create(self, request):
+        if request.user.role.name not in self.allowed_roles:
+            return Response(
+                {'error': 'Not allowed to import members'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = MemberImportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Runs on a Celery worker; poll the import or listen on the notifications socket
+        with transaction.atomic():
+            job = MemberImportService.create(created_by=request.user, **serializer.validated_data)
+            transaction.on_commit(lambda: import_members.delay(job.id))
+
+        return Response(MemberImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        job = self.get_object()
+        page = self.paginate_queryset(job.row_errors.all())
+        return self.get_paginated_response(MemberImportErrorSerializer(page, many=True).data)
@@ -0,0 +1,30 @@
+# apps/notifications/outbox_handlers.py
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from apps.members.models import Member
+from apps.outbox.registry import register
+from .tasks import send_loan_disbursed_notification, send_transaction_notification
+
+
+@register('transaction.completed')
+def queue_transaction_notification(payload):
+    send_transaction_notification.delay(payload['transaction_id'])
+
+
+@register('transaction.completed')
+def push_transaction_update(payload):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    user_id = Member.objects.values_list('user_id', flat=True).get(id=payload['member_id'])
+    async_to_sync(channel_layer.group_send)(
+        f"notifications_{user_id}",
+        {'type': 'notify', 'data': {'event': 'transaction.completed', **payload}}
+    )
+
+
+@register('loan.disbursed')
+def queue_loan_disbursed_notification(payload):
+    send_loan_disbursed_notification.delay(payload['loan_id'])
@@ -21,6 +21,8 @@ class NotificationService:
         'sms': SMSChannel(),
         'push': PushChannel()
     }
+    TRANSACTION_TEMPLATE_CODE = 'TRANSACTION_ALERT'
+    LOAN_DISBURSED_TEMPLATE_CODE = 'LOAN_DISBURSED'
 
     @classmethod
     def send_notification(cls, member, template_code, context=None):
@@ -203,12 +205,12 @@ class NotificationService:
             )
 
     @classmethod
-    def send_transaction_notification(cls, _transaction: Transaction) -> None:
-        notification_data = {
-            'type': 'TRANSACTION',
-            'title': 'Transaction Alert',
-            'message': f"Transaction of {str(_transaction.amount)} processed",
-            'priority': 'NORMAL'
+    def send_transaction_notification(cls, _transaction: Transaction) -> Notification:
+        context = {
+            'transaction_ref': _transaction.transaction_ref,
+            'transaction_type': _transaction.get_transaction_type_display(),
+            'amount': _transaction.amount,
+            'status': _transaction.status
         }
 
-        cls.send_notification(_transaction.member, notification_data)
+        return cls.send_notification(_transaction.member, cls.TRANSACTION_TEMPLATE_CODE, context)
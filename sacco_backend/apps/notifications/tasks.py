@@ -0,0 +1,64 @@
+# apps/notifications/tasks.py
+import logging
+
+from celery import shared_task
+
+from apps.loans.models import Loan
+from apps.notifications.models import NotificationPreference, NotificationTemplate
+from apps.notifications.services.notification_service import NotificationService
+from apps.transactions.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _deliver(task, label, send):
+    try:
+        notification = send()
+    except (NotificationTemplate.DoesNotExist, NotificationPreference.DoesNotExist) as exc:
+        # Missing configuration will not fix itself on retry
+        logger.warning("Skipping notification for %s: %s", label, exc)
+        return None
+    except Exception as exc:
+        raise task.retry(exc=exc)
+
+    return notification.id
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_transaction_notification(self, transaction_id):
+    """Notify the member about a committed transaction.
+
+    Queued by the outbox relay once the posting has committed, so a slow
+    or failing channel never holds locks on, or rolls back, the financial
+    write.
+    """
+    try:
+        _transaction = Transaction.objects.select_related('member').get(pk=transaction_id)
+    except Transaction.DoesNotExist:
+        logger.warning("Transaction %s not found for notification", transaction_id)
+        return None
+
+    return _deliver(
+        self,
+        f"transaction {transaction_id}",
+        lambda: NotificationService.send_transaction_notification(_transaction)
+    )
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_loan_disbursed_notification(self, loan_id):
+    try:
+        loan = Loan.objects.select_related('member').get(pk=loan_id)
+    except Loan.DoesNotExist:
+        logger.warning("Loan %s not found for notification", loan_id)
+        return None
+
+    return _deliver(
+        self,
+        f"loan {loan_id}",
+        lambda: NotificationService.send_notification(
+            loan.member,
+            NotificationService.LOAN_DISBURSED_TEMPLATE_CODE,
+            {'reference': loan.reference, 'amount': loan.amount, 'next_payment_date': loan.next_payment_date}
+        )
+    )
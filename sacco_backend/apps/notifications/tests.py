@@ -1,3 +1,73 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.notifications.models import Notification, NotificationPreference, NotificationTemplate
+from apps.notifications.services.notification_service import NotificationService
+from apps.notifications.tasks import send_transaction_notification
+from apps.transactions.models import Transaction
+
+User = get_user_model()
+
+
+class TransactionNotificationTaskTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            email='notify@example.com',
+            password='testpass123',
+            first_name='Notify',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000010',
+            national_id='NOTIFY1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024NOTIFY',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Engineer',
+            monthly_income=Decimal('700000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='NOTIFY1',
+            membership_number='SACCOM2024NOTIFY',
+            membership_type='INDIVIDUAL'
+        )
+        self.transaction = Transaction.objects.create(
+            transaction_ref='TXN20240101NOTIFY',
+            member=self.member,
+            transaction_type='DEPOSIT',
+            amount=Decimal('50000'),
+            payment_method='CASH',
+            status='COMPLETED'
+        )
+
+    def test_renders_transaction_template(self):
+        NotificationTemplate.objects.create(
+            code=NotificationService.TRANSACTION_TEMPLATE_CODE,
+            title_template='Transaction Alert',
+            message_template='{{ transaction_type }} of {{ amount }} ({{ transaction_ref }})',
+            notification_type='TRANSACTION',
+            priority='MEDIUM',
+            channels=['sms']
+        )
+        NotificationPreference.objects.create(member=self.member)
+
+        notification_id = send_transaction_notification.apply(args=[self.transaction.id]).get()
+
+        notification = Notification.objects.get(pk=notification_id)
+        self.assertEqual(notification.message, 'Cash Deposit of 50000.00 (TXN20240101NOTIFY)')
+
+    def test_missing_template_is_skipped(self):
+        result = send_transaction_notification.apply(args=[self.transaction.id])
+
+        self.assertTrue(result.successful())
+        self.assertIsNone(result.get())
+        self.assertFalse(Notification.objects.exists())
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class OutboxConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.outbox'
+
+    def ready(self):
+        # Each app registers its topic handlers in an outbox_handlers module
+        autodiscover_modules('outbox_handlers')
@@ -0,0 +1,35 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """A side effect recorded in the same DB transaction as the change that caused it."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('DELIVERED', 'Delivered'),
+        ('FAILED', 'Failed')
+    ]
+
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The relay only ever scans pending rows
+            models.Index(
+                fields=['available_at', 'id'],
+                condition=Q(status='PENDING'),
+                name='outbox_pending_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.id} - {self.status}"
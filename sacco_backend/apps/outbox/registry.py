@@ -0,0 +1,17 @@
+# apps/outbox/registry.py
+from collections import defaultdict
+from typing import Callable
+
+_handlers: dict[str, list[Callable[[dict], None]]] = defaultdict(list)
+
+
+def register(topic: str):
+    """Register a handler called with the payload of every ``topic`` event."""
+    def decorator(handler):
+        _handlers[topic].append(handler)
+        return handler
+    return decorator
+
+
+def get_handlers(topic: str) -> list:
+    return list(_handlers.get(topic, ()))
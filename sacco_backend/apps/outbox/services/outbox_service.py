@@ -0,0 +1,102 @@
+import logging
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import OutboxEvent
+from ..registry import get_handlers
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxService:
+    BATCH_SIZE = 500
+    MAX_ATTEMPTS = 8
+    RETRY_BASE_SECONDS = 30
+
+    @staticmethod
+    def publish(topic: str, payload: Optional[dict] = None) -> OutboxEvent:
+        """Record an event; call inside the transaction that makes the change."""
+        return OutboxEvent.objects.create(topic=topic, payload=payload or {})
+
+    @staticmethod
+    def publish_many(events: Iterable[tuple[str, dict]]) -> list[OutboxEvent]:
+        return OutboxEvent.objects.bulk_create([
+            OutboxEvent(topic=topic, payload=payload or {})
+            for topic, payload in events
+        ])
+
+    @staticmethod
+    def relay_batch(batch_size: Optional[int] = None) -> dict:
+        """Claim up to ``batch_size`` due events and run their handlers.
+
+        Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several
+        relay workers can drain the table concurrently. Delivery is
+        at-least-once: a crash before commit leaves the batch pending, so
+        handlers must tolerate repeats.
+        """
+        batch_size = batch_size or OutboxService.BATCH_SIZE
+        now = timezone.now()
+        summary = {'claimed': 0, 'delivered': 0, 'retried': 0, 'failed': 0}
+
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                    status='PENDING',
+                    available_at__lte=now
+                ).order_by('available_at', 'id')[:batch_size]
+            )
+            summary['claimed'] = len(events)
+
+            for event in events:
+                event.attempts += 1
+                try:
+                    OutboxService._dispatch(event)
+                except Exception as e:
+                    logger.warning("Outbox event %s (%s) failed: %s", event.id, event.topic, e)
+                    event.last_error = str(e)
+                    if event.attempts >= OutboxService.MAX_ATTEMPTS:
+                        event.status = 'FAILED'
+                        event.processed_at = now
+                        summary['failed'] += 1
+                    else:
+                        event.available_at = now + OutboxService._retry_delay(event.attempts)
+                        summary['retried'] += 1
+                else:
+                    event.status = 'DELIVERED'
+                    event.last_error = ''
+                    event.processed_at = now
+                    summary['delivered'] += 1
+
+            OutboxEvent.objects.bulk_update(
+                events,
+                ['status', 'attempts', 'last_error', 'available_at', 'processed_at']
+            )
+
+        return summary
+
+    @staticmethod
+    def prune(older_than_days: int = 7) -> int:
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        deleted, _ = OutboxEvent.objects.filter(
+            status='DELIVERED',
+            processed_at__lt=cutoff
+        ).delete()
+        return deleted
+
+    @staticmethod
+    def _dispatch(event: OutboxEvent) -> None:
+        handlers = get_handlers(event.topic)
+        if not handlers:
+            raise LookupError(f"No outbox handler registered for {event.topic}")
+
+        # A savepoint keeps a failing handler from poisoning the whole batch
+        with transaction.atomic():
+            for handler in handlers:
+                handler(event.payload)
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> timedelta:
+        return timedelta(seconds=OutboxService.RETRY_BASE_SECONDS * 2 ** (attempts - 1))
@@ -0,0 +1,21 @@
+# apps/outbox/tasks.py
+from celery import shared_task
+
+from apps.outbox.services.outbox_service import OutboxService
+
+
+@shared_task
+def relay_outbox_events(max_batches=20):
+    """Drain due outbox events, stopping once a batch comes back short."""
+    delivered = 0
+    for _ in range(max_batches):
+        summary = OutboxService.relay_batch()
+        delivered += summary['delivered']
+        if summary['claimed'] < OutboxService.BATCH_SIZE:
+            break
+    return delivered
+
+
+@shared_task
+def prune_outbox_events():
+    return OutboxService.prune()
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.outbox import registry
+from apps.outbox.models import OutboxEvent
+from apps.outbox.services.outbox_service import OutboxService
+
+
+class OutboxRelayTest(TestCase):
+    def setUp(self):
+        self.received = []
+        self.failures = 0
+
+        handlers = patch.dict(registry._handlers, {
+            'test.ok': [self.received.append],
+            'test.flaky': [self._flaky]
+        })
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def _flaky(self, payload):
+        if self.failures < 1:
+            self.failures += 1
+            raise RuntimeError('broker unavailable')
+        self.received.append(payload)
+
+    def test_relay_delivers_pending_events_in_order(self):
+        OutboxService.publish_many([('test.ok', {'n': n}) for n in range(3)])
+
+        summary = OutboxService.relay_batch()
+
+        self.assertEqual(summary, {'claimed': 3, 'delivered': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual(self.received, [{'n': 0}, {'n': 1}, {'n': 2}])
+        self.assertFalse(OutboxEvent.objects.filter(status='PENDING').exists())
+
+        # Delivered events are not picked up again
+        self.assertEqual(OutboxService.relay_batch()['claimed'], 0)
+
+    def test_failed_handler_is_retried_with_backoff(self):
+        event = OutboxService.publish('test.flaky', {'loan_id': 1})
+
+        summary = OutboxService.relay_batch()
+        event.refresh_from_db()
+
+        self.assertEqual(summary['retried'], 1)
+        self.assertEqual(event.status, 'PENDING')
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, 'broker unavailable')
+        self.assertGreater(event.available_at, timezone.now())
+
+        # Not due yet
+        self.assertEqual(OutboxService.relay_batch()['claimed'], 0)
+
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        OutboxService.relay_batch()
+        event.refresh_from_db()
+
+        self.assertEqual(event.status, 'DELIVERED')
+        self.assertEqual(self.received, [{'loan_id': 1}])
+
+    def test_unhandled_topic_fails_after_max_attempts(self):
+        event = OutboxService.publish('test.unknown')
+        OutboxEvent.objects.filter(pk=event.pk).update(attempts=OutboxService.MAX_ATTEMPTS - 1)
+
+        summary = OutboxService.relay_batch()
+        event.refresh_from_db()
+
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(event.status, 'FAILED')
+        self.assertIn('No outbox handler', event.last_error)
+
+    def test_batch_size_limits_claim(self):
+        OutboxService.publish_many([('test.ok', {'n': n}) for n in range(5)])
+
+        self.assertEqual(OutboxService.relay_batch(batch_size=2)['claimed'], 2)
+        self.assertEqual(OutboxEvent.objects.filter(status='PENDING').count(), 3)
+
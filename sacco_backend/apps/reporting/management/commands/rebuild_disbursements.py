@@ -0,0 +1,41 @@
+# apps/reporting/management/commands/rebuild_disbursements.py
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.loans.models import Loan
+from apps.reporting.services.portfolio_snapshot_service import PortfolioSnapshotService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily loan disbursement totals from the loans. Run once after deploying "
+        "the disbursement tables to backfill history; by default every day from the first "
+        "disbursement to today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD), default today')
+
+    def handle(self, *args, **options):
+        start = options['start']
+        if start is None:
+            first = Loan.objects.aggregate(first=Min('disbursement_date'))['first']
+            if first is None:
+                self.stdout.write("No disbursed loans")
+                return
+            start = timezone.localdate(first)
+        end = options['end'] or timezone.localdate()
+        if end < start:
+            raise CommandError("--end must not be before --start")
+
+        day, rows = start, 0
+        while day <= end:
+            rows += PortfolioSnapshotService.rebuild_disbursements(day)
+            day += timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {(end - start).days + 1} days of disbursements ({rows} rows)"
+        ))
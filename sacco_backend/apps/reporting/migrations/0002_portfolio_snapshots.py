@@ -0,0 +1,54 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanDisbursementDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('loan_type', models.CharField(max_length=50)),
+                ('loan_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+            ],
+            options={
+                'ordering': ['date', 'loan_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoanPortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('loan_type', models.CharField(max_length=50)),
+                ('status_counts', models.JSONField(default=dict)),
+                ('active_loans', models.IntegerField(default=0)),
+                ('outstanding_principal', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('par_1_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('par_30_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('par_60_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('par_90_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['snapshot_date', 'loan_type'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='loanportfoliosnapshot',
+            constraint=models.UniqueConstraint(fields=('snapshot_date', 'loan_type'), name='unique_portfolio_snapshot'),
+        ),
+        migrations.AddConstraint(
+            model_name='loandisbursementdaily',
+            constraint=models.UniqueConstraint(fields=('date', 'loan_type'), name='unique_disbursement_daily'),
+        ),
+    ]
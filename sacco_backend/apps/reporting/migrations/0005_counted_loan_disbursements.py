@@ -0,0 +1,22 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0008_loan_disbursement_batch_skipped_count'),
+        ('reporting', '0004_report_schedule_lease_and_datasets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountedLoanDisbursement',
+            fields=[
+                ('loan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='loans.loan')),
+                ('date', models.DateField()),
+            ],
+        ),
+    ]
@@ -24,11 +24,14 @@ class Report(AuditMixin):
     name = models.CharField(max_length=100)
     parameters = models.JSONField(default=dict)
     file = models.FileField(upload_to='reports/', null=True)
-    format = models.CharField(max_length=10)  # PDF, XLSX, CSV
+    format = models.CharField(max_length=10)  # PDF, XLSX, CSV, JSONL
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     start_date = models.DateField()
     end_date = models.DateField()
     error_message = models.TextField(null=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True)
+    dataset = models.ForeignKey('ReportDataset', on_delete=models.SET_NULL, null=True, related_name='reports')
 
     class Meta:
         indexes = [
@@ -54,6 +57,7 @@ class ReportSchedule(AuditMixin):
     is_active = models.BooleanField(default=True)
     last_run = models.DateTimeField(null=True)
     next_run = models.DateTimeField()
+    lease_expires_at = models.DateTimeField(null=True)
 
     class Meta:
         indexes = [
@@ -61,4 +65,73 @@ class ReportSchedule(AuditMixin):
         ]
 
     def __str__(self):
-        return f'{self.report_type} - {self.frequency}'
\ No newline at end of file
+        return f'{self.report_type} - {self.frequency}'
+
+
+class ReportDataset(models.Model):
+    """One computed export, shared by every report with the same type, period, format and parameters."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('GENERATING', 'Generating'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed')
+    ]
+
+    key = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    file = models.FileField(upload_to='reports/', null=True)
+    lease_expires_at = models.DateTimeField(null=True)
+    completed_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.key
+
+class LoanPortfolioSnapshot(models.Model):
+    """Position of one loan product at the start of ``snapshot_date``."""
+    snapshot_date = models.DateField()
+    loan_type = models.CharField(max_length=50)
+    status_counts = models.JSONField(default=dict)
+    active_loans = models.IntegerField(default=0)
+    outstanding_principal = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    outstanding_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    par_1_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    par_30_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    par_60_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    par_90_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['snapshot_date', 'loan_type']
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot_date', 'loan_type'], name='unique_portfolio_snapshot')
+        ]
+
+    def __str__(self):
+        return f'{self.snapshot_date} - {self.loan_type}'
+
+
+class LoanDisbursementDaily(models.Model):
+    """Loans disbursed per product per day, kept current as disbursements happen."""
+    date = models.DateField()
+    loan_type = models.CharField(max_length=50)
+    loan_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['date', 'loan_type']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'loan_type'], name='unique_disbursement_daily')
+        ]
+
+    def __str__(self):
+        return f'{self.date} - {self.loan_type}'
+
+
+class CountedLoanDisbursement(models.Model):
+    """Loans already added to LoanDisbursementDaily, so a redelivered event is not counted twice."""
+    loan = models.OneToOneField('loans.Loan', on_delete=models.CASCADE, primary_key=True, related_name='+')
+    date = models.DateField()
+
+    def __str__(self):
+        return f'{self.date} - {self.loan_id}'
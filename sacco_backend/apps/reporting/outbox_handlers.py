@@ -0,0 +1,19 @@
+# apps/reporting/outbox_handlers.py
+from datetime import date
+from decimal import Decimal
+
+from apps.outbox.registry import register
+from .services.portfolio_snapshot_service import PortfolioSnapshotService
+
+
+@register('loan.disbursed')
+def record_loan_disbursement(payload):
+    # Older events carry no totals; the nightly capture rebuilds their day
+    if 'disbursed_on' not in payload:
+        return
+    PortfolioSnapshotService.record_disbursement(
+        payload['loan_id'],
+        payload['loan_type'],
+        Decimal(payload['amount']),
+        date.fromisoformat(payload['disbursed_on'])
+    )
@@ -7,7 +7,19 @@ class ReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
         fields = '__all__'
-        read_only_fields = ['file', 'status', 'error_message']
+        read_only_fields = ['file', 'status', 'error_message', 'progress', 'completed_at']
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("Start date must be before end date")
+        return data
+
+
+class ReportRequestSerializer(serializers.Serializer):
+    report_type = serializers.ChoiceField(choices=['FINANCIAL', 'TRANSACTION'])
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    format = serializers.ChoiceField(choices=['CSV', 'XLSX', 'JSONL'], default='XLSX')
 
     def validate(self, data):
         if data['start_date'] > data['end_date']:
@@ -0,0 +1,177 @@
+# apps/reporting/services/portfolio_snapshot_service.py
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.delinquency_service import DelinquencyService
+from apps.reporting.models import CountedLoanDisbursement, LoanDisbursementDaily, LoanPortfolioSnapshot
+
+SNAPSHOT_FIELDS = [
+    'status_counts', 'active_loans', 'outstanding_principal', 'outstanding_balance',
+    'par_1_amount', 'par_30_amount', 'par_60_amount', 'par_90_amount'
+]
+
+
+class PortfolioSnapshotService:
+    """Maintains the per-product portfolio tables that reports and dashboards read.
+
+    ``capture`` scans the loan book once a night with grouped queries;
+    disbursement totals are also bumped as loans are disbursed, so reading
+    a date range costs one row per day and product rather than a pass
+    over every loan.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def capture(snapshot_date: Optional[date] = None) -> dict:
+        """Snapshot the portfolio as at the start of ``snapshot_date`` (default today).
+
+        Re-running for the same date replaces that day's rows. The previous
+        day's disbursement totals are rebuilt from the loans as well, which
+        corrects any event that was delivered twice or not at all.
+        """
+        snapshot_date = snapshot_date or timezone.localdate()
+        zero = Value(Decimal('0'))
+        snapshots = {}
+
+        def snapshot(loan_type):
+            if loan_type not in snapshots:
+                snapshots[loan_type] = LoanPortfolioSnapshot(snapshot_date=snapshot_date, loan_type=loan_type)
+            return snapshots[loan_type]
+
+        status_counts = Loan.objects.values('loan_type', 'status').annotate(total=Count('id')).order_by()
+        for row in status_counts:
+            snapshot(row['loan_type']).status_counts[row['status']] = row['total']
+
+        aged = DelinquencyService.aged_loans(snapshot_date).values('loan_type').annotate(
+            active=Count('id'),
+            outstanding=Coalesce(Sum('outstanding_balance'), zero),
+            **DelinquencyService.par_aggregates(snapshot_date)
+        ).order_by()
+        for row in aged:
+            current = snapshot(row['loan_type'])
+            current.active_loans = row['active']
+            current.outstanding_balance = row['outstanding']
+            for days in DelinquencyService.PAR_BUCKETS:
+                setattr(current, f'par_{days}_amount', row[f'par_{days}'])
+
+        principal = LoanRepayment.objects.filter(
+            status__in=LoanRepayment.OPEN_STATUSES,
+            loan__status__in=DelinquencyService.ACTIVE_LOAN_STATUSES
+        ).values('loan__loan_type').annotate(
+            outstanding=Sum(F('principal_component') - F('principal_paid'))
+        ).order_by()
+        for row in principal:
+            snapshot(row['loan__loan_type']).outstanding_principal = row['outstanding']
+
+        LoanPortfolioSnapshot.objects.filter(snapshot_date=snapshot_date).exclude(
+            loan_type__in=list(snapshots)
+        ).delete()
+        LoanPortfolioSnapshot.objects.bulk_create(
+            snapshots.values(),
+            update_conflicts=True,
+            unique_fields=['snapshot_date', 'loan_type'],
+            update_fields=SNAPSHOT_FIELDS
+        )
+
+        disbursement_days = PortfolioSnapshotService.rebuild_disbursements(snapshot_date - timedelta(days=1))
+        return {
+            'snapshot_date': snapshot_date,
+            'products': len(snapshots),
+            'disbursement_rows': disbursement_days
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def record_disbursement(loan_id: int, loan_type: str, amount: Decimal, on_date: date) -> None:
+        """Add one disbursed loan to the day's running totals, once per loan.
+
+        The outbox delivers at least once, and a delivery can also arrive
+        after the nightly rebuild has counted the loan; both are no-ops.
+        """
+        _, created = CountedLoanDisbursement.objects.get_or_create(loan_id=loan_id, defaults={'date': on_date})
+        if not created:
+            return
+
+        LoanDisbursementDaily.objects.bulk_create(
+            [LoanDisbursementDaily(date=on_date, loan_type=loan_type)],
+            ignore_conflicts=True
+        )
+        LoanDisbursementDaily.objects.filter(date=on_date, loan_type=loan_type).update(
+            loan_count=F('loan_count') + 1,
+            amount=F('amount') + amount
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_disbursements(day: date) -> int:
+        """Recompute the disbursement totals for ``day`` from the loans themselves."""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        loans = Loan.objects.filter(
+            disbursement_date__gte=start,
+            disbursement_date__lt=start + timedelta(days=1)
+        )
+        totals = loans.values('loan_type').annotate(loans=Count('id'), total=Sum('amount')).order_by()
+
+        # Events for these loans that are still in the outbox must not count them again
+        CountedLoanDisbursement.objects.bulk_create(
+            [CountedLoanDisbursement(loan_id=loan_id, date=day) for loan_id in loans.values_list('id', flat=True)],
+            ignore_conflicts=True
+        )
+        LoanDisbursementDaily.objects.filter(date=day).delete()
+        created = LoanDisbursementDaily.objects.bulk_create([
+            LoanDisbursementDaily(date=day, loan_type=row['loan_type'], loan_count=row['loans'], amount=row['total'])
+            for row in totals
+        ])
+        return len(created)
+
+    @staticmethod
+    def portfolio(on_date: Optional[date] = None) -> dict:
+        """Latest snapshot on or before ``on_date``, by product and in total."""
+        latest = LoanPortfolioSnapshot.objects.all()
+        if on_date:
+            latest = latest.filter(snapshot_date__lte=on_date)
+        snapshot_date = latest.order_by('-snapshot_date').values_list('snapshot_date', flat=True).first()
+        if snapshot_date is None:
+            return {'snapshot_date': None, 'products': [], 'totals': {}}
+
+        products = []
+        totals = defaultdict(int)
+        status_counts = defaultdict(int)
+        for row in LoanPortfolioSnapshot.objects.filter(snapshot_date=snapshot_date):
+            product = {'loan_type': row.loan_type, **{field: getattr(row, field) for field in SNAPSHOT_FIELDS}}
+            product['par_ratios'] = PortfolioSnapshotService._par_ratios(product)
+            products.append(product)
+            for field in SNAPSHOT_FIELDS[1:]:
+                totals[field] += getattr(row, field)
+            for loan_status, count in row.status_counts.items():
+                status_counts[loan_status] += count
+
+        totals = dict(totals, status_counts=dict(status_counts))
+        totals['par_ratios'] = PortfolioSnapshotService._par_ratios(totals)
+        return {'snapshot_date': snapshot_date, 'products': products, 'totals': totals}
+
+    @staticmethod
+    def disbursements(start_date: date, end_date: date, loan_type: Optional[str] = None) -> list[dict]:
+        """Disbursed loans and amounts per day between the two dates, inclusive."""
+        rows = LoanDisbursementDaily.objects.filter(date__range=[start_date, end_date])
+        if loan_type:
+            rows = rows.filter(loan_type=loan_type)
+        return list(
+            rows.values('date').annotate(loan_count=Sum('loan_count'), amount=Sum('amount')).order_by('date')
+        )
+
+    @staticmethod
+    def _par_ratios(values: dict) -> dict:
+        balance = values['outstanding_balance']
+        return {
+            days: (values[f'par_{days}_amount'] / balance).quantize(Decimal('0.0001')) if balance else Decimal('0')
+            for days in DelinquencyService.PAR_BUCKETS
+        }
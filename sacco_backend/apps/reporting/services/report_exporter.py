@@ -1,29 +1,105 @@
-from typing import Dict, Any
+import csv
+import io
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Sequence
 
-import pandas as pd
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+
+@dataclass
+class ExportSection:
+    """A sheet (XLSX) or block of rows (CSV, JSON Lines) in an export."""
+    name: str
+    columns: Sequence[str]
+    rows: Iterable[Sequence[Any]]
 
 
 class ReportExporter:
+    """Writes reports row by row to a temporary file, then streams it to storage.
+
+    Rows are pulled lazily from each section, so a detail sheet backed by a
+    queryset iterator is never held in memory. XLSX uses xlsxwriter's
+    constant_memory mode, which flushes every row as it is written.
+    """
+    FORMATS = ('CSV', 'XLSX', 'JSONL')
+    CHUNK_SIZE = 2000
+    UPLOAD_TO = 'reports/'
+
     @staticmethod
-    def export_to_excel(data: Dict[str, Any], filename: str) -> str:
-        writer = pd.ExcelWriter(filename, engine='xlsxwriter')
+    def queryset_section(name: str, queryset: QuerySet, fields: Sequence[str],
+                         chunk_size: int = CHUNK_SIZE) -> ExportSection:
+        return ExportSection(name, fields, queryset.values_list(*fields).iterator(chunk_size=chunk_size))
 
-        # Create summary sheet
-        summary_df = pd.DataFrame([data['summary']])
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    @staticmethod
+    def summary_sections(data: Dict[str, Any], keys: Sequence[str] = ('summary', 'loans', 'savings')) -> list:
+        """One single-row section per summary dict of a generated report."""
+        return [
+            ExportSection(key.title(), list(data[key]), [list(data[key].values())])
+            for key in keys if key in data
+        ]
 
-        # Create loans sheet
-        loans_df = pd.DataFrame([data['loans']])
-        loans_df.to_excel(writer, sheet_name='Loans', index=False)
+    @staticmethod
+    def export(sections: Sequence[ExportSection], filename: str, format: str = 'XLSX') -> str:
+        """Write ``sections`` as ``format`` and save to the default storage; returns the stored name."""
+        format = format.upper()
+        if format not in ReportExporter.FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
 
-        # Create savings sheet
-        savings_df = pd.DataFrame([data['savings']])
-        savings_df.to_excel(writer, sheet_name='Savings', index=False)
+        with tempfile.TemporaryFile() as output:
+            getattr(ReportExporter, f'_write_{format.lower()}')(sections, output)
+            output.seek(0)
+            return default_storage.save(f'{ReportExporter.UPLOAD_TO}{filename}', File(output, name=filename))
 
-        writer.save()
-        return filename
+    @staticmethod
+    def export_to_excel(data: Dict[str, Any], filename: str) -> str:
+        return ReportExporter.export(ReportExporter.summary_sections(data), filename, 'XLSX')
 
     @staticmethod
     def export_to_pdf(data: Dict[str, Any], filename: str) -> str:
         # PDF generation logic using reportlab or WeasyPrint
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def _write_csv(sections: Sequence[ExportSection], output) -> None:
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        for index, section in enumerate(sections):
+            if len(sections) > 1:
+                if index:
+                    writer.writerow([])
+                writer.writerow([section.name])
+            writer.writerow(section.columns)
+            writer.writerows(section.rows)
+        text.flush()
+        text.detach()
+
+    @staticmethod
+    def _write_jsonl(sections: Sequence[ExportSection], output) -> None:
+        encoder = DjangoJSONEncoder()
+        for section in sections:
+            for row in section.rows:
+                record = {'section': section.name, **dict(zip(section.columns, row))}
+                output.write(encoder.encode(record).encode('utf-8'))
+                output.write(b'\n')
+
+    @staticmethod
+    def _write_xlsx(sections: Sequence[ExportSection], output) -> None:
+        # Optional dependency: only needed when XLSX is requested
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'remove_timezone': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        header = workbook.add_format({'bold': True})
+        for section in sections:
+            worksheet = workbook.add_worksheet(section.name[:31])
+            worksheet.write_row(0, 0, section.columns, header)
+            for row_number, row in enumerate(section.rows, start=1):
+                worksheet.write_row(row_number, 0, row)
+        workbook.close()
@@ -1,66 +1,93 @@
 from datetime import datetime
 from typing import Dict, Any
 
-from django.db.models import Sum
+from django.db.models import Count, Q, QuerySet
 
-from apps.loans.models import Loan
+from apps.reporting.models import LoanDisbursementDaily
+from apps.reporting.services.portfolio_snapshot_service import PortfolioSnapshotService
+from apps.reporting.services.report_engine import Metric, MetricSet, ReportEngine
 from apps.savings.models import SavingsAccount
 from apps.transactions.models import Transaction
 
 
 class ReportGenerator:
-    @staticmethod
-    def generate_financial_report(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
-        # Query data
-        transactions = Transaction.objects.filter(
-            created_at__range=[start_date, end_date]
-        )
-        loans = Loan.objects.filter(
-            created_at__range=[start_date, end_date]
-        )
-        savings = SavingsAccount.objects.filter(
-            created_at__range=[start_date, end_date]
-        )
+    FINANCIAL_METRICS = (
+        MetricSet('transactions', Transaction, 'created_at', (
+            Metric('total_deposits', filter=Q(transaction_type='DEPOSIT')),
+            Metric('total_withdrawals', filter=Q(transaction_type='WITHDRAWAL')),
+            Metric('total_loan_repayments', filter=Q(transaction_type='LOAN_REPAYMENT'))
+        )),
+        # Loan figures come from the portfolio snapshot tables, not the loan book
+        MetricSet('disbursements', LoanDisbursementDaily, 'date', (
+            Metric('total_loans_disbursed'),
+            Metric('disbursed_count', field='loan_count')
+        )),
+        MetricSet('savings', SavingsAccount, 'date_opened', (
+            Metric('total_accounts', Count, 'id'),
+            Metric('total_balance', field='balance')
+        ))
+    )
 
-        # Calculate metrics
-        total_deposits = transactions.filter(
-            transaction_type='DEPOSIT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+    TRANSACTION_METRICS = (
+        MetricSet('transactions', Transaction, 'created_at', tuple(
+            metric
+            for transaction_type, _label in Transaction.TRANSACTION_TYPES
+            for metric in (
+                Metric(f'{transaction_type.lower()}_count', Count, 'id', Q(transaction_type=transaction_type)),
+                Metric(f'{transaction_type.lower()}_amount', filter=Q(transaction_type=transaction_type))
+            )
+        ) + (
+            Metric('completed_count', Count, 'id', Q(status='COMPLETED')),
+            Metric('failed_count', Count, 'id', Q(status='FAILED'))
+        )),
+    )
 
-        total_withdrawals = transactions.filter(
-            transaction_type='WITHDRAWAL'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+    TRANSACTION_DETAIL_FIELDS = (
+        'transaction_ref', 'created_at', 'member__member_number', 'transaction_type',
+        'payment_method', 'status', 'amount'
+    )
 
-        loan_disbursements = loans.filter(
-            status='DISBURSED'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+    @staticmethod
+    def transaction_detail(start_date: datetime, end_date: datetime) -> QuerySet:
+        """Transactions in the period, for detail sheets; export with an iterator."""
+        return MetricSet('transactions', Transaction, 'created_at', ()).queryset(
+            start_date, end_date
+        ).order_by('created_at', 'id')
 
-        loan_repayments = transactions.filter(
-            transaction_type='LOAN_REPAYMENT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+    @staticmethod
+    def generate_financial_report(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        metrics = ReportEngine.evaluate(ReportGenerator.FINANCIAL_METRICS, start_date, end_date)
+        transactions = metrics['transactions']
+        disbursements = metrics['disbursements']
+        status_counts = PortfolioSnapshotService.portfolio(end_date)['totals'].get('status_counts', {})
 
-        # Create report data
-        report_data = {
+        return {
             'period': {
                 'start_date': start_date,
                 'end_date': end_date
             },
             'summary': {
-                'total_deposits': total_deposits,
-                'total_withdrawals': total_withdrawals,
-                'net_position': total_deposits - total_withdrawals,
-                'total_loans_disbursed': loan_disbursements,
-                'total_loan_repayments': loan_repayments
+                'total_deposits': transactions['total_deposits'],
+                'total_withdrawals': transactions['total_withdrawals'],
+                'net_position': transactions['total_deposits'] - transactions['total_withdrawals'],
+                'total_loans_disbursed': disbursements['total_loans_disbursed'],
+                'total_loan_repayments': transactions['total_loan_repayments']
             },
             'loans': {
-                'disbursed_count': loans.filter(status='DISBURSED').count(),
-                'pending_count': loans.filter(status='PENDING').count(),
-                'defaulted_count': loans.filter(status='DEFAULTED').count()
+                'disbursed_count': disbursements['disbursed_count'],
+                'pending_count': status_counts.get('PENDING', 0),
+                'defaulted_count': status_counts.get('DEFAULTED', 0)
             },
-            'savings': {
-                'total_accounts': savings.count(),
-                'total_balance': savings.aggregate(total=Sum('balance'))['total'] or 0
-            }
+            'savings': metrics['savings']
         }
 
-        return report_data
\ No newline at end of file
+    @staticmethod
+    def generate_transaction_report(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        metrics = ReportEngine.evaluate(ReportGenerator.TRANSACTION_METRICS, start_date, end_date)
+        return {
+            'period': {
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            'summary': metrics['transactions']
+        }
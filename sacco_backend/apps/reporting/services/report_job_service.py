@@ -0,0 +1,192 @@
+# apps/reporting/services/report_job_service.py
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from typing import Iterable, Iterator, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.reporting.models import Report, ReportDataset
+from apps.reporting.services.report_exporter import ReportExporter
+from apps.reporting.services.report_generator import ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+    """Runs report generation outside the request cycle.
+
+    A job is a Report row that moves PENDING -> GENERATING -> COMPLETED or
+    FAILED. Progress is saved on the row for polling clients and pushed to
+    the owner's notifications group for websocket subscribers.
+
+    Reports with the same type, period, format and parameters share a
+    ReportDataset: the first job to claim it generates the file, the others
+    reuse it, or go back to PENDING while it is still being generated.
+    """
+    REPORT_TYPES = ('FINANCIAL', 'TRANSACTION')
+    PROGRESS_EVERY = 5000
+    DATASET_LEASE = timedelta(minutes=30)
+    DATASET_TTL = timedelta(hours=1)
+    WAIT_SECONDS = 30
+    # Enough waits to outlast the holder's lease, after which the dataset is taken over
+    MAX_WAITS = int(DATASET_LEASE.total_seconds() // WAIT_SECONDS) + 2
+    # Progress reached before the detail rows start streaming
+    SUMMARY_DONE = 20
+
+    @staticmethod
+    def create(report_type: str, start_date, end_date, format: str = 'XLSX', created_by=None,
+               parameters: Optional[dict] = None) -> Report:
+        format = format.upper()
+        return Report.objects.create(
+            report_type=report_type,
+            name=f"{report_type.lower()}_report_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{format.lower()}",
+            parameters=parameters or {},
+            format=format,
+            status='PENDING',
+            start_date=start_date,
+            end_date=end_date,
+            created_by=created_by
+        )
+
+    @staticmethod
+    def dataset_key(report: Report) -> str:
+        identity = json.dumps([
+            report.report_type, str(report.start_date), str(report.end_date), report.format, report.parameters
+        ], sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    @staticmethod
+    def run(report_id: int) -> Report:
+        # Claiming with a conditional UPDATE makes a repeated task delivery a no-op
+        claimed = Report.objects.filter(pk=report_id, status='PENDING').update(
+            status='GENERATING', progress=0, updated_at=timezone.now()
+        )
+        report = Report.objects.get(pk=report_id)
+        if not claimed:
+            return report
+
+        ReportJobService._push(report)
+        dataset, claimed = ReportJobService._claim_dataset(report)
+        report.dataset = dataset
+        Report.objects.filter(pk=report.pk).update(dataset=dataset)
+
+        if not claimed:
+            if dataset.status == 'COMPLETED':
+                ReportJobService._update(
+                    report, file=dataset.file.name, status='COMPLETED', progress=100, completed_at=timezone.now()
+                )
+            else:
+                # Another job holds the dataset; wait for it rather than computing it twice
+                ReportJobService._update(report, status='PENDING')
+            return report
+
+        try:
+            sections = ReportJobService._sections(report)
+            name = ReportExporter.export(sections, report.name, report.format)
+        except Exception as e:
+            logger.error(f"Report {report.id} failed: {str(e)}")
+            ReportDataset.objects.filter(pk=dataset.pk).update(status='FAILED', lease_expires_at=None)
+            ReportJobService._update(report, status='FAILED', error_message=str(e), completed_at=timezone.now())
+            return report
+
+        completed_at = timezone.now()
+        ReportDataset.objects.filter(pk=dataset.pk).update(
+            status='COMPLETED', file=name, lease_expires_at=None, completed_at=completed_at
+        )
+        ReportJobService._update(report, file=name, status='COMPLETED', progress=100, completed_at=completed_at)
+        return report
+
+    @staticmethod
+    def abandon(report_id: int) -> Report:
+        """Fail a report that is still waiting for its dataset after MAX_WAITS retries."""
+        report = Report.objects.get(pk=report_id)
+        if report.status == 'PENDING':
+            ReportJobService._update(
+                report,
+                status='FAILED',
+                error_message='Timed out waiting for a shared dataset to be generated',
+                completed_at=timezone.now()
+            )
+        return report
+
+    @staticmethod
+    def _claim_dataset(report: Report) -> tuple:
+        """Return (dataset, claimed); claimed means this job must generate it."""
+        key = ReportJobService.dataset_key(report)
+        now = timezone.now()
+        ReportDataset.objects.bulk_create([ReportDataset(key=key)], ignore_conflicts=True)
+
+        claimed = ReportDataset.objects.filter(
+            Q(status__in=['PENDING', 'FAILED'])
+            | Q(status='GENERATING', lease_expires_at__lt=now)
+            | Q(status='COMPLETED', completed_at__lt=now - ReportJobService.DATASET_TTL),
+            key=key
+        ).update(status='GENERATING', lease_expires_at=now + ReportJobService.DATASET_LEASE)
+        return ReportDataset.objects.get(key=key), bool(claimed)
+
+    @staticmethod
+    def _sections(report: Report) -> list:
+        if report.report_type == 'FINANCIAL':
+            data = ReportGenerator.generate_financial_report(report.start_date, report.end_date)
+        elif report.report_type == 'TRANSACTION':
+            data = ReportGenerator.generate_transaction_report(report.start_date, report.end_date)
+        else:
+            raise ValueError(f"Unsupported report type: {report.report_type}")
+        ReportJobService._update(report, progress=ReportJobService.SUMMARY_DONE)
+
+        detail = ReportGenerator.transaction_detail(report.start_date, report.end_date)
+        total = detail.count()
+        section = ReportExporter.queryset_section('Transactions', detail, ReportGenerator.TRANSACTION_DETAIL_FIELDS)
+        section.rows = ReportJobService._track(report, section.rows, total)
+        return ReportExporter.summary_sections(data) + [section]
+
+    @staticmethod
+    def _track(report: Report, rows: Iterable, total: int) -> Iterator:
+        """Pass rows through, recording progress every PROGRESS_EVERY rows."""
+        span = 99 - ReportJobService.SUMMARY_DONE
+        for count, row in enumerate(rows, start=1):
+            yield row
+            if count % ReportJobService.PROGRESS_EVERY == 0 and total:
+                ReportJobService._update(report, progress=ReportJobService.SUMMARY_DONE + span * count // total)
+                ReportDataset.objects.filter(pk=report.dataset_id).update(
+                    lease_expires_at=timezone.now() + ReportJobService.DATASET_LEASE
+                )
+
+    @staticmethod
+    def _update(report: Report, **fields) -> None:
+        for name, value in fields.items():
+            setattr(report, name, value)
+        Report.objects.filter(pk=report.pk).update(updated_at=timezone.now(), **fields)
+        ReportJobService._push(report)
+
+    @staticmethod
+    def _push(report: Report) -> None:
+        channel_layer = get_channel_layer()
+        if channel_layer is None or report.created_by_id is None:
+            return
+
+        # Progress is also on the row, so a lost push only delays subscribers
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f"notifications_{report.created_by_id}",
+                {'type': 'notify', 'data': ReportJobService.progress_event(report)}
+            )
+        except Exception as e:
+            logger.warning(f"Could not push progress for report {report.id}: {str(e)}")
+
+    @staticmethod
+    def progress_event(report: Report) -> dict:
+        return {
+            'event': 'report.progress',
+            'report_id': report.id,
+            'status': report.status,
+            'progress': report.progress,
+            'file': report.file.name if report.file else None,
+            'error': report.error_message
+        }
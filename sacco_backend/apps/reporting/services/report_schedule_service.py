@@ -0,0 +1,69 @@
+# apps/reporting/services/report_schedule_service.py
+from datetime import timedelta
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.reporting.models import Report, ReportSchedule
+from apps.reporting.services.report_job_service import ReportJobService
+from apps.reporting.utils import calculate_next_run
+
+
+class ReportScheduleService:
+    """Turns due ReportSchedule rows into report jobs, one schedule per task.
+
+    A schedule is claimed by setting a short lease with a conditional
+    UPDATE, so overlapping beat runs or duplicate task deliveries cannot
+    start the same run twice. If a worker dies mid-claim the lease simply
+    expires and the next beat run picks the schedule up again.
+    """
+    LEASE = timedelta(minutes=5)
+    PERIOD_DAYS = 30
+
+    @staticmethod
+    def _due(now) -> Q:
+        return Q(is_active=True, next_run__lte=now) & (
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+        )
+
+    @staticmethod
+    def due_ids(now=None) -> list[int]:
+        now = now or timezone.now()
+        return list(
+            ReportSchedule.objects.filter(
+                ReportScheduleService._due(now),
+                report_type__in=ReportJobService.REPORT_TYPES
+            ).values_list('id', flat=True)
+        )
+
+    @staticmethod
+    def run(schedule_id: int) -> Optional[Report]:
+        """Claim the schedule, create its report job and advance next_run; None if not claimed."""
+        now = timezone.now()
+        claimed = ReportSchedule.objects.filter(ReportScheduleService._due(now), pk=schedule_id).update(
+            lease_expires_at=now + ReportScheduleService.LEASE
+        )
+        if not claimed:
+            return None
+
+        schedule = ReportSchedule.objects.get(pk=schedule_id)
+        today = timezone.localdate()
+        parameters = dict(schedule.parameters)
+        with transaction.atomic():
+            report = ReportJobService.create(
+                schedule.report_type,
+                today - timedelta(days=ReportScheduleService.PERIOD_DAYS),
+                today,
+                format=parameters.pop('format', 'XLSX'),
+                created_by=schedule.created_by,
+                parameters=parameters
+            )
+            ReportSchedule.objects.filter(pk=schedule_id).update(
+                last_run=now,
+                next_run=calculate_next_run(schedule.frequency),
+                lease_expires_at=None,
+                updated_at=now
+            )
+        return report
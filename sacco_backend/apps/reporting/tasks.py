@@ -1,55 +1,43 @@
 # apps/reporting/tasks.py
-from datetime import timedelta
-
 from celery import shared_task
-from django.utils import timezone
 
-from apps.reporting.models import ReportSchedule, Report
-from apps.reporting.services.report_exporter import ReportExporter
-from apps.reporting.services.report_generator import ReportGenerator
+from apps.reporting.services.portfolio_snapshot_service import PortfolioSnapshotService
+from apps.reporting.services.report_job_service import ReportJobService
+from apps.reporting.services.report_schedule_service import ReportScheduleService
+
+
+@shared_task(bind=True, max_retries=ReportJobService.MAX_WAITS)
+def generate_report(self, report_id):
+    report = ReportJobService.run(report_id)
+    if report.status == 'PENDING':
+        if self.request.retries >= self.max_retries:
+            report = ReportJobService.abandon(report_id)
+            return {'report_id': report.id, 'status': report.status}
+        # Another job is generating the same dataset; check back once it is likely done
+        raise self.retry(countdown=ReportJobService.WAIT_SECONDS)
+    return {'report_id': report.id, 'status': report.status}
 
 
 @shared_task
 def generate_scheduled_reports():
-    today = timezone.now()
-    schedules = ReportSchedule.objects.filter(
-        is_active=True,
-        next_run__lte=today
-    )
-
-    for schedule in schedules:
-        try:
-            # Generate report based on type
-            if schedule.report_type == 'FINANCIAL':
-                data = ReportGenerator.generate_financial_report(
-                    today - timedelta(days=30),
-                    today
-                )
-
-                # Export report
-                filename = f"financial_report_{today.strftime('%Y%m%d')}.xlsx"
-                file_path = ReportExporter.export_to_excel(data, filename)
-
-                # Create report record
-                Report.objects.create(
-                    report_type=schedule.report_type,
-                    name=filename,
-                    file=file_path,
-                    format='XLSX',
-                    status='COMPLETED',
-                    start_date=today - timedelta(days=30),
-                    end_date=today
-                )
-
-            # Update schedule
-            schedule.last_run = today
-            schedule.next_run = calculate_next_run(schedule.frequency)
-            schedule.save()
-
-        except Exception as e:
-            Report.objects.create(
-                report_type=schedule.report_type,
-                name=f"failed_{today.strftime('%Y%m%d')}",
-                status='FAILED',
-                error_message=str(e)
-            )
\ No newline at end of file
+    # Fan out: each due schedule is claimed and run by its own task
+    schedule_ids = ReportScheduleService.due_ids()
+    for schedule_id in schedule_ids:
+        run_report_schedule.delay(schedule_id)
+    return len(schedule_ids)
+
+
+@shared_task
+def run_report_schedule(schedule_id):
+    report = ReportScheduleService.run(schedule_id)
+    if report is None:
+        return None
+
+    generate_report.delay(report.id)
+    return report.id
+
+
+@shared_task
+def capture_portfolio_snapshot():
+    result = PortfolioSnapshotService.capture()
+    return {**result, 'snapshot_date': result['snapshot_date'].isoformat()}
@@ -1,3 +1,481 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models import Count, Max, Q
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Role
+from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.loan_service import LoanService
+from apps.members.models import Member
+from apps.outbox.services.outbox_service import OutboxService
+from apps.reporting.models import (
+    LoanDisbursementDaily,
+    LoanPortfolioSnapshot,
+    Report,
+    ReportDataset,
+    ReportSchedule
+)
+from apps.reporting.services.portfolio_snapshot_service import PortfolioSnapshotService
+from apps.reporting.services.report_exporter import ReportExporter
+from apps.reporting.services.report_engine import Metric, MetricSet, ReportEngine
+from apps.reporting.services.report_generator import ReportGenerator
+from apps.reporting.services.report_job_service import ReportJobService
+from apps.reporting.services.report_schedule_service import ReportScheduleService
+from apps.reporting.tasks import generate_report, generate_scheduled_reports, run_report_schedule
+from apps.savings.models import SavingsAccount
+from apps.transactions.models import Transaction
+
+User = get_user_model()
+
+
+class PortfolioSnapshotServiceTest(TestCase):
+    SNAPSHOT_DATE = date(2024, 6, 30)
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='portfolio@example.com',
+            password='testpass123',
+            first_name='Portfolio',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000090',
+            national_id='PORTFOLIO1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024PORTFOLIO',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Nurse',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='PORTFOLIO1',
+            membership_number='SACCOM2024PORTFOLIO',
+            membership_type='INDIVIDUAL'
+        )
+        # In arrears since 2024-04-20
+        self.late = self._loan('LN2024SNAPLATE', 'PERSONAL', date(2024, 3, 20))
+        self.current = self._loan('LN2024SNAPCUR', 'PERSONAL', date(2024, 6, 29))
+        self.business = self._loan('LN2024SNAPBIZ', 'BUSINESS', date(2024, 6, 29), amount='1200000')
+        self._loan('LN2024SNAPPEND', 'BUSINESS', None)
+
+    def _loan(self, reference, loan_type, disbursed_on, amount='600000'):
+        loan = Loan(
+            reference=reference,
+            member=self.member,
+            loan_type=loan_type,
+            amount=Decimal(amount),
+            interest_rate=Decimal('12.00'),
+            term_months=6,
+            status='DISBURSED' if disbursed_on else 'PENDING',
+            total_amount_payable=Decimal(amount),
+            total_interest=Decimal('0'),
+            outstanding_balance=Decimal(amount)
+        )
+        if disbursed_on:
+            loan.disbursement_date = timezone.make_aware(datetime.combine(disbursed_on, datetime.min.time()))
+            repayments = LoanService.build_repayments(loan)
+            loan.save()
+            LoanRepayment.objects.bulk_create(repayments)
+        else:
+            loan.save()
+        return loan
+
+    def test_capture_summarises_portfolio_by_product(self):
+        result = PortfolioSnapshotService.capture(self.SNAPSHOT_DATE)
+
+        self.assertEqual(result['products'], 2)
+        personal = LoanPortfolioSnapshot.objects.get(snapshot_date=self.SNAPSHOT_DATE, loan_type='PERSONAL')
+        business = LoanPortfolioSnapshot.objects.get(snapshot_date=self.SNAPSHOT_DATE, loan_type='BUSINESS')
+
+        self.assertEqual(personal.status_counts, {'DISBURSED': 2})
+        self.assertEqual(business.status_counts, {'DISBURSED': 1, 'PENDING': 1})
+        self.assertEqual(personal.active_loans, 2)
+        self.assertEqual(personal.outstanding_principal, Decimal('1200000'))
+        self.assertEqual(personal.outstanding_balance, self.late.outstanding_balance + self.current.outstanding_balance)
+        self.assertEqual(personal.par_30_amount, self.late.outstanding_balance)
+        self.assertEqual(personal.par_90_amount, 0)
+        self.assertEqual(business.par_1_amount, 0)
+
+        # The previous day's disbursements are rebuilt from the loans
+        self.assertEqual(
+            list(LoanDisbursementDaily.objects.values_list('date', 'loan_type', 'loan_count', 'amount')),
+            [
+                (date(2024, 6, 29), 'BUSINESS', 1, Decimal('1200000')),
+                (date(2024, 6, 29), 'PERSONAL', 1, Decimal('600000'))
+            ]
+        )
+
+        # Re-capturing the same day replaces rather than duplicates
+        PortfolioSnapshotService.capture(self.SNAPSHOT_DATE)
+        self.assertEqual(LoanPortfolioSnapshot.objects.count(), 2)
+
+    def test_portfolio_reads_latest_snapshot(self):
+        PortfolioSnapshotService.capture(self.SNAPSHOT_DATE - timedelta(days=1))
+        PortfolioSnapshotService.capture(self.SNAPSHOT_DATE)
+
+        with self.assertNumQueries(2):
+            portfolio = PortfolioSnapshotService.portfolio()
+
+        self.assertEqual(portfolio['snapshot_date'], self.SNAPSHOT_DATE)
+        self.assertEqual(portfolio['totals']['active_loans'], 3)
+        self.assertEqual(portfolio['totals']['status_counts'], {'DISBURSED': 3, 'PENDING': 1})
+        self.assertEqual(
+            portfolio['totals']['par_ratios'][30],
+            (self.late.outstanding_balance / portfolio['totals']['outstanding_balance']).quantize(Decimal('0.0001'))
+        )
+
+    def test_disbursement_events_update_daily_totals(self):
+        payload = {
+            'loan_id': self.current.id,
+            'member_id': self.member.id,
+            'loan_type': 'PERSONAL',
+            'amount': '600000.00',
+            'disbursed_on': '2024-07-01'
+        }
+        # At-least-once delivery: the same event twice counts the loan once
+        OutboxService.publish_many([('loan.disbursed', payload), ('loan.disbursed', payload)])
+        with patch('apps.notifications.outbox_handlers.send_loan_disbursed_notification'):
+            OutboxService.relay_batch()
+
+        self.assertEqual(
+            PortfolioSnapshotService.disbursements(date(2024, 7, 1), date(2024, 7, 31)),
+            [{'date': date(2024, 7, 1), 'loan_count': 1, 'amount': Decimal('600000')}]
+        )
+
+    def test_event_delivered_after_rebuild_is_not_counted_again(self):
+        PortfolioSnapshotService.rebuild_disbursements(date(2024, 6, 29))
+        PortfolioSnapshotService.record_disbursement(self.current.id, 'PERSONAL', Decimal('600000'), date(2024, 6, 29))
+
+        self.assertEqual(
+            PortfolioSnapshotService.disbursements(date(2024, 6, 29), date(2024, 6, 29)),
+            [{'date': date(2024, 6, 29), 'loan_count': 2, 'amount': Decimal('1800000')}]
+        )
+
+    def test_rebuild_command_backfills_history(self):
+        call_command('rebuild_disbursements', end=date(2024, 6, 30), stdout=io.StringIO())
+
+        self.assertEqual(
+            list(LoanDisbursementDaily.objects.values_list('date', 'loan_type', 'loan_count')),
+            [(date(2024, 3, 20), 'PERSONAL', 1), (date(2024, 6, 29), 'BUSINESS', 1), (date(2024, 6, 29), 'PERSONAL', 1)]
+        )
+
+    def test_financial_report_reads_snapshots(self):
+        PortfolioSnapshotService.capture(self.SNAPSHOT_DATE)
+
+        report = ReportGenerator.generate_financial_report(date(2024, 6, 1), self.SNAPSHOT_DATE)
+
+        self.assertEqual(report['summary']['total_loans_disbursed'], Decimal('1800000'))
+        self.assertEqual(report['loans'], {'disbursed_count': 2, 'pending_count': 1, 'defaulted_count': 0})
+
+
+class ReportDataTestCase(TestCase):
+    def setUp(self):
+        self.user = user = User.objects.create_user(
+            email='report@example.com',
+            password='testpass123',
+            first_name='Report',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000091',
+            national_id='REPORT1'
+        )
+        member = Member.objects.create(
+            user=user,
+            member_number='M2024REPORT',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Nurse',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='REPORT1',
+            membership_number='SACCOM2024REPORT',
+            membership_type='INDIVIDUAL'
+        )
+        rows = [
+            ('DEPOSIT', '50000', 'COMPLETED'),
+            ('DEPOSIT', '25000', 'COMPLETED'),
+            ('WITHDRAWAL', '10000', 'COMPLETED'),
+            ('LOAN_REPAYMENT', '40000', 'FAILED')
+        ]
+        Transaction.objects.bulk_create([
+            Transaction(
+                transaction_ref=f'TXNREPORT{n}',
+                member=member,
+                transaction_type=transaction_type,
+                amount=Decimal(amount),
+                payment_method='CASH',
+                status=transaction_status
+            )
+            for n, (transaction_type, amount, transaction_status) in enumerate(rows)
+        ])
+        SavingsAccount.objects.create(
+            member=member,
+            account_number='SAREPORT1',
+            account_type='REGULAR',
+            balance=Decimal('75000'),
+            interest_rate=Decimal('5.00'),
+            status='ACTIVE',
+            minimum_balance=Decimal('10000')
+        )
+        self.today = timezone.localdate()
+
+
+class ReportEngineTest(ReportDataTestCase):
+    def test_financial_report_runs_one_query_per_source(self):
+        # Transactions, disbursements and savings, plus the snapshot lookup
+        with self.assertNumQueries(4):
+            report = ReportGenerator.generate_financial_report(self.today, self.today)
+
+        self.assertEqual(report['summary'], {
+            'total_deposits': Decimal('75000'),
+            'total_withdrawals': Decimal('10000'),
+            'net_position': Decimal('65000'),
+            'total_loans_disbursed': 0,
+            'total_loan_repayments': Decimal('40000')
+        })
+        self.assertEqual(report['savings'], {'total_accounts': 1, 'total_balance': Decimal('75000')})
+
+    def test_metric_sets_are_declarative(self):
+        metric_set = MetricSet('transactions', Transaction, 'created_at', (
+            Metric('deposit_count', Count, 'id', Q(transaction_type='DEPOSIT')),
+            Metric('largest_deposit', Max, filter=Q(transaction_type='DEPOSIT'))
+        ), base_filter=Q(status='COMPLETED'))
+
+        with self.assertNumQueries(1):
+            result = ReportEngine.evaluate([metric_set], self.today, self.today)
+
+        self.assertEqual(result, {'transactions': {'deposit_count': 2, 'largest_deposit': Decimal('50000')}})
+
+        report = ReportGenerator.generate_transaction_report(self.today, self.today)
+        self.assertEqual(report['summary']['deposit_amount'], Decimal('75000'))
+        self.assertEqual(report['summary']['failed_count'], 1)
+        self.assertEqual(report['summary']['interest_count'], 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportExporterTest(ReportDataTestCase):
+    def _sections(self):
+        report = ReportGenerator.generate_financial_report(self.today, self.today)
+        return ReportExporter.summary_sections(report) + [
+            ReportExporter.queryset_section(
+                'Transactions',
+                ReportGenerator.transaction_detail(self.today, self.today),
+                ReportGenerator.TRANSACTION_DETAIL_FIELDS,
+                chunk_size=2
+            )
+        ]
+
+    def test_csv_export_streams_sections_to_storage(self):
+        name = ReportExporter.export(self._sections(), 'financial.csv', 'CSV')
+
+        self.assertTrue(name.startswith('reports/'))
+        with default_storage.open(name) as exported:
+            rows = list(csv.reader(io.TextIOWrapper(exported, encoding='utf-8')))
+
+        self.assertEqual(rows[0], ['Summary'])
+        self.assertEqual(rows[1][0], 'total_deposits')
+        detail = rows[rows.index(['Transactions']) + 1:]
+        self.assertEqual(detail[0], list(ReportGenerator.TRANSACTION_DETAIL_FIELDS))
+        self.assertEqual([row[0] for row in detail[1:]], ['TXNREPORT0', 'TXNREPORT1', 'TXNREPORT2', 'TXNREPORT3'])
+
+    def test_jsonl_export_writes_one_record_per_row(self):
+        name = ReportExporter.export(self._sections(), 'financial.jsonl', 'JSONL')
+
+        with default_storage.open(name) as exported:
+            records = [json.loads(line) for line in exported]
+
+        transactions = [record for record in records if record['section'] == 'Transactions']
+        self.assertEqual(len(transactions), 4)
+        self.assertEqual(transactions[0]['amount'], '50000.00')
+        self.assertEqual(Decimal(records[0]['total_withdrawals']), Decimal('10000'))
+
+    @skipUnless(find_spec('xlsxwriter'), 'xlsxwriter is not installed')
+    def test_xlsx_export_writes_a_sheet_per_section(self):
+        name = ReportExporter.export(self._sections(), 'financial.xlsx', 'XLSX')
+
+        with default_storage.open(name) as exported:
+            self.assertEqual(exported.read(2), b'PK')
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ReportExporter.export([], 'financial.pdf', 'PDF')
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+)
+class ReportJobTest(ReportDataTestCase):
+    def _events(self, channel_layer, channel):
+        events = []
+        while True:
+            try:
+                message = async_to_sync(asyncio.wait_for)(channel_layer.receive(channel), 0.1)
+            except asyncio.TimeoutError:
+                return events
+            events.append((message['data']['status'], message['data']['progress']))
+
+    def test_job_runs_and_pushes_progress(self):
+        channel_layer = get_channel_layer()
+        async_to_sync(channel_layer.group_add)(f'notifications_{self.user.id}', 'report-listener')
+        report = ReportJobService.create('FINANCIAL', self.today, self.today, 'CSV', created_by=self.user)
+
+        generate_report(report.id)
+        report.refresh_from_db()
+
+        self.assertEqual((report.status, report.progress), ('COMPLETED', 100))
+        self.assertIsNotNone(report.completed_at)
+        self.assertTrue(default_storage.exists(report.file.name))
+        self.assertEqual(
+            self._events(channel_layer, 'report-listener'),
+            [('GENERATING', 0), ('GENERATING', ReportJobService.SUMMARY_DONE), ('COMPLETED', 100)]
+        )
+
+        # A repeated delivery leaves the finished report alone
+        self.assertEqual(generate_report(report.id)['status'], 'COMPLETED')
+
+    def test_failed_job_records_error(self):
+        report = ReportJobService.create('AUDIT', self.today, self.today, created_by=self.user)
+
+        ReportJobService.run(report.id)
+        report.refresh_from_db()
+
+        self.assertEqual(report.status, 'FAILED')
+        self.assertEqual(report.error_message, 'Unsupported report type: AUDIT')
+
+    def test_generate_endpoint_queues_job(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with patch('apps.reporting.views.generate_report') as task, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse('reports-generate'), {
+                'report_type': 'FINANCIAL',
+                'start_date': '2024-06-01',
+                'end_date': '2024-06-30',
+                'format': 'JSONL'
+            })
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data['status'], response.data['format']), ('PENDING', 'JSONL'))
+        task.delay.assert_called_once_with(response.data['id'])
+
+        response = client.post(reverse('reports-generate'), {'report_type': 'FINANCIAL', 'start_date': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+)
+class ReportDedupTest(ReportDataTestCase):
+    def _schedule(self, **kwargs):
+        return ReportSchedule.objects.create(
+            report_type='FINANCIAL',
+            frequency='DAILY',
+            parameters={'format': 'CSV', 'branch': 'HQ'},
+            next_run=timezone.now() - timedelta(minutes=1),
+            created_by=self.user,
+            **kwargs
+        )
+
+    def test_identical_reports_share_one_dataset(self):
+        first = ReportJobService.create('FINANCIAL', self.today, self.today, 'CSV', created_by=self.user)
+        second = ReportJobService.create('FINANCIAL', self.today, self.today, 'CSV', created_by=self.user)
+        other = ReportJobService.create('FINANCIAL', self.today, self.today, 'JSONL', created_by=self.user)
+
+        with patch.object(ReportExporter, 'export', wraps=ReportExporter.export) as export:
+            for report in (first, second, other):
+                ReportJobService.run(report.id)
+
+        self.assertEqual(export.call_count, 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'COMPLETED')
+        self.assertEqual(second.dataset_id, first.dataset_id)
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(ReportDataset.objects.count(), 2)
+
+    def test_report_waits_while_dataset_is_leased(self):
+        report = ReportJobService.create('FINANCIAL', self.today, self.today, 'CSV', created_by=self.user)
+        ReportDataset.objects.create(
+            key=ReportJobService.dataset_key(report),
+            status='GENERATING',
+            lease_expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(ReportJobService.run(report.id).status, 'PENDING')
+
+        # Once the holder's lease lapses the dataset is taken over
+        ReportDataset.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(ReportJobService.run(report.id).status, 'COMPLETED')
+
+    def test_waiting_report_fails_once_retries_run_out(self):
+        # The retry budget outlasts a dataset lease
+        self.assertGreater(generate_report.max_retries * ReportJobService.WAIT_SECONDS,
+                           ReportJobService.DATASET_LEASE.total_seconds())
+
+        report = ReportJobService.create('FINANCIAL', self.today, self.today, 'CSV', created_by=self.user)
+        ReportDataset.objects.create(
+            key=ReportJobService.dataset_key(report),
+            status='GENERATING',
+            lease_expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        result = generate_report.apply(args=[report.id], retries=generate_report.max_retries).get()
+
+        report.refresh_from_db()
+        self.assertEqual((result['status'], report.status), ('FAILED', 'FAILED'))
+        self.assertIn('Timed out', report.error_message)
+
+    def test_schedule_is_claimed_once(self):
+        schedule = self._schedule()
+        self._schedule(lease_expires_at=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(ReportScheduleService.due_ids(), [schedule.id])
+
+        with patch('apps.reporting.tasks.generate_report') as task:
+            report_id = run_report_schedule(schedule.id)
+            self.assertIsNone(run_report_schedule(schedule.id))
+
+        task.delay.assert_called_once_with(report_id)
+        report = Report.objects.get(pk=report_id)
+        self.assertEqual((report.format, report.parameters), ('CSV', {'branch': 'HQ'}))
+        schedule.refresh_from_db()
+        self.assertGreater(schedule.next_run, timezone.now())
+        self.assertIsNone(schedule.lease_expires_at)
+
+    def test_beat_fans_out_one_task_per_schedule(self):
+        schedules = [self._schedule(), self._schedule()]
+
+        with patch('apps.reporting.tasks.run_report_schedule') as task:
+            self.assertEqual(generate_scheduled_reports(), 2)
+
+        self.assertEqual(
+            sorted(call.args[0] for call in task.delay.call_args_list),
+            [schedule.id for schedule in schedules]
+        )
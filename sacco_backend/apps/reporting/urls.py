@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import ReportViewSet
+from .views import PortfolioSnapshotViewSet, ReportViewSet
 
 router = DefaultRouter()
 
 router.register(r'reports', ReportViewSet, basename='reports')
+router.register(r'portfolio', PortfolioSnapshotViewSet, basename='portfolio')
 
 urlpatterns = [
     path('', include(router.urls))
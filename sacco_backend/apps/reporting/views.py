@@ -1,14 +1,16 @@
 # apps/reporting/views.py
-from django.utils import timezone
+from django.db import transaction
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.reporting.models import Report
-from apps.reporting.serializers import ReportSerializer
-from apps.reporting.services.report_exporter import ReportExporter
-from apps.reporting.services.report_generator import ReportGenerator
+from apps.reporting.serializers import ReportRequestSerializer, ReportSerializer
+from apps.reporting.services.portfolio_snapshot_service import PortfolioSnapshotService
+from apps.reporting.services.report_job_service import ReportJobService
+from apps.reporting.tasks import generate_report
 
 
 class ReportViewSet(viewsets.ModelViewSet):
@@ -20,35 +22,51 @@ class ReportViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def generate(self, request):
-        report_type = request.data.get('report_type')
-        start_date = request.data.get('start_date')
-        end_date = request.data.get('end_date')
-
-        try:
-            if report_type == 'FINANCIAL':
-                data = ReportGenerator.generate_financial_report(
-                    start_date,
-                    end_date
-                )
-
-                filename = f"financial_report_{timezone.now().strftime('%Y%m%d')}.xlsx"
-                file_path = ReportExporter.export_to_excel(data, filename)
-
-                report = Report.objects.create(
-                    report_type=report_type,
-                    name=filename,
-                    file=file_path,
-                    format='XLSX',
-                    status='COMPLETED',
-                    start_date=start_date,
-                    end_date=end_date,
-                    created_by=request.user
-                )
-
-                return Response(ReportSerializer(report).data)
-
-        except Exception as e:
+        serializer = ReportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Runs on a Celery worker; poll the report or listen on the notifications socket
+        with transaction.atomic():
+            report = ReportJobService.create(created_by=request.user, **serializer.validated_data)
+            transaction.on_commit(lambda: generate_report.delay(report.id))
+
+        return Response(ReportSerializer(report).data, status=status.HTTP_202_ACCEPTED)
+
+
+class PortfolioSnapshotViewSet(viewsets.ViewSet):
+    """Loan portfolio dashboard backed by the nightly snapshot tables."""
+    permission_classes = [IsAuthenticated]
+    allowed_roles = ['LOAN_OFFICER', 'ACCOUNTANT', 'MANAGER', 'ADMIN']
+
+    def list(self, request):
+        if request.user.role.name not in self.allowed_roles:
+            return Response(
+                {'error': 'Not allowed to view portfolio analytics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        on_date = request.query_params.get('date')
+        if on_date:
+            on_date = parse_date(on_date)
+            if on_date is None:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(PortfolioSnapshotService.portfolio(on_date))
+
+    @action(detail=False, methods=['get'])
+    def disbursements(self, request):
+        if request.user.role.name not in self.allowed_roles:
+            return Response(
+                {'error': 'Not allowed to view portfolio analytics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        start_date = parse_date(request.query_params.get('start_date', ''))
+        end_date = parse_date(request.query_params.get('end_date', ''))
+        if start_date is None or end_date is None:
             return Response(
-                {'error': str(e)},
+                {'error': 'start_date and end_date are required (YYYY-MM-DD)'},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
+        return Response(PortfolioSnapshotService.disbursements(
+            start_date, end_date, request.query_params.get('loan_type')
+        ))
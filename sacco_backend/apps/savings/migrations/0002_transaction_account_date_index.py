@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='savingstransaction',
+            index=models.Index(fields=['account', 'date'], name='savings_sav_account_c734a1_idx'),
+        ),
+    ]
@@ -42,6 +42,12 @@ class SavingsTransaction(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     reference = models.CharField(max_length=50, unique=True)
 
+    class Meta:
+        indexes = [
+            # Balance history lookups for interest accrual
+            models.Index(fields=['account', 'date'])
+        ]
+
 
 class InterestRate(models.Model):
     account_type = models.CharField(max_length=20)
@@ -5,14 +5,22 @@ from decimal import Decimal
 from django.db import transaction
 
 from apps.members.models import Member
-from apps.savings.models import SavingsAccount, InterestRate, SavingsTransaction
+from apps.savings.models import SavingsAccount, SavingsTransaction
+from apps.savings.services.rate_table import InterestRateTable
+from apps.sequences.services.sequence_service import NumberSequenceService
 
 
 class SavingsAccountService:
+    # Product withdrawal floor; interest tiers only decide the rate, not what may be withdrawn
+    MINIMUM_BALANCE = Decimal('0')
+
     @staticmethod
     @transaction.atomic
-    def open_account(member_id: int, account_type: str, initial_deposit: Decimal) -> SavingsAccount:
+    def open_account(member_id: int, account_type: str, initial_deposit: Decimal,
+                     minimum_balance: Decimal = MINIMUM_BALANCE) -> SavingsAccount:
         member = Member.objects.get(id=member_id)
+        if InterestRateTable.minimum_balance(account_type) is None:
+            raise ValueError(f"No interest rate is configured for {account_type} accounts")
         account_number = SavingsAccountService._generate_account_number(member)
 
         account = SavingsAccount.objects.create(
@@ -20,7 +28,10 @@ class SavingsAccountService:
             account_number=account_number,
             account_type=account_type,
             balance=initial_deposit,
-            interest_rate=InterestRate.objects.get(account_type=account_type).rate
+            # Below the lowest tier the account earns nothing until topped up
+            interest_rate=InterestRateTable.resolve(account_type, initial_deposit) or Decimal('0'),
+            status='ACTIVE',
+            minimum_balance=minimum_balance
         )
 
         if initial_deposit > 0:
@@ -36,10 +47,28 @@ class SavingsAccountService:
 
     @staticmethod
     def _generate_account_number(member: Member) -> str:
+        return SavingsAccountService.allocate_account_numbers(1)[0]
+
+    @staticmethod
+    def allocate_account_numbers(count: int) -> list:
+        """Reserve ``count`` consecutive account numbers, e.g. for bulk openings."""
         prefix = f"SAV{datetime.now().year}"
-        count = SavingsAccount.objects.filter(
-            account_number__startswith=prefix
-        ).count()
-        return f"{prefix}{str(count + 1).zfill(6)}"
+        numbers = NumberSequenceService.allocate(
+            f"savings.account_number.{prefix}",
+            count,
+            start=lambda: SavingsAccountService._account_number_seed(prefix)
+        )
+        return [f"{prefix}{str(number).zfill(6)}" for number in numbers]
+
+    @staticmethod
+    def _account_number_seed(prefix: str) -> int:
+        """First sequence value past the highest number issued before the sequence existed.
+
+        Counting them would reuse a number after a deletion or any gap.
+        """
+        numbers = SavingsAccount.objects.filter(
+            account_number__regex=rf'^{prefix}[0-9]{{6}}$'
+        ).values_list('account_number', flat=True)
+        return max((int(number[-6:]) for number in numbers), default=0) + 1
 
 
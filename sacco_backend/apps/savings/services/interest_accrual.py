@@ -0,0 +1,121 @@
+# apps/savings/services/interest_accrual.py
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Tuple
+
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, When, Window
+from django.db.models.functions import Coalesce, Lead, TruncDate
+from django.utils import timezone
+
+from ..models import SavingsTransaction
+from .rate_table import InterestRateTable
+
+
+class InterestAccrualService:
+    """Average-daily-balance interest derived from the savings balance history.
+
+    An account's closing balance for a day is the balance_after of its last
+    SavingsTransaction that day, or the previous day's closing balance when
+    it had none. Savings services, TransactionService and interest posting
+    all write such a row with every balance change, so the history needs no
+    separate table: a balance holds from its transaction's day until the day
+    of the next one, which a Lead window gives per row.
+    """
+    DAYS_IN_YEAR = Decimal('365')
+    DEBITS = ('WITHDRAWAL', 'CHARGE')
+
+    @staticmethod
+    def day_start(day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def opening_balance(start: date) -> Coalesce:
+        """Annotation for a SavingsAccount queryset: the closing balance before ``start``.
+
+        Without history before ``start`` it is the balance before the first
+        later transaction, and without any history the current balance, as
+        accounts funded before balance history was kept have none.
+        """
+        period_start = InterestAccrualService.day_start(start)
+        last = SavingsTransaction.objects.filter(
+            account=OuterRef('pk'),
+            date__lt=period_start
+        ).order_by('-date', '-id').values('balance_after')[:1]
+        first = SavingsTransaction.objects.filter(
+            account=OuterRef('pk'),
+            date__gte=period_start
+        ).order_by('date', 'id').annotate(
+            balance_before=Case(
+                When(transaction_type__in=InterestAccrualService.DEBITS, then=F('balance_after') + F('amount')),
+                default=F('balance_after') - F('amount')
+            )
+        ).values('balance_before')[:1]
+        return Coalesce(
+            Subquery(last), Subquery(first), F('balance'),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        )
+
+    @staticmethod
+    def balance_days(openings: Dict[int, Decimal], start: date, end: date) -> Dict[int, Decimal]:
+        """Sum of each account's daily closing balances from ``start`` to ``end`` inclusive.
+
+        ``openings`` maps account ids to their balance before ``start``; the
+        period's transactions are read with a single windowed query.
+        """
+        period_end = end + timedelta(days=1)
+        rows = SavingsTransaction.objects.filter(
+            account_id__in=list(openings),
+            date__gte=InterestAccrualService.day_start(start),
+            date__lt=InterestAccrualService.day_start(period_end)
+        ).annotate(
+            day=TruncDate('date'),
+            next_day=Window(
+                Lead(TruncDate('date')),
+                partition_by=[F('account_id')],
+                order_by=[F('date').asc(), F('id').asc()]
+            )
+        ).order_by('account_id', 'date', 'id').values_list('account_id', 'day', 'balance_after', 'next_day')
+
+        totals = {}
+        for account_id, day, balance_after, next_day in rows:
+            if account_id not in totals:
+                # The opening balance holds until the first change in the period
+                totals[account_id] = openings[account_id] * (day - start).days
+            totals[account_id] += balance_after * ((next_day or period_end) - day).days
+
+        days = (period_end - start).days
+        for account_id, opening in openings.items():
+            totals.setdefault(account_id, opening * days)
+        return totals
+
+    @staticmethod
+    def accrue(accounts: Iterable[Tuple[int, Decimal, str, Decimal]], start: date, end: date) -> Dict[int, Decimal]:
+        """Interest on the average daily balance.
+
+        ``accounts`` are (account id, opening balance, account type, account
+        rate) rows; the tier is chosen by the average daily balance.
+        """
+        accounts = list(accounts)
+        balance_days = InterestAccrualService.balance_days(
+            {account_id: opening for account_id, opening, _, _ in accounts}, start, end
+        )
+        days = (end - start).days + 1
+        return {
+            account_id: InterestAccrualService.interest(
+                balance_days[account_id],
+                InterestAccrualService.rate(account_type, balance_days[account_id] / days, end, account_rate)
+            )
+            for account_id, _, account_type, account_rate in accounts
+        }
+
+    @staticmethod
+    def rate(account_type: str, balance: Decimal, on_date: date, account_rate: Decimal) -> Decimal:
+        """The tiered rate for ``balance``; types without configured rates keep the account's own."""
+        if InterestRateTable.minimum_balance(account_type, on_date) is None:
+            return account_rate
+        return InterestRateTable.resolve(account_type, balance, on_date) or Decimal('0')
+
+    @staticmethod
+    def interest(balance_days: Decimal, annual_rate: Decimal) -> Decimal:
+        interest = balance_days * annual_rate / (InterestAccrualService.DAYS_IN_YEAR * 100)
+        return max(interest.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP), Decimal('0'))
@@ -1,14 +1,19 @@
 # apps/savings/services/interest_calculation.py
 from decimal import Decimal, ROUND_HALF_UP
-from datetime import datetime, timedelta
+from datetime import timedelta
 from django.db import transaction
-from ..models import SavingsAccount, InterestRate, SavingsTransaction
+from django.utils import timezone
+from ..models import SavingsAccount, SavingsTransaction
+from .interest_accrual import InterestAccrualService
 
 
 class InterestCalculationService:
     @staticmethod
     def calculate_daily_interest(account: SavingsAccount) -> Decimal:
-        daily_rate = account.interest_rate / Decimal('36500')  # 365 days
+        rate = InterestAccrualService.rate(
+            account.account_type, account.balance, timezone.localdate(), account.interest_rate
+        )
+        daily_rate = rate / Decimal('36500')  # 365 days
         interest = (account.balance * daily_rate).quantize(
             Decimal('0.01'),
             rounding=ROUND_HALF_UP
@@ -18,12 +23,18 @@ class InterestCalculationService:
     @staticmethod
     @transaction.atomic
     def apply_monthly_interest(account: SavingsAccount) -> SavingsTransaction | None:
-        total_interest = Decimal('0')
-        today = datetime.now().date()
-        days_in_month = (today - today.replace(day=1)).days
+        """Credit interest on the average daily balance from the 1st of the month to yesterday."""
+        today = timezone.localdate()
+        start, end = today.replace(day=1), today - timedelta(days=1)
+        if end < start:
+            return None
 
-        for _ in range(days_in_month):
-            total_interest += InterestCalculationService.calculate_daily_interest(account)
+        account = SavingsAccount.objects.select_for_update().annotate(
+            opening=InterestAccrualService.opening_balance(start)
+        ).get(pk=account.pk)
+        total_interest = InterestAccrualService.accrue(
+            [(account.id, account.opening, account.account_type, account.interest_rate)], start, end
+        )[account.id]
 
         if total_interest > 0:
             _transaction = SavingsTransaction.objects.create(
@@ -31,11 +42,11 @@ class InterestCalculationService:
                 transaction_type='INTEREST',
                 amount=total_interest,
                 balance_after=account.balance + total_interest,
-                reference=f"INT_{today.strftime('%Y%m')}"
+                reference=f"INT_{today.strftime('%Y%m')}_{account.id}"
             )
 
             account.balance += total_interest
-            account.last_interest_date = today
+            account.last_interest_date = timezone.now()
             account.save()
 
             return _transaction
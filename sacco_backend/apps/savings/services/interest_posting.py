@@ -0,0 +1,116 @@
+# apps/savings/services/interest_posting.py
+import calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import SavingsAccount, SavingsTransaction
+from .interest_accrual import InterestAccrualService
+
+
+class InterestPostingService:
+    """Posts a month's interest to every active account in keyset-ordered chunks.
+
+    Interest is accrued on each account's average daily balance over the
+    month. Each chunk locks its accounts, inserts the interest transactions with one
+    bulk INSERT and credits the balances with one UPDATE. Accounts are marked
+    by setting last_interest_date to the period end, so re-running a period
+    (or resuming after a failure) only picks up accounts not yet posted, and
+    the per-account reference INT_<YYYYMM>_<account id> guards the rest.
+    """
+    CHUNK_SIZE = 5000
+
+    @staticmethod
+    def reference(period: date, account_id: int) -> str:
+        return f"INT_{period:%Y%m}_{account_id}"
+
+    @staticmethod
+    def previous_period(today: Optional[date] = None) -> date:
+        today = today or timezone.localdate()
+        return today.replace(day=1) - timedelta(days=1)
+
+    @staticmethod
+    def period_days(period: date) -> tuple:
+        """First and last day of ``period``'s month."""
+        return period.replace(day=1), period.replace(day=calendar.monthrange(period.year, period.month)[1])
+
+    @staticmethod
+    def period_marker(period: date) -> datetime:
+        """The last_interest_date recorded for accounts posted for ``period``'s month."""
+        return timezone.make_aware(datetime.combine(InterestPostingService.period_days(period)[1], time.min))
+
+    @staticmethod
+    def post_period(period: Optional[date] = None, chunk_size: int = CHUNK_SIZE) -> dict:
+        period = period or InterestPostingService.previous_period()
+        marker = InterestPostingService.period_marker(period)
+
+        accounts = posted = 0
+        total = Decimal('0')
+        last_id = 0
+        while True:
+            chunk = InterestPostingService._post_chunk(period, marker, last_id, chunk_size)
+            if chunk is None:
+                break
+            last_id, chunk_accounts, chunk_posted, chunk_total = chunk
+            accounts += chunk_accounts
+            posted += chunk_posted
+            total += chunk_total
+
+        return {
+            'period': f"{period:%Y-%m}",
+            'accounts': accounts,
+            'transactions': posted,
+            'interest': total
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def _post_chunk(period: date, marker: datetime, after_id: int, chunk_size: int) -> Optional[tuple]:
+        start, end = InterestPostingService.period_days(period)
+        rows = list(
+            SavingsAccount.objects.select_for_update().filter(
+                Q(last_interest_date__isnull=True) | Q(last_interest_date__lt=marker),
+                id__gt=after_id,
+                status='ACTIVE'
+            ).annotate(
+                opening=InterestAccrualService.opening_balance(start)
+            ).order_by('id').values_list('id', 'balance', 'account_type', 'interest_rate', 'opening')[:chunk_size]
+        )
+        if not rows:
+            return None
+
+        accrued = InterestAccrualService.accrue(
+            ((account_id, opening, account_type, rate) for account_id, _, account_type, rate, opening in rows), start, end
+        )
+        postings = []
+        for account_id, balance, _, _, _ in rows:
+            interest = accrued[account_id]
+            if interest > 0:
+                postings.append(SavingsTransaction(
+                    account_id=account_id,
+                    transaction_type='INTEREST',
+                    amount=interest,
+                    balance_after=balance + interest,
+                    reference=InterestPostingService.reference(period, account_id)
+                ))
+        SavingsTransaction.objects.bulk_create(postings)
+
+        # Credit each account with the interest row just inserted for it
+        interest = SavingsTransaction.objects.filter(
+            account=OuterRef('pk'),
+            transaction_type='INTEREST',
+            reference__startswith=f"INT_{period:%Y%m}_"
+        ).values('amount')[:1]
+        SavingsAccount.objects.filter(id__in=[row[0] for row in rows]).update(
+            balance=F('balance') + Coalesce(
+                Subquery(interest), Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            last_interest_date=marker
+        )
+
+        return rows[-1][0], len(rows), len(postings), sum((posting.amount for posting in postings), Decimal('0'))
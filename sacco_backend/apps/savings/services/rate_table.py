@@ -0,0 +1,106 @@
+# apps/savings/services/rate_table.py
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from django.utils import timezone
+
+from apps.sequences.services.sequence_service import NumberSequenceService
+from ..models import InterestRate
+
+
+class InterestRateTable:
+    """In-process, interval-indexed copy of the InterestRate table.
+
+    Each InterestRate row is a balance tier (rate from minimum_balance up to
+    the next tier) that applies from its effective_date until a later row
+    for the same account type and minimum_balance replaces it. The table is
+    loaded whole into, per account type, a sorted list of effective dates
+    and the full tier schedule in force from each, so resolving
+    (account_type, balance, date) is two bisections.
+
+    Invalidation mirrors TransactionRuleCache: saves and deletes bump a
+    version kept in a NumberSequence row that each process checks at most
+    once every REVALIDATE_SECONDS.
+    """
+    VERSION_KEY = 'savings:rate_table:version'
+    REVALIDATE_SECONDS = 5
+
+    _lock = threading.Lock()
+    _state = None
+    _checked_at = 0.0
+
+    @classmethod
+    def resolve(cls, account_type: str, balance: Decimal, on_date: Optional[date] = None) -> Optional[Decimal]:
+        """Annual rate for ``balance`` on ``on_date``; None below the lowest tier or before any rate."""
+        schedule = cls._schedule(account_type, on_date)
+        if schedule is None:
+            return None
+
+        thresholds, rates = schedule
+        index = bisect_right(thresholds, balance) - 1
+        return rates[index] if index >= 0 else None
+
+    @classmethod
+    def minimum_balance(cls, account_type: str, on_date: Optional[date] = None) -> Optional[Decimal]:
+        """The lowest tier's minimum balance in force on ``on_date``."""
+        schedule = cls._schedule(account_type, on_date)
+        return schedule[0][0] if schedule else None
+
+    @classmethod
+    def invalidate(cls) -> None:
+        NumberSequenceService.allocate(cls.VERSION_KEY)
+
+        with cls._lock:
+            cls._state = None
+
+    @classmethod
+    def _schedule(cls, account_type: str, on_date: Optional[date]) -> Optional[tuple]:
+        versions = cls._ensure_fresh()['types'].get(account_type)
+        if versions is None:
+            return None
+
+        effective_dates, schedules = versions
+        index = bisect_right(effective_dates, on_date or timezone.localdate()) - 1
+        return schedules[index] if index >= 0 else None
+
+    @classmethod
+    def _ensure_fresh(cls) -> dict:
+        state = cls._state
+        now = time.monotonic()
+        if state is not None and now - cls._checked_at < cls.REVALIDATE_SECONDS:
+            return state
+
+        version = NumberSequenceService.current(cls.VERSION_KEY)
+        with cls._lock:
+            state = cls._state
+            if state is None or state['version'] != version:
+                state = cls._load(version)
+                cls._state = state
+            cls._checked_at = now
+        return state
+
+    @staticmethod
+    def _load(version) -> dict:
+        rows = {}
+        for rate in InterestRate.objects.order_by('account_type', 'effective_date', 'id'):
+            rows.setdefault(rate.account_type, []).append(rate)
+
+        types = {}
+        for account_type, rates in rows.items():
+            effective_dates, schedules, tiers = [], [], {}
+            for rate in rates:
+                # Later rows for the same tier replace earlier ones from their effective date
+                tiers[rate.minimum_balance] = rate.rate
+                if effective_dates and effective_dates[-1] == rate.effective_date:
+                    effective_dates.pop()
+                    schedules.pop()
+                thresholds = sorted(tiers)
+                effective_dates.append(rate.effective_date)
+                schedules.append((thresholds, [tiers[threshold] for threshold in thresholds]))
+            types[account_type] = (effective_dates, schedules)
+
+        return {'version': version, 'types': types}
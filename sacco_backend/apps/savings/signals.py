@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import InterestRate
+from .services.rate_table import InterestRateTable
+
+
+@receiver([post_save, post_delete], sender=InterestRate)
+def invalidate_rate_table(sender, **kwargs):
+    # As with the transaction rule cache: drop now for this connection and
+    # again on commit so other processes cannot reload the old rows.
+    InterestRateTable.invalidate()
+    transaction.on_commit(InterestRateTable.invalidate)
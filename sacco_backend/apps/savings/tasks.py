@@ -1,21 +1,13 @@
 # apps/savings/tasks.py
-from datetime import datetime
+from datetime import date
 
 from celery import shared_task
 
-from apps.savings.models import SavingsAccount
-from apps.savings.services.transaction_service import SavingsTransactionService
+from apps.savings.services.interest_posting import InterestPostingService
 
 
 @shared_task
-def calculate_monthly_interest():
-    accounts = SavingsAccount.objects.filter(status='ACTIVE')
-    for account in accounts:
-        interest = (account.balance * account.interest_rate) / 1200
-        if interest > 0:
-            SavingsTransactionService.process_transaction(
-                account.id,
-                'INTEREST',
-                interest,
-                f"INT_{datetime.now().strftime('%Y%m')}"
-            )
+def calculate_monthly_interest(period=None):
+    # Defaults to the month that has just ended; pass YYYY-MM-DD to (re)post another
+    result = InterestPostingService.post_period(date.fromisoformat(period) if period else None)
+    return {**result, 'interest': str(result['interest'])}
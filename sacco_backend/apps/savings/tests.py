@@ -1,3 +1,338 @@
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.savings.models import InterestRate, SavingsAccount, SavingsTransaction
+from apps.savings.services.account_service import SavingsAccountService
+from apps.savings.services.interest_accrual import InterestAccrualService
+from apps.savings.services.interest_posting import InterestPostingService
+from apps.savings.services.rate_table import InterestRateTable
+from apps.sequences.services.sequence_service import NumberSequenceService
+from apps.transactions.services.transaction_service import TransactionService
+
+User = get_user_model()
+
+
+class SavingsTestCase(TestCase):
+    PERIOD = date(2024, 5, 31)
+    OPENED = datetime(2024, 4, 15, 9, 0)
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='saver@example.com',
+            password='testpass123',
+            first_name='Saver',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000110',
+            national_id='SAVER1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024SAVER',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Teacher',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='SAVER1',
+            membership_number='SACCOM2024SAVER',
+            membership_type='INDIVIDUAL'
+        )
+
+    def _account(self, number, balance, rate, status='ACTIVE'):
+        account = SavingsAccount.objects.create(
+            member=self.member,
+            account_number=number,
+            account_type='REGULAR',
+            balance=balance,
+            interest_rate=rate,
+            minimum_balance=Decimal('0.00'),
+            status=status
+        )
+        if balance:
+            self._transaction(account, 'DEPOSIT', balance, balance, self.OPENED, f'INIT_{number}')
+        return account
+
+    def _transaction(self, account, transaction_type, amount, balance_after, when, reference):
+        # Transaction dates are auto_now_add, so backdate after creating
+        posting = SavingsTransaction.objects.create(
+            account=account,
+            transaction_type=transaction_type,
+            amount=amount,
+            balance_after=balance_after,
+            reference=reference
+        )
+        SavingsTransaction.objects.filter(pk=posting.pk).update(date=timezone.make_aware(when))
+        return posting
+
+
+class InterestPostingServiceTest(SavingsTestCase):
+    POSTED = {'SAV001': Decimal('611.51'), 'SAV002': Decimal('1.42'), 'SAV003': Decimal('509.59')}
+
+    def setUp(self):
+        super().setUp()
+        self.accounts = [
+            self._account('SAV001', Decimal('120000.00'), Decimal('6.00')),
+            self._account('SAV002', Decimal('333.33'), Decimal('5.00')),
+            self._account('SAV003', Decimal('50000.00'), Decimal('12.00')),
+        ]
+        self.dormant = self._account('SAV004', Decimal('90000.00'), Decimal('6.00'), status='DORMANT')
+        self.empty = self._account('SAV005', Decimal('0.00'), Decimal('6.00'))
+
+    def test_posts_interest_with_unique_references(self):
+        result = InterestPostingService.post_period(self.PERIOD, chunk_size=2)
+
+        self.assertEqual(result['accounts'], 4)
+        self.assertEqual(result['transactions'], 3)
+        self.assertEqual(result['interest'], Decimal('611.51') + Decimal('1.42') + Decimal('509.59'))
+
+        expected = {'SAV001': Decimal('120611.51'), 'SAV002': Decimal('334.75'), 'SAV003': Decimal('50509.59')}
+        for account in SavingsAccount.objects.filter(account_number__in=expected):
+            self.assertEqual(account.balance, expected[account.account_number])
+            posting = SavingsTransaction.objects.get(account=account, transaction_type='INTEREST')
+            self.assertEqual(posting.reference, f'INT_202405_{account.id}')
+            self.assertEqual(posting.balance_after, account.balance)
+            self.assertEqual(account.last_interest_date, InterestPostingService.period_marker(self.PERIOD))
+
+        self.dormant.refresh_from_db()
+        self.assertEqual(self.dormant.balance, Decimal('90000.00'))
+        self.assertFalse(
+            SavingsTransaction.objects.filter(account__in=[self.dormant, self.empty], transaction_type='INTEREST').exists()
+        )
+
+    def test_rerunning_a_period_is_a_no_op(self):
+        InterestPostingService.post_period(self.PERIOD)
+        result = InterestPostingService.post_period(self.PERIOD)
+
+        self.assertEqual(result['accounts'], 0)
+        self.assertEqual(SavingsTransaction.objects.filter(transaction_type='INTEREST').count(), 3)
+        self.assertEqual(SavingsAccount.objects.get(account_number='SAV001').balance, Decimal('120611.51'))
+
+    def test_next_period_posts_again(self):
+        InterestPostingService.post_period(self.PERIOD)
+        # As if May's interest had been posted on the night of 1 June
+        SavingsTransaction.objects.filter(transaction_type='INTEREST').update(
+            date=timezone.make_aware(datetime(2024, 6, 1, 1, 30))
+        )
+        InterestPostingService.post_period(date(2024, 6, 30))
+
+        # June accrues on May's closing balance including its interest
+        self.assertEqual(SavingsAccount.objects.get(account_number='SAV003').balance, Decimal('51007.77'))
+        self.assertEqual(
+            SavingsTransaction.objects.filter(reference__startswith='INT_202406_').count(), 3
+        )
+
+    def test_queries_grow_with_chunks_not_accounts(self):
+        with CaptureQueriesContext(connection) as one_chunk:
+            InterestPostingService.post_period(self.PERIOD)
+        SavingsAccount.objects.update(last_interest_date=None)
+        SavingsTransaction.objects.filter(transaction_type='INTEREST').delete()
+
+        for n in range(6, 26):
+            self._account(f'SAV{n:03d}', Decimal('1000.00'), Decimal('6.00'))
+        with CaptureQueriesContext(connection) as many_accounts:
+            InterestPostingService.post_period(self.PERIOD)
+
+        self.assertEqual(len(many_accounts), len(one_chunk))
+
+
+    def test_deposits_through_transaction_service_earn_interest(self):
+        account = self._account('SAV030', Decimal('0.00'), Decimal('6.00'))
+        self.member.savings_account = account
+        self.member.save()
+
+        deposit = TransactionService.create_transaction(
+            member_id=self.member.id, transaction_type='DEPOSIT', amount=Decimal('36500'), payment_method='CASH'
+        )
+        history = SavingsTransaction.objects.get(account=account)
+        self.assertEqual((history.reference, history.balance_after), (deposit.transaction_ref, Decimal('36500.00')))
+        SavingsTransaction.objects.filter(pk=history.pk).update(date=timezone.make_aware(self.OPENED))
+
+        InterestPostingService.post_period(self.PERIOD)
+
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal('36686.00'))
+
+    def test_accounts_without_history_accrue_on_their_balance(self):
+        # Funded before balance history was kept
+        untracked = self._account('SAV031', Decimal('0.00'), Decimal('5.00'))
+        SavingsAccount.objects.filter(pk=untracked.pk).update(balance=Decimal('73000.00'))
+        # History only starts with a deposit on 11 May
+        late = self._account('SAV032', Decimal('0.00'), Decimal('10.00'))
+        SavingsAccount.objects.filter(pk=late.pk).update(balance=Decimal('20000.00'))
+        self._transaction(late, 'DEPOSIT', Decimal('10000'), Decimal('20000'), datetime(2024, 5, 11, 9), 'DEP32')
+
+        InterestPostingService.post_period(self.PERIOD)
+
+        # 73000 for 31 days at 5%; 10000 x 10 days + 20000 x 21 days at 10%
+        self.assertEqual(
+            dict(SavingsTransaction.objects.filter(transaction_type='INTEREST').values_list('account__account_number', 'amount')),
+            {'SAV031': Decimal('310.00'), 'SAV032': Decimal('142.47'), **self.POSTED}
+        )
+
+
+class InterestAccrualServiceTest(SavingsTestCase):
+    def test_interest_on_average_daily_balance(self):
+        account = self._account('SAV010', Decimal('10000.00'), Decimal('10.00'))
+        # Two deposits on 10 May: only the day's closing balance counts
+        self._transaction(account, 'DEPOSIT', Decimal('5000'), Decimal('15000'), datetime(2024, 5, 10, 9), 'DEP1')
+        self._transaction(account, 'DEPOSIT', Decimal('5000'), Decimal('20000'), datetime(2024, 5, 10, 15), 'DEP2')
+        self._transaction(account, 'WITHDRAWAL', Decimal('15000'), Decimal('5000'), datetime(2024, 5, 21, 11), 'WDR1')
+        # After the period, so ignored
+        self._transaction(account, 'DEPOSIT', Decimal('95000'), Decimal('100000'), datetime(2024, 6, 1, 8), 'DEP3')
+
+        start, end = date(2024, 5, 1), self.PERIOD
+        opening = SavingsAccount.objects.annotate(
+            opening=InterestAccrualService.opening_balance(start)
+        ).get(pk=account.pk).opening
+        self.assertEqual(opening, Decimal('10000.00'))
+
+        # 10000 x 9 days + 20000 x 11 days + 5000 x 11 days
+        balance_days = InterestAccrualService.balance_days({account.id: opening}, start, end)
+        self.assertEqual(balance_days[account.id], Decimal('365000'))
+        self.assertEqual(
+            InterestAccrualService.accrue([(account.id, opening, 'REGULAR', account.interest_rate)], start, end),
+            {account.id: Decimal('100.00')}
+        )
+
+    def test_account_without_activity_keeps_opening_balance(self):
+        quiet = self._account('SAV011', Decimal('7300.00'), Decimal('5.00'))
+        unfunded = self._account('SAV012', Decimal('0.00'), Decimal('5.00'))
+
+        balance_days = InterestAccrualService.balance_days(
+            {quiet.id: Decimal('7300.00'), unfunded.id: Decimal('0')}, date(2024, 5, 1), self.PERIOD
+        )
+
+        self.assertEqual(balance_days, {quiet.id: Decimal('7300.00') * 31, unfunded.id: Decimal('0')})
+
+    def test_one_windowed_query_per_chunk(self):
+        accounts = [self._account(f'SAV1{n:02d}', Decimal('1000.00'), Decimal('6.00')) for n in range(10)]
+
+        with self.assertNumQueries(1):
+            InterestAccrualService.balance_days(
+                {account.id: Decimal('1000.00') for account in accounts}, date(2024, 5, 1), self.PERIOD
+            )
+
+
+class InterestRateTableTest(SavingsTestCase):
+    def setUp(self):
+        super().setUp()
+        for minimum, rate, effective in [
+            ('0', '3.00', date(2024, 1, 1)),
+            ('100000', '5.00', date(2024, 1, 1)),
+            ('100000', '6.00', date(2024, 6, 1)),
+            ('1000000', '7.00', date(2024, 6, 1)),
+        ]:
+            InterestRate.objects.create(
+                account_type='REGULAR', minimum_balance=Decimal(minimum), rate=Decimal(rate), effective_date=effective
+            )
+        # Test rollbacks do not fire model signals
+        self.addCleanup(InterestRateTable.invalidate)
+
+    def test_resolves_tier_in_force_on_date(self):
+        cases = [
+            (Decimal('50000'), date(2024, 3, 1), Decimal('3.00')),
+            (Decimal('150000'), date(2024, 3, 1), Decimal('5.00')),
+            (Decimal('2000000'), date(2024, 5, 31), Decimal('5.00')),
+            (Decimal('150000'), date(2024, 6, 1), Decimal('6.00')),
+            # Tiers not replaced on 1 June stay in force
+            (Decimal('50000'), date(2024, 7, 1), Decimal('3.00')),
+            (Decimal('2000000'), date(2024, 7, 1), Decimal('7.00')),
+            (Decimal('50000'), date(2023, 12, 31), None),
+        ]
+        for balance, on_date, expected in cases:
+            self.assertEqual(InterestRateTable.resolve('REGULAR', balance, on_date), expected, (balance, on_date))
+        self.assertIsNone(InterestRateTable.resolve('FIXED', Decimal('50000'), date(2024, 7, 1)))
+
+    def test_lookups_are_served_from_memory(self):
+        InterestRateTable.resolve('REGULAR', Decimal('50000'), date(2024, 3, 1))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(InterestRateTable.minimum_balance('REGULAR', date(2024, 3, 1)), Decimal('0'))
+            InterestRateTable.resolve('REGULAR', Decimal('150000'), date(2024, 7, 1))
+
+    def test_saving_a_rate_invalidates_the_table(self):
+        self.assertEqual(InterestRateTable.resolve('REGULAR', Decimal('150000'), date(2024, 9, 1)), Decimal('6.00'))
+
+        InterestRate.objects.create(
+            account_type='REGULAR', minimum_balance=Decimal('100000'), rate=Decimal('6.50'),
+            effective_date=date(2024, 9, 1)
+        )
+
+        self.assertEqual(InterestRateTable.resolve('REGULAR', Decimal('150000'), date(2024, 9, 1)), Decimal('6.50'))
+
+    def test_invalidation_reaches_other_processes(self):
+        self.assertEqual(InterestRateTable.resolve('REGULAR', Decimal('50000'), date(2024, 7, 1)), Decimal('3.00'))
+
+        # Another worker edits the rate: its local table is not ours, only the shared version moves
+        InterestRate.objects.filter(minimum_balance=Decimal('0')).update(rate=Decimal('3.25'))
+        NumberSequenceService.allocate(InterestRateTable.VERSION_KEY)
+        self.assertEqual(InterestRateTable.resolve('REGULAR', Decimal('50000'), date(2024, 7, 1)), Decimal('3.00'))
+
+        with patch.object(InterestRateTable, 'REVALIDATE_SECONDS', 0):
+            rate = InterestRateTable.resolve('REGULAR', Decimal('50000'), date(2024, 7, 1))
+        self.assertEqual(rate, Decimal('3.25'))
+
+    def test_accrual_uses_tier_of_average_daily_balance(self):
+        account = self._account('SAV020', Decimal('120000.00'), Decimal('1.00'))
+        # Average daily balance for June stays above the 100000 tier
+        self._transaction(account, 'WITHDRAWAL', Decimal('60000'), Decimal('60000'), datetime(2024, 6, 21, 10), 'WDR20')
+
+        interest = InterestAccrualService.accrue(
+            [(account.id, Decimal('120000.00'), 'REGULAR', account.interest_rate)], date(2024, 6, 1), date(2024, 6, 30)
+        )
+
+        # (120000 x 20 + 60000 x 10) at the 6% tier
+        self.assertEqual(interest[account.id], Decimal('493.15'))
+
+    def test_open_account_uses_rate_table(self):
+        account = SavingsAccountService.open_account(self.member.id, 'REGULAR', Decimal('150000'))
+
+        self.assertEqual(account.status, 'ACTIVE')
+        self.assertEqual(account.minimum_balance, Decimal('0'))
+        self.assertEqual(account.interest_rate, Decimal('6.00'))
+
+        with self.assertRaises(ValueError):
+            SavingsAccountService.open_account(self.member.id, 'FIXED', Decimal('150000'))
+
+    def test_open_account_does_not_take_floor_from_lowest_tier(self):
+        InterestRate.objects.create(
+            account_type='FIXED', minimum_balance=Decimal('50000'), rate=Decimal('8.00'), effective_date=date(2024, 1, 1)
+        )
+
+        account = SavingsAccountService.open_account(self.member.id, 'FIXED', Decimal('150000'))
+        self.assertEqual(account.minimum_balance, SavingsAccountService.MINIMUM_BALANCE)
+        self.assertEqual(account.interest_rate, Decimal('8.00'))
+
+        account = SavingsAccountService.open_account(self.member.id, 'FIXED', Decimal('150000'), Decimal('20000'))
+        self.assertEqual(account.minimum_balance, Decimal('20000'))
+
+    def test_account_numbers_continue_after_existing_ones(self):
+        prefix = f'SAV{datetime.now().year}'
+        self._account(f'{prefix}000001', Decimal('0.00'), Decimal('3.00'))
+
+        numbers = [
+            SavingsAccountService.open_account(self.member.id, 'REGULAR', Decimal('1000')).account_number
+            for _ in range(2)
+        ]
+
+        self.assertEqual(numbers, [f'{prefix}000002', f'{prefix}000003'])
+
+    def test_account_numbers_continue_past_gaps_in_legacy_numbers(self):
+        # The first account was closed and deleted before the sequence existed
+        prefix = f'SAV{datetime.now().year}'
+        self._account(f'{prefix}000002', Decimal('0.00'), Decimal('3.00'))
 
-# Create your tests here.
+        self.assertEqual(SavingsAccountService.allocate_account_numbers(2), [f'{prefix}000003', f'{prefix}000004'])
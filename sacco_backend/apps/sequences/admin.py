@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import NumberSequence
+
+
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'next_value', 'updated_at')
+    search_fields = ('name',)
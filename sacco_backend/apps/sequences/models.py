@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class NumberSequence(models.Model):
+    """A named counter handing out reference numbers and cache versions."""
+    name = models.CharField(max_length=100, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.next_value}"
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.test import TestCase
+
+from apps.sequences.models import NumberSequence
+from apps.sequences.services.sequence_service import NumberSequenceService
+
+
+class NumberSequenceServiceTest(TestCase):
+    def test_numbers_are_consecutive(self):
+        self.assertEqual(NumberSequenceService.next_value('test.seq'), 1)
+        self.assertEqual(NumberSequenceService.next_value('test.seq'), 2)
+        self.assertEqual(NumberSequenceService.allocate('test.seq', 3), range(3, 6))
+        self.assertEqual(NumberSequenceService.next_value('test.seq'), 6)
+        self.assertEqual(NumberSequenceService.next_value('test.other'), 1)
+
+    def test_start_seeds_a_new_sequence_once(self):
+        calls = []
+
+        def start():
+            calls.append(1)
+            return 41
+
+        self.assertEqual(NumberSequenceService.next_value('test.seeded', start=start), 41)
+        self.assertEqual(NumberSequenceService.next_value('test.seeded', start=start), 42)
+        self.assertEqual(len(calls), 1)
+
+    def test_allocation_is_one_update_once_created(self):
+        NumberSequenceService.next_value('test.seq')
+
+        # Savepoint, UPDATE, SELECT, release
+        with self.assertNumQueries(4):
+            NumberSequenceService.allocate('test.seq', 1000)
+
+    def test_rolled_back_numbers_are_reissued(self):
+        NumberSequenceService.next_value('test.seq')
+        try:
+            with transaction.atomic():
+                NumberSequenceService.allocate('test.seq', 10)
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(NumberSequence.objects.get(name='test.seq').next_value, 2)
+        self.assertEqual(NumberSequenceService.next_value('test.seq'), 2)
@@ -76,4 +76,22 @@ class TransactionLimit(models.Model):
     transaction_type = models.CharField(max_length=20)
     limit_type = models.CharField(max_length=20, choices=LIMIT_TYPES)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    member_type = models.CharField(max_length=20)  # Regular, Premium, etc.
\ No newline at end of file
+    member_type = models.CharField(max_length=20)  # Regular, Premium, etc.
+
+class TransactionVolumeCounter(models.Model):
+    """Per-member running totals used to enforce DAILY and MONTHLY limits."""
+    PERIODS = [
+        ('DAILY', 'Daily'),
+        ('MONTHLY', 'Monthly')
+    ]
+
+    member = models.ForeignKey(Member, on_delete=models.CASCADE)
+    transaction_type = models.CharField(max_length=20)
+    period = models.CharField(max_length=10, choices=PERIODS)
+    period_start = models.DateField()
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['member', 'transaction_type', 'period', 'period_start']
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 
 from apps.transactions.models import Transaction, TransactionFee
@@ -12,4 +14,24 @@ class TransactionSerializer(serializers.ModelSerializer):
 class TransactionFeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = TransactionFee
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class TransactionBatchItemSerializer(serializers.Serializer):
+    member_id = serializers.IntegerField()
+    transaction_type = serializers.ChoiceField(choices=['DEPOSIT', 'WITHDRAWAL'])
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    payment_method = serializers.ChoiceField(choices=Transaction.PAYMENT_METHODS)
+    description = serializers.CharField(required=False, allow_blank=True)
+    external_reference = serializers.CharField(max_length=50, required=False)
+    source_account = serializers.CharField(max_length=50, required=False)
+
+
+class TransactionBatchSerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 5000
+
+    transactions = TransactionBatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_transactions(self, value):
+        if len(value) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"A batch may contain at most {self.MAX_BATCH_SIZE} transactions")
+        return value
@@ -2,6 +2,7 @@
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict
 
+from .rule_cache import TransactionRuleCache
 from ..models import TransactionFee
 
 
@@ -13,11 +14,22 @@ class FeesCalculator:
             amount: Decimal,
             member_type: str = 'REGULAR'
     ) -> Dict[str, Decimal]:
-        fee_structure = TransactionFee.objects.get(
-            transaction_type=transaction_type,
-            payment_method=payment_method
-        )
+        fee_structure = TransactionRuleCache.get_fee_structure(transaction_type, payment_method, member_type)
+        if fee_structure is None:
+            return {
+                'base_fee': Decimal('0'),
+                'percentage_fee': Decimal('0'),
+                'total_fee': Decimal('0')
+            }
+
+        return FeesCalculator.apply_fee_structure(fee_structure, amount, member_type)
 
+    @staticmethod
+    def apply_fee_structure(
+            fee_structure: TransactionFee,
+            amount: Decimal,
+            member_type: str = 'REGULAR'
+    ) -> Dict[str, Decimal]:
         base_fee = fee_structure.fixed_amount
         percentage_fee = (amount * fee_structure.percentage / 100).quantize(
             Decimal('0.01'),
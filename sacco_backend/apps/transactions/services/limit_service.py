@@ -0,0 +1,137 @@
+# apps/transactions/services/limit_service.py
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import TransactionLimit, TransactionVolumeCounter
+
+
+class TransactionLimitService:
+    """Enforces DAILY and MONTHLY limits against per-member volume counters.
+
+    Every completed transaction adds its amount to the member's counter for
+    the current day and month, so a limit check touches at most two rows no
+    matter how much history the member has. Counters are written in the
+    caller's database transaction and roll back with it.
+    """
+    ROLLING_PERIODS = ('DAILY', 'MONTHLY')
+
+    @staticmethod
+    def period_starts(on_date: Optional[date] = None) -> dict:
+        on_date = on_date or timezone.localdate()
+        return {
+            'DAILY': on_date,
+            'MONTHLY': on_date.replace(day=1)
+        }
+
+    @staticmethod
+    def _rolling_limits(limits: Iterable[TransactionLimit]) -> dict:
+        rolling = {}
+        for limit in limits:
+            if limit.limit_type in TransactionLimitService.ROLLING_PERIODS:
+                current = rolling.get(limit.limit_type)
+                rolling[limit.limit_type] = limit.amount if current is None else min(current, limit.amount)
+        return rolling
+
+    @staticmethod
+    def record_usage(member_id: int, transaction_type: str, amount: Decimal,
+                     limits: Iterable[TransactionLimit], on_date: Optional[date] = None) -> None:
+        """Add `amount` to the member's counters, raising ValueError if a limit would be exceeded.
+
+        Each counter is bumped with a conditional UPDATE, so concurrent
+        transactions for the same member serialise on the counter row.
+        """
+        starts = TransactionLimitService.period_starts(on_date)
+        rolling_limits = TransactionLimitService._rolling_limits(limits)
+
+        TransactionVolumeCounter.objects.bulk_create(
+            [
+                TransactionVolumeCounter(
+                    member_id=member_id,
+                    transaction_type=transaction_type,
+                    period=period,
+                    period_start=period_start
+                )
+                for period, period_start in starts.items()
+            ],
+            ignore_conflicts=True
+        )
+
+        for period, period_start in starts.items():
+            counters = TransactionVolumeCounter.objects.filter(
+                member_id=member_id,
+                transaction_type=transaction_type,
+                period=period,
+                period_start=period_start
+            )
+            if period in rolling_limits:
+                counters = counters.filter(total_amount__lte=rolling_limits[period] - amount)
+
+            updated = counters.update(
+                total_amount=F('total_amount') + amount,
+                transaction_count=F('transaction_count') + 1,
+                updated_at=timezone.now()
+            )
+            if not updated:
+                raise ValueError(f"Amount exceeds {period.lower()} limit of {rolling_limits[period]}")
+
+    @staticmethod
+    def lock_counters(keys: Iterable[tuple], on_date: Optional[date] = None) -> dict:
+        """Create and lock the counters for (member_id, transaction_type) pairs.
+
+        Returns {(member_id, transaction_type, period): counter}. Rows are locked
+        in id order so concurrent batches cannot deadlock.
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        starts = TransactionLimitService.period_starts(on_date)
+        TransactionVolumeCounter.objects.bulk_create(
+            [
+                TransactionVolumeCounter(
+                    member_id=member_id,
+                    transaction_type=transaction_type,
+                    period=period,
+                    period_start=period_start
+                )
+                for member_id, transaction_type in keys
+                for period, period_start in starts.items()
+            ],
+            ignore_conflicts=True
+        )
+
+        period_filter = Q()
+        for period, period_start in starts.items():
+            period_filter |= Q(period=period, period_start=period_start)
+
+        counters = TransactionVolumeCounter.objects.select_for_update().filter(
+            period_filter,
+            member_id__in={member_id for member_id, _ in keys},
+            transaction_type__in={transaction_type for _, transaction_type in keys}
+        ).order_by('id')
+
+        return {
+            (counter.member_id, counter.transaction_type, counter.period): counter
+            for counter in counters
+        }
+
+    @staticmethod
+    def check_usage(counters: dict, member_id: int, transaction_type: str, amount: Decimal,
+                    limits: Iterable[TransactionLimit]) -> Optional[str]:
+        """Return an error message if `amount` would exceed a rolling limit, else None."""
+        for period, limit_amount in TransactionLimitService._rolling_limits(limits).items():
+            counter = counters[(member_id, transaction_type, period)]
+            if counter.total_amount + amount > limit_amount:
+                return f"Amount exceeds {period.lower()} limit of {limit_amount}"
+        return None
+
+    @staticmethod
+    def add_usage(counters: dict, member_id: int, transaction_type: str, amount: Decimal) -> None:
+        for period in TransactionLimitService.ROLLING_PERIODS:
+            counter = counters[(member_id, transaction_type, period)]
+            counter.total_amount += amount
+            counter.transaction_count += 1
@@ -0,0 +1,103 @@
+# apps/transactions/services/rule_cache.py
+import threading
+import time
+from typing import Optional
+
+
+from apps.sequences.services.sequence_service import NumberSequenceService
+from ..models import TransactionFee, TransactionLimit
+
+
+class TransactionRuleCache:
+    """In-process cache of the TransactionFee and TransactionLimit tables.
+
+    Both tables are small and rarely change, so they are loaded whole and
+    resolved per (transaction_type, payment_method, member_type) in memory.
+    Saves and deletes bump a version number kept in a NumberSequence row,
+    which every process (web and Celery workers alike) sees; each compares
+    its local version against it at most once every REVALIDATE_SECONDS and
+    reloads when it has moved. Changes made without
+    model signals (raw SQL, fixtures) need an explicit `invalidate()`.
+    """
+    VERSION_KEY = 'transactions:rule_cache:version'
+    REVALIDATE_SECONDS = 5
+
+    _lock = threading.Lock()
+    _state = None
+    _checked_at = 0.0
+
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get_rules(cls, transaction_type: str, payment_method: str, member_type: str) -> dict:
+        """Return {'fee': TransactionFee | None, 'limits': [TransactionLimit, ...]}"""
+        state = cls._ensure_fresh()
+        key = (transaction_type, payment_method, member_type)
+
+        rules = state['rules'].get(key)
+        if rules is not None:
+            cls.hits += 1
+            return rules
+
+        cls.misses += 1
+        rules = {
+            'fee': state['fees'].get((transaction_type, payment_method)),
+            'limits': state['limits'].get((transaction_type, member_type), [])
+        }
+        state['rules'][key] = rules
+        return rules
+
+    @classmethod
+    def get_fee_structure(cls, transaction_type: str, payment_method: str,
+                          member_type: str = 'REGULAR') -> Optional[TransactionFee]:
+        return cls.get_rules(transaction_type, payment_method, member_type)['fee']
+
+    @classmethod
+    def get_limits(cls, transaction_type: str, payment_method: str, member_type: str) -> list:
+        return cls.get_rules(transaction_type, payment_method, member_type)['limits']
+
+    @classmethod
+    def invalidate(cls) -> None:
+        NumberSequenceService.allocate(cls.VERSION_KEY)
+
+        with cls._lock:
+            cls._state = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        state = cls._state
+        lookups = cls.hits + cls.misses
+        return {
+            'version': state['version'] if state else None,
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_ratio': round(cls.hits / lookups, 4) if lookups else None,
+            'cached_keys': len(state['rules']) if state else 0
+        }
+
+    @classmethod
+    def _ensure_fresh(cls) -> dict:
+        state = cls._state
+        now = time.monotonic()
+        if state is not None and now - cls._checked_at < cls.REVALIDATE_SECONDS:
+            return state
+
+        version = NumberSequenceService.current(cls.VERSION_KEY)
+        with cls._lock:
+            state = cls._state
+            if state is None or state['version'] != version:
+                state = cls._load(version)
+                cls._state = state
+            cls._checked_at = now
+        return state
+
+    @staticmethod
+    def _load(version) -> dict:
+        fees = {(fee.transaction_type, fee.payment_method): fee for fee in TransactionFee.objects.all()}
+
+        limits = {}
+        for limit in TransactionLimit.objects.all():
+            limits.setdefault((limit.transaction_type, limit.member_type), []).append(limit)
+
+        return {'version': version, 'fees': fees, 'limits': limits, 'rules': {}}
@@ -1,20 +1,26 @@
 from decimal import Decimal
+from typing import Optional
 
 from django.db import transaction
-from datetime import datetime
-import uuid
+from django.db.models import F
 
 from django.utils import timezone
 
 from shared.services.ledger_service import LedgerService
+from shared.utils.reference_generator import get_reference_generator
 from .fees_calculator import FeesCalculator
-from ..models import Transaction, TransactionFee, TransactionLimit
+from .limit_service import TransactionLimitService
+from .rule_cache import TransactionRuleCache
+from ..models import Transaction, TransactionFee, TransactionVolumeCounter
 
 from ...members.models import Member
-from ...notifications.services.notification_service import NotificationService
+from ...outbox.services.outbox_service import OutboxService
+from ...savings.models import SavingsAccount, SavingsTransaction
 
 
 class TransactionService:
+    BATCH_TRANSACTION_TYPES = ('DEPOSIT', 'WITHDRAWAL')
+
     @staticmethod
     @transaction.atomic
     def create_transaction(
@@ -24,11 +30,19 @@ class TransactionService:
             payment_method: str,
             **kwargs
     ) -> Transaction:
+        member_type, savings_account_id = Member.objects.values_list(
+            'membership_type', 'savings_account_id'
+        ).get(id=member_id)
+        rules = TransactionRuleCache.get_rules(transaction_type, payment_method, member_type)
+
+        # Account before counters, the lock order create_transactions_batch uses
+        TransactionService._lock_account(savings_account_id)
+
         # Validate transaction limits
-        TransactionService._validate_limits(member_id, transaction_type, amount)
+        TransactionService._validate_limits(member_id, transaction_type, amount, rules['limits'])
 
         # Calculate fees
-        fee = TransactionService._calculate_fee(transaction_type, payment_method, amount)
+        fee = TransactionService._fee(rules['fee'], amount, member_type)
 
         # Create transaction
         _transaction = Transaction.objects.create(
@@ -43,140 +57,307 @@ class TransactionService:
 
         # Process based on type
         if transaction_type == 'DEPOSIT':
-            TransactionService._process_deposit(_transaction)
+            TransactionService._process_deposit(_transaction, fee)
         elif transaction_type == 'WITHDRAWAL':
-            TransactionService._process_withdrawal(_transaction)
+            TransactionService._process_withdrawal(_transaction, fee)
 
-        NotificationService.send_transaction_notification(_transaction)
+        # Notifications are relayed from the outbox once this commits
+        OutboxService.publish('transaction.completed', TransactionService._event_payload(_transaction))
         return _transaction
 
+    @staticmethod
+    @transaction.atomic
+    def create_transactions_batch(items: list[dict], created_by=None) -> list[dict]:
+        """Post a batch of deposits/withdrawals with bulk reads and writes.
+
+        Members and savings accounts are fetched once for the whole batch and
+        fees/limits come from the rule cache; the affected accounts are locked
+        in id order, then the limit counters, as in create_transaction. Items that fail validation are reported and skipped, the
+        rest are written with bulk_create. Returns one result dict per item,
+        in input order.
+        """
+        members = Member.objects.only(
+            'id', 'membership_type', 'savings_account_id'
+        ).in_bulk({item['member_id'] for item in items})
+
+        # Lock every affected account up front, always in the same order
+        accounts = {
+            account.id: account
+            for account in SavingsAccount.objects.select_for_update().filter(
+                id__in={member.savings_account_id for member in members.values()}
+            ).order_by('id')
+        }
+
+        counters = TransactionLimitService.lock_counters(
+            (item['member_id'], item['transaction_type'])
+            for item in items
+            if item['member_id'] in members
+            and item['transaction_type'] in TransactionService.BATCH_TRANSACTION_TYPES
+        )
+
+        results = []
+        touched_accounts = {}
+        transactions = []
+        fee_transactions = []
+        savings_entries = []
+        journal = []
+        now = timezone.now()
+
+        for index, item in enumerate(items):
+            transaction_type = item['transaction_type']
+            amount = item['amount']
+            member = members.get(item['member_id'])
+            account = accounts.get(member.savings_account_id) if member else None
+
+            error = None
+            if transaction_type not in TransactionService.BATCH_TRANSACTION_TYPES:
+                error = f"Unsupported transaction type {transaction_type}"
+            elif amount <= 0:
+                error = "Amount must be greater than zero"
+            elif member is None:
+                error = f"Member {item['member_id']} not found"
+            elif account is None:
+                error = "Member has no savings account"
+            else:
+                rules = TransactionRuleCache.get_rules(transaction_type, item['payment_method'], member.membership_type)
+                for limit in rules['limits']:
+                    if limit.limit_type == 'SINGLE' and amount > limit.amount:
+                        error = f"Amount exceeds single transaction limit of {limit.amount}"
+                        break
+                else:
+                    error = TransactionLimitService.check_usage(
+                        counters, member.id, transaction_type, amount, rules['limits']
+                    )
+
+            fee = Decimal('0')
+            if error is None:
+                fee = TransactionService._fee(rules['fee'], amount, member.membership_type)
+
+                if transaction_type == 'WITHDRAWAL' and account.balance < amount + fee:
+                    error = "Insufficient funds including fees"
+
+            if error:
+                results.append({'index': index, 'status': 'FAILED', 'error': error})
+                continue
+
+            if transaction_type == 'DEPOSIT':
+                account.balance += amount - fee
+            else:
+                account.balance -= amount + fee
+            touched_accounts[account.id] = account
+            TransactionLimitService.add_usage(counters, member.id, transaction_type, amount)
+
+            _transaction = Transaction(
+                transaction_ref=TransactionService._generate_reference(),
+                member_id=member.id,
+                transaction_type=transaction_type,
+                amount=amount,
+                payment_method=item['payment_method'],
+                status='COMPLETED',
+                processed_date=now,
+                description=item.get('description'),
+                external_reference=item.get('external_reference'),
+                source_account=item.get('source_account'),
+                created_by=created_by
+            )
+            transactions.append(_transaction)
+
+            if fee > 0:
+                fee_transactions.append(Transaction(
+                    transaction_ref=f"FEE-{_transaction.transaction_ref}",
+                    member_id=member.id,
+                    transaction_type='FEE',
+                    amount=fee,
+                    payment_method='INTERNAL',
+                    status='COMPLETED',
+                    processed_date=now,
+                    description=f"Fee for {transaction_type.lower()} {_transaction.transaction_ref}",
+                    source_account=item.get('source_account'),
+                    created_by=created_by
+                ))
+
+            savings_entries.extend(TransactionService._savings_entries(account.id, _transaction, fee, account.balance))
+            journal.append((_transaction, fee))
+            results.append({
+                'index': index,
+                'status': 'COMPLETED',
+                'transaction_ref': _transaction.transaction_ref,
+                'fee': fee,
+                'balance_after': account.balance
+            })
+
+        if not transactions:
+            return results
+
+        Transaction.objects.bulk_create(transactions + fee_transactions)
+
+        lines = []
+        for _transaction, fee in journal:
+            if _transaction.transaction_type == 'DEPOSIT':
+                lines.extend(LedgerService.deposit_lines(_transaction, fee))
+            else:
+                lines.extend(LedgerService.withdrawal_lines(_transaction, fee))
+        LedgerService.post_journal(lines)
+
+        SavingsAccount.objects.bulk_update(touched_accounts.values(), ['balance'])
+        SavingsTransaction.objects.bulk_create(savings_entries)
+        TransactionVolumeCounter.objects.bulk_update(
+            counters.values(), ['total_amount', 'transaction_count']
+        )
+        OutboxService.publish_many(
+            ('transaction.completed', TransactionService._event_payload(_transaction))
+            for _transaction in transactions
+        )
+        return results
+
+    @staticmethod
+    def _event_payload(_transaction: Transaction) -> dict:
+        return {
+            'transaction_id': _transaction.id,
+            'member_id': _transaction.member_id,
+            'transaction_type': _transaction.transaction_type,
+            'amount': str(_transaction.amount),
+            'transaction_ref': _transaction.transaction_ref
+        }
+
     @staticmethod
     def _generate_reference() -> str:
-        return f"TXN{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:8].upper()}"
+        return get_reference_generator().next('TXN')
 
     @staticmethod
-    def _validate_limits(member_id: int, transaction_type: str, amount: Decimal):
-        member = Member.objects.get(id=member_id)
-        limits = TransactionLimit.objects.filter(
-            transaction_type=transaction_type,
-            member_type=member.membership_type
-        )
+    def _lock_account(savings_account_id: Optional[int]) -> None:
+        if savings_account_id is not None:
+            list(SavingsAccount.objects.select_for_update().filter(pk=savings_account_id).values_list('id', flat=True))
 
+    @staticmethod
+    def _validate_limits(member_id: int, transaction_type: str, amount: Decimal, limits: list):
         for limit in limits:
             if limit.limit_type == 'SINGLE' and amount > limit.amount:
                 raise ValueError(f"Amount exceeds single transaction limit of {limit.amount}")
-            # Add other limit validations
+
+        # DAILY and MONTHLY limits are checked against the member's running counters
+        TransactionLimitService.record_usage(member_id, transaction_type, amount, limits)
 
     @staticmethod
-    def _calculate_fee(transaction_type: str, payment_method: str, amount: Decimal) -> Decimal:
-        try:
-            fee_structure = TransactionFee.objects.get(
-                transaction_type=transaction_type,
-                payment_method=payment_method
-            )
+    def _fee(fee_structure: Optional[TransactionFee], amount: Decimal, member_type: str) -> Decimal:
+        if fee_structure is None:
+            return Decimal('0')
+        return FeesCalculator.apply_fee_structure(fee_structure, amount, member_type)['total_fee']
+
+    @staticmethod
+    def _savings_account_id(_transaction: Transaction) -> int:
+        savings_account_id = Member.objects.filter(
+            id=_transaction.member_id
+        ).values_list('savings_account_id', flat=True).first()
+        if savings_account_id is None:
+            raise ValueError("Member has no savings account")
+        return savings_account_id
 
-            percentage_fee = amount * (fee_structure.percentage / 100)
-            total_fee = fee_structure.fixed_amount + percentage_fee
+    @staticmethod
+    def _savings_entries(account_id: int, _transaction: Transaction, fee: Decimal,
+                         balance_after: Decimal) -> list[SavingsTransaction]:
+        """Savings history rows for a posted deposit or withdrawal; interest accrual reads balance_after."""
+        entries = [SavingsTransaction(
+            account_id=account_id,
+            transaction_type=_transaction.transaction_type,
+            amount=_transaction.amount,
+            balance_after=balance_after + fee,
+            reference=_transaction.transaction_ref
+        )]
+        if fee > 0:
+            entries.append(SavingsTransaction(
+                account_id=account_id,
+                transaction_type='CHARGE',
+                amount=fee,
+                balance_after=balance_after,
+                reference=f"FEE-{_transaction.transaction_ref}"
+            ))
+        return entries
 
-            if fee_structure.max_amount:
-                total_fee = min(total_fee, fee_structure.max_amount)
+    @staticmethod
+    def _record_savings_entries(account_id: int, _transaction: Transaction, fee: Decimal) -> None:
+        # Read back the balance the UPDATE just wrote; the row is locked until commit
+        balance = SavingsAccount.objects.values_list('balance', flat=True).get(pk=account_id)
+        SavingsTransaction.objects.bulk_create(
+            TransactionService._savings_entries(account_id, _transaction, fee, balance)
+        )
 
-            return max(total_fee, fee_structure.min_amount)
-        except TransactionFee.DoesNotExist:
-            return Decimal('0')
+    @staticmethod
+    def _complete(_transaction: Transaction, fee: Decimal, description: str) -> None:
+        # Record fee transaction if applicable
+        if fee > 0:
+            Transaction.objects.create(
+                transaction_ref=f"FEE-{_transaction.transaction_ref}",
+                member_id=_transaction.member_id,
+                transaction_type='FEE',
+                amount=fee,
+                payment_method='INTERNAL',
+                status='COMPLETED',
+                description=description,
+                source_account=_transaction.source_account
+            )
+
+        # Update transaction status
+        _transaction.status = 'COMPLETED'
+        _transaction.processed_date = timezone.now()
+        _transaction.save(update_fields=['status', 'processed_date', 'updated_at'])
+
+    @staticmethod
+    def _fail(_transaction: Transaction, error: Exception) -> None:
+        _transaction.status = 'FAILED'
+        _transaction.description = f"Failed: {str(error)}"
+        _transaction.save(update_fields=['status', 'description', 'updated_at'])
 
     @staticmethod
-    def _process_deposit(_transaction: Transaction) -> Transaction:
+    def _process_deposit(_transaction: Transaction, fee: Decimal = Decimal('0')) -> Transaction:
         try:
             with transaction.atomic():
-                # Calculate fees
-                fee = FeesCalculator.calculate_deposit_fee(
-                    _transaction.amount,
-                    _transaction.payment_method,
-                    _transaction.member.membership_type
+                # Single UPDATE ... SET balance = balance + x; the row lock is held
+                # only for the rest of this transaction and no other column is written
+                account_id = TransactionService._savings_account_id(_transaction)
+                SavingsAccount.objects.filter(pk=account_id).update(balance=F('balance') + (_transaction.amount - fee))
+                TransactionService._record_savings_entries(account_id, _transaction, fee)
+
+                TransactionService._complete(
+                    _transaction, fee, f"Fee for deposit {_transaction.transaction_ref}"
                 )
 
-                # Update savings account
-                savings_account = _transaction.member.savings_account
-                savings_account.balance += (_transaction.amount - fee)
-                savings_account.save()
-
-                # Record fee transaction if applicable
-                if fee > 0:
-                    Transaction.objects.create(
-                        transaction_ref=f"FEE-{_transaction.transaction_ref}",
-                        member=_transaction.member,
-                        transaction_type='FEE',
-                        amount=fee,
-                        payment_method='INTERNAL',
-                        status='COMPLETED',
-                        description=f"Fee for deposit {_transaction.transaction_ref}",
-                        source_account=_transaction.source_account
-                    )
-
-                # Update transaction status
-                _transaction.status = 'COMPLETED'
-                _transaction.processed_date = timezone.now()
-                _transaction.save()
-
                 # Create ledger entries
                 LedgerService.create_deposit_entries(_transaction, fee)
 
                 return _transaction
 
         except Exception as e:
-            _transaction.status = 'FAILED'
-            _transaction.description = f"Failed: {str(e)}"
-            _transaction.save()
+            TransactionService._fail(_transaction, e)
             raise
 
     @staticmethod
-    def _process_withdrawal(_transaction: Transaction) -> Transaction:
+    def _process_withdrawal(_transaction: Transaction, fee: Decimal = Decimal('0')) -> Transaction:
         try:
             with transaction.atomic():
-                # Calculate fees
-                fee = FeesCalculator.calculate_withdrawal_fee(
-                    _transaction.amount,
-                    _transaction.payment_method,
-                    _transaction.member.membership_type
-                )
-
                 total_deduction = _transaction.amount + fee
-                savings_account = _transaction.member.savings_account
 
-                # Check balance
-                if savings_account.balance < total_deduction:
-                    raise ValueError("Insufficient funds including fees")
+                # Check and debit in one conditional UPDATE so concurrent
+                # withdrawals cannot both pass the balance check
+                account_id = TransactionService._savings_account_id(_transaction)
+                updated = SavingsAccount.objects.filter(
+                    pk=account_id,
+                    balance__gte=total_deduction
+                ).update(balance=F('balance') - total_deduction)
 
-                # Update savings account
-                savings_account.balance -= total_deduction
-                savings_account.save()
-
-                # Record fee transaction
-                if fee > 0:
-                    Transaction.objects.create(
-                        transaction_ref=f"FEE-{_transaction.transaction_ref}",
-                        member=_transaction.member,
-                        transaction_type='FEE',
-                        amount=fee,
-                        payment_method='INTERNAL',
-                        status='COMPLETED',
-                        description=f"Fee for withdrawal {_transaction.transaction_ref}",
-                        source_account=_transaction.source_account
-                    )
+                if not updated:
+                    raise ValueError("Insufficient funds including fees")
+                TransactionService._record_savings_entries(account_id, _transaction, fee)
 
-                # Update transaction status
-                _transaction.status = 'COMPLETED'
-                _transaction.processed_date = timezone.now()
-                _transaction.save()
+                TransactionService._complete(
+                    _transaction, fee, f"Fee for withdrawal {_transaction.transaction_ref}"
+                )
 
                 # Create ledger entries
-                LedgerService.cre_ate_withdrawal_entries(_transaction, fee)
+                LedgerService.create_withdrawal_entries(_transaction, fee)
 
                 return _transaction
 
         except Exception as e:
-            _transaction.status = 'FAILED'
-            _transaction.description = f"Failed: {str(e)}"
-            _transaction.save()
+            TransactionService._fail(_transaction, e)
             raise
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import TransactionFee, TransactionLimit
+from .services.rule_cache import TransactionRuleCache
+
+
+@receiver([post_save, post_delete], sender=TransactionFee)
+@receiver([post_save, post_delete], sender=TransactionLimit)
+def invalidate_rule_cache(sender, **kwargs):
+    # Drop the cache now so this connection sees its own change, and again on
+    # commit so other processes cannot reload the old rows in between.
+    TransactionRuleCache.invalidate()
+    transaction.on_commit(TransactionRuleCache.invalidate)
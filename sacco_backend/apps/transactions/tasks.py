@@ -0,0 +1,15 @@
+# apps/transactions/tasks.py
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from apps.transactions.models import TransactionVolumeCounter
+
+
+@shared_task
+def prune_transaction_volume_counters():
+    # Counters from before the previous month can no longer affect a limit check
+    cutoff = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+    deleted, _ = TransactionVolumeCounter.objects.filter(period_start__lt=cutoff).delete()
+    return deleted
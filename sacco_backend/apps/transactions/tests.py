@@ -1,4 +1,10 @@
-from django.test import TestCase
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from datetime import date
@@ -6,9 +12,20 @@ from unittest.mock import patch
 
 from apps.authentication.models import Role
 from apps.members.models import Member
-from apps.transactions.models import Transaction
+from apps.outbox.models import OutboxEvent
+from apps.transactions.models import Transaction, TransactionFee, TransactionLimit, TransactionVolumeCounter
+from apps.transactions.services.fees_calculator import FeesCalculator
+from apps.transactions.services.limit_service import TransactionLimitService
+from apps.transactions.services.rule_cache import TransactionRuleCache
+from apps.sequences.services.sequence_service import NumberSequenceService
 from apps.transactions.services.transaction_service import TransactionService
-from apps.savings.models import SavingsAccount
+from apps.savings.models import SavingsAccount, SavingsTransaction
+from apps.ledger.models import LedgerEntry
+from shared.utils.reference_generator import (
+    RandomReferenceGenerator,
+    TimeOrderedReferenceGenerator,
+    get_reference_generator
+)
 
 User = get_user_model()
 
@@ -61,16 +78,11 @@ class TransactionWorkflowTest(TestCase):
         self.member.savings_account = self.savings_account
         self.member.save()
 
-        # Mock notification service
-        self.notification_patcher = patch('apps.transactions.services.transaction_service.NotificationService')
-        self.mock_notification_service = self.notification_patcher.start()
-
         # Mock ledger service
         self.ledger_patcher = patch('apps.transactions.services.transaction_service.LedgerService')
         self.mock_ledger_service = self.ledger_patcher.start()
 
     def tearDown(self):
-        self.notification_patcher.stop()
         self.ledger_patcher.stop()
 
     def test_deposit_transaction(self):
@@ -96,8 +108,11 @@ class TransactionWorkflowTest(TestCase):
         self.savings_account.refresh_from_db()
         self.assertEqual(self.savings_account.balance, Decimal('150000'))  # 100000 + 50000
 
-        # Check notification was sent
-        self.mock_notification_service.send_transaction_notification.assert_called_once()
+        # Check notification was queued in the outbox
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('topic', 'payload__transaction_id')),
+            [('transaction.completed', transaction.id)]
+        )
 
     def test_withdrawal_transaction(self):
         # Create a withdrawal transaction
@@ -122,8 +137,11 @@ class TransactionWorkflowTest(TestCase):
         self.savings_account.refresh_from_db()
         self.assertEqual(self.savings_account.balance, Decimal('70000'))  # 100000 - 30000
 
-        # Check notification was sent
-        self.mock_notification_service.send_transaction_notification.assert_called_once()
+        # Check notification was queued in the outbox
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('topic', 'payload__transaction_id')),
+            [('transaction.completed', transaction.id)]
+        )
 
     def test_withdrawal_exceeding_balance(self):
         # Try to withdraw more than the available balance
@@ -131,28 +149,47 @@ class TransactionWorkflowTest(TestCase):
             TransactionService.create_transaction(
                 member_id=self.member.id,
                 transaction_type='WITHDRAWAL',
-                amount=Decimal('95000'),  # Exceeds available balance after minimum balance
+                amount=Decimal('100001'),  # Exceeds available balance
                 payment_method='CASH',
                 description='Invalid withdrawal'
             )
 
-        # Check savings account balance is unchanged
+        # Check savings account balance is unchanged and nothing was queued
         self.savings_account.refresh_from_db()
         self.assertEqual(self.savings_account.balance, Decimal('100000'))
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_withdrawal_is_checked_against_balance_not_minimum_balance(self):
+        TransactionService.create_transaction(
+            member_id=self.member.id,
+            transaction_type='WITHDRAWAL',
+            amount=Decimal('95000'),
+            payment_method='CASH'
+        )
+
+        self.savings_account.refresh_from_db()
+        self.assertEqual(self.savings_account.balance, Decimal('5000'))
 
     def test_transaction_with_fees(self):
-        # Mock the fee calculation to return a fixed fee
-        with patch('apps.transactions.services.transaction_service.TransactionService._calculate_fee',
-                   return_value=Decimal('1000')):
-            with patch('apps.transactions.services.transaction_service.TransactionService._generate_reference',
-                       return_value='TXN20240103TEST'):
-                transaction = TransactionService.create_transaction(
-                    member_id=self.member.id,
-                    transaction_type='WITHDRAWAL',
-                    amount=Decimal('20000'),
-                    payment_method='CASH',
-                    description='Test withdrawal with fee'
-                )
+        # Premium members pay half of the fixed plus percentage fee
+        TransactionFee.objects.create(
+            transaction_type='WITHDRAWAL',
+            payment_method='CASH',
+            fixed_amount=Decimal('1000'),
+            percentage=Decimal('1.25')
+        )
+        self.addCleanup(TransactionRuleCache.invalidate)
+        Member.objects.filter(id=self.member.id).update(membership_type='PREMIUM')
+
+        with patch('apps.transactions.services.transaction_service.TransactionService._generate_reference',
+                   return_value='TXN20240103TEST'):
+            transaction = TransactionService.create_transaction(
+                member_id=self.member.id,
+                transaction_type='WITHDRAWAL',
+                amount=Decimal('20000'),
+                payment_method='CASH',
+                description='Test withdrawal with fee'
+            )
 
         # Check transaction was created correctly
         self.assertEqual(transaction.transaction_ref, 'TXN20240103TEST')
@@ -160,4 +197,340 @@ class TransactionWorkflowTest(TestCase):
 
         # Check savings account was updated with amount + fee
         self.savings_account.refresh_from_db()
-        self.assertEqual(self.savings_account.balance, Decimal('79000'))  # 100000 - 20000 - 1000
\ No newline at end of file
+        self.assertEqual(self.savings_account.balance, Decimal('79375'))  # 100000 - 20000 - (1000 + 250) / 2
+        self.assertTrue(SavingsTransaction.objects.filter(
+            reference=f'FEE-{transaction.transaction_ref}', amount=Decimal('625')
+        ).exists())
+
+class BatchMembersTestCase(TestCase):
+    def setUp(self):
+        self.role = Role.objects.create(name='STAFF')
+        self.members = []
+        self.accounts = []
+
+        for i in range(2):
+            user = User.objects.create_user(
+                email=f'agent{i}@example.com',
+                password='testpass123',
+                first_name='Batch',
+                last_name=f'Member{i}',
+                role=self.role,
+                phone_number=f'+25670000001{i}',
+                national_id=f'BATCH{i}'
+            )
+            member = Member.objects.create(
+                user=user,
+                member_number=f'M2024BATCH{i}',
+                date_of_birth=date(1990, 1, 1),
+                marital_status='SINGLE',
+                employment_status='EMPLOYED',
+                occupation='Trader',
+                monthly_income=Decimal('700000'),
+                physical_address='Test Address',
+                city='Kampala',
+                district='Central',
+                national_id=f'BATCH{i}',
+                membership_number=f'SACCOM2024BATCH{i}',
+                membership_type='INDIVIDUAL'
+            )
+            account = SavingsAccount.objects.create(
+                member=member,
+                account_number=f'SAV202400010{i}',
+                account_type='REGULAR',
+                balance=Decimal('100000'),
+                interest_rate=Decimal('3.50'),
+                status='ACTIVE',
+                minimum_balance=Decimal('10000')
+            )
+            member.savings_account = account
+            member.save()
+            self.members.append(member)
+            self.accounts.append(account)
+
+        TransactionFee.objects.create(
+            transaction_type='WITHDRAWAL',
+            payment_method='CASH',
+            fixed_amount=Decimal('500')
+        )
+        TransactionLimit.objects.create(
+            transaction_type='DEPOSIT',
+            limit_type='SINGLE',
+            amount=Decimal('1000000'),
+            member_type='INDIVIDUAL'
+        )
+        # Test rollbacks do not fire model signals
+        self.addCleanup(TransactionRuleCache.invalidate)
+
+
+class TransactionBatchTest(BatchMembersTestCase):
+    def test_batch_reports_each_item_and_posts_in_bulk(self):
+        items = [
+            {'member_id': self.members[0].id, 'transaction_type': 'DEPOSIT',
+             'amount': Decimal('50000'), 'payment_method': 'CASH'},
+            {'member_id': self.members[0].id, 'transaction_type': 'WITHDRAWAL',
+             'amount': Decimal('20000'), 'payment_method': 'CASH'},
+            {'member_id': self.members[1].id, 'transaction_type': 'WITHDRAWAL',
+             'amount': Decimal('99600'), 'payment_method': 'CASH'},
+            {'member_id': self.members[1].id, 'transaction_type': 'DEPOSIT',
+             'amount': Decimal('2000000'), 'payment_method': 'CASH'},
+            {'member_id': 0, 'transaction_type': 'DEPOSIT',
+             'amount': Decimal('1000'), 'payment_method': 'CASH'},
+        ]
+
+        results = TransactionService.create_transactions_batch(items)
+
+        self.assertEqual([result['status'] for result in results],
+                         ['COMPLETED', 'COMPLETED', 'FAILED', 'FAILED', 'FAILED'])
+        self.assertEqual(results[1]['fee'], Decimal('500'))
+        self.assertIn('Insufficient funds', results[2]['error'])
+        self.assertIn('single transaction limit', results[3]['error'])
+
+        self.accounts[0].refresh_from_db()
+        self.accounts[1].refresh_from_db()
+        self.assertEqual(self.accounts[0].balance, Decimal('129500'))  # 100000 + 50000 - 20000 - 500
+        self.assertEqual(self.accounts[1].balance, Decimal('100000'))
+
+        # Two business transactions plus one fee transaction
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertEqual(LedgerEntry.objects.count(), 5)
+        # Savings history for interest accrual: deposit, withdrawal and its fee
+        self.assertEqual(
+            list(SavingsTransaction.objects.filter(account=self.accounts[0]).order_by('id')
+                 .values_list('transaction_type', 'balance_after')),
+            [('DEPOSIT', Decimal('150000')), ('WITHDRAWAL', Decimal('130000')), ('CHARGE', Decimal('129500'))]
+        )
+
+
+class TransactionRuleCacheTest(TestCase):
+    def setUp(self):
+        self.fee = TransactionFee.objects.create(
+            transaction_type='DEPOSIT',
+            payment_method='MOBILE_MONEY',
+            fixed_amount=Decimal('200'),
+            percentage=Decimal('1.00')
+        )
+        self.addCleanup(TransactionRuleCache.invalidate)
+
+    def test_fee_lookups_are_served_from_memory(self):
+        FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+        hits = TransactionRuleCache.hits
+
+        with self.assertNumQueries(0):
+            fee = FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+
+        self.assertEqual(fee, Decimal('300.00'))
+        self.assertEqual(TransactionRuleCache.hits, hits + 1)
+
+    def test_saving_a_rule_invalidates_the_cache(self):
+        FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+
+        self.fee.fixed_amount = Decimal('0')
+        self.fee.save()
+
+        fee = FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+        self.assertEqual(fee, Decimal('100.00'))
+
+    def test_invalidation_reaches_other_processes(self):
+        FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+
+        # Another worker edits the fee: its local cache is not ours, only the shared version moves
+        TransactionFee.objects.filter(pk=self.fee.pk).update(fixed_amount=Decimal('0'))
+        NumberSequenceService.allocate(TransactionRuleCache.VERSION_KEY)
+        self.assertEqual(FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY'), Decimal('300.00'))
+
+        with patch.object(TransactionRuleCache, 'REVALIDATE_SECONDS', 0):
+            fee = FeesCalculator.calculate_deposit_fee(Decimal('10000'), 'MOBILE_MONEY')
+        self.assertEqual(fee, Decimal('100.00'))
+
+    def test_missing_fee_structure_means_no_fee(self):
+        self.assertEqual(FeesCalculator.calculate_withdrawal_fee(Decimal('10000'), 'CHEQUE'), Decimal('0'))
+
+
+class TransactionRollingLimitTest(BatchMembersTestCase):
+    def setUp(self):
+        super().setUp()
+        TransactionLimit.objects.create(
+            transaction_type='DEPOSIT',
+            limit_type='DAILY',
+            amount=Decimal('120000'),
+            member_type='INDIVIDUAL'
+        )
+
+    def test_batch_enforces_daily_limit(self):
+        items = [
+            {'member_id': self.members[0].id, 'transaction_type': 'DEPOSIT',
+             'amount': Decimal('50000'), 'payment_method': 'CASH'}
+            for _ in range(3)
+        ]
+
+        results = TransactionService.create_transactions_batch(items)
+
+        self.assertEqual([result['status'] for result in results], ['COMPLETED', 'COMPLETED', 'FAILED'])
+        self.assertIn('daily limit', results[2]['error'])
+        counter = TransactionVolumeCounter.objects.get(member=self.members[0], period='DAILY')
+        self.assertEqual(counter.total_amount, Decimal('100000'))
+        self.assertEqual(counter.transaction_count, 2)
+
+    def test_record_usage_checks_running_counter(self):
+        limits = TransactionRuleCache.get_limits('DEPOSIT', 'CASH', 'INDIVIDUAL')
+        TransactionLimitService.record_usage(self.members[1].id, 'DEPOSIT', Decimal('100000'), limits)
+
+        with self.assertRaises(ValueError):
+            TransactionLimitService.record_usage(self.members[1].id, 'DEPOSIT', Decimal('30000'), limits)
+
+        monthly = TransactionVolumeCounter.objects.get(member=self.members[1], period='MONTHLY')
+        self.assertEqual(monthly.total_amount, Decimal('100000'))
+
+    def test_single_and_batch_paths_lock_account_before_counters(self):
+        item = {'member_id': self.members[0].id, 'transaction_type': 'DEPOSIT',
+                'amount': Decimal('1000'), 'payment_method': 'CASH'}
+
+        for post in (lambda: TransactionService.create_transaction(**item),
+                     lambda: TransactionService.create_transactions_batch([item])):
+            with CaptureQueriesContext(connection) as queries:
+                post()
+            tables = [query['sql'] for query in queries.captured_queries]
+            first_account = next(i for i, sql in enumerate(tables) if '"savings_savingsaccount"' in sql)
+            first_counter = next(i for i, sql in enumerate(tables) if '"transactions_transactionvolumecounter"' in sql)
+            self.assertLess(first_account, first_counter)
+
+
+class ReferenceGeneratorTest(TestCase):
+    def test_references_are_unique_and_sorted_across_threads(self):
+        generator = TimeOrderedReferenceGenerator(node_id=3)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            batches = list(pool.map(lambda _: [generator.next('TXN') for _ in range(2000)], range(8)))
+
+        references = [reference for batch in batches for reference in batch]
+        self.assertEqual(len(set(references)), len(references))
+        for batch in batches:
+            self.assertEqual(batch, sorted(batch))
+        self.assertTrue(all(len(reference) == 28 for reference in references))
+
+    def test_sequence_overflow_stays_monotonic(self):
+        generator = TimeOrderedReferenceGenerator(node_id=1)
+        with patch('shared.utils.reference_generator.time.time_ns', return_value=1_750_000_000_000_000_000):
+            ids = [generator.next_id()[0] for _ in range(TimeOrderedReferenceGenerator.MAX_SEQUENCE + 10)]
+
+        self.assertEqual(ids, sorted(set(ids)))
+
+    @override_settings(REFERENCE_NODE_ID='5')
+    def test_forked_workers_sharing_node_id_do_not_collide(self):
+        # Prefork children inherit the parent's generator and settings; only the pid differs
+        generator = TimeOrderedReferenceGenerator()
+        references = []
+        with patch('shared.utils.reference_generator.time.time_ns', return_value=1_750_000_000_000_000_000):
+            for pid in (4101, 4102):
+                with patch('shared.utils.reference_generator.os.getpid', return_value=pid):
+                    references.extend(generator.next('TXN') for _ in range(3))
+
+        self.assertEqual(len(set(references)), 6)
+
+    @override_settings(REFERENCE_GENERATOR='shared.utils.reference_generator.RandomReferenceGenerator')
+    def test_generator_is_configurable(self):
+        self.assertIsInstance(get_reference_generator(), RandomReferenceGenerator)
+        self.assertTrue(TransactionService._generate_reference().startswith('TXN'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Needs a database with row-level locking')
+class WithdrawalConcurrencyTest(TransactionTestCase):
+    WORKERS = 16
+    WITHDRAWALS = 300
+    AMOUNT = Decimal('1000')
+    MIN_THROUGHPUT = 20  # withdrawals per second
+
+    def setUp(self):
+        role = Role.objects.create(name='MEMBER')
+        user = User.objects.create_user(
+            email='stress@example.com',
+            password='testpass123',
+            first_name='Stress',
+            last_name='Test',
+            role=role,
+            phone_number='+256700000099',
+            national_id='STRESS1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024STRESS',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Engineer',
+            monthly_income=Decimal('700000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='STRESS1',
+            membership_number='SACCOM2024STRESS',
+            membership_type='INDIVIDUAL'
+        )
+        self.account = SavingsAccount.objects.create(
+            member=self.member,
+            account_number='SAV2024999999',
+            account_type='REGULAR',
+            balance=Decimal('210000'),
+            interest_rate=Decimal('3.50'),
+            status='ACTIVE',
+            minimum_balance=Decimal('10000')
+        )
+        self.member.savings_account = self.account
+        self.member.save()
+        TransactionRuleCache.invalidate()
+
+    def _withdraw(self, _):
+        try:
+            TransactionService.create_transaction(
+                member_id=self.member.id,
+                transaction_type='WITHDRAWAL',
+                amount=self.AMOUNT,
+                payment_method='CASH'
+            )
+            return True
+        except ValueError:
+            return False
+        finally:
+            connection.close()
+
+    def _post(self, n):
+        item = {'member_id': self.member.id, 'transaction_type': 'DEPOSIT',
+                'amount': self.AMOUNT, 'payment_method': 'CASH'}
+        try:
+            # Alternate teller postings with batch uploads for the same member
+            if n % 2:
+                TransactionService.create_transaction(**item)
+            else:
+                TransactionService.create_transactions_batch([item])
+        finally:
+            connection.close()
+
+    def test_single_and_batch_postings_do_not_deadlock(self):
+        initial = self.account.balance
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            list(pool.map(self._post, range(self.WITHDRAWALS)))
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, initial + self.WITHDRAWALS * self.AMOUNT)
+
+    def test_parallel_withdrawals_conserve_balance(self):
+        initial = self.account.balance
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            outcomes = list(pool.map(self._withdraw, range(self.WITHDRAWALS)))
+        elapsed = time.monotonic() - started
+
+        succeeded = sum(outcomes)
+        self.account.refresh_from_db()
+
+        # Exactly as many withdrawals succeed as the balance allows
+        self.assertEqual(succeeded, int(initial / self.AMOUNT))
+        self.assertEqual(self.account.balance, initial - succeeded * self.AMOUNT)
+        self.assertGreaterEqual(self.account.balance, 0)
+        self.assertEqual(
+            Transaction.objects.filter(transaction_type='WITHDRAWAL', status='COMPLETED').count(),
+            succeeded
+        )
+        self.assertGreaterEqual(self.WITHDRAWALS / elapsed, self.MIN_THROUGHPUT)
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import TransactionViewSet
+
+router = DefaultRouter()
+
+router.register(r'transactions', TransactionViewSet, basename='transactions')
+
+urlpatterns = [
+    path('', include(router.urls))
+]
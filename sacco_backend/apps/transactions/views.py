@@ -1,9 +1,11 @@
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.transactions.models import Transaction
-from apps.transactions.serializers import TransactionSerializer
+from apps.transactions.serializers import TransactionSerializer, TransactionBatchSerializer
+from apps.transactions.services.rule_cache import TransactionRuleCache
 from apps.transactions.services.transaction_service import TransactionService
 
 
@@ -27,4 +29,36 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_201_CREATED
             )
         except ValueError as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        if request.user.role.name not in ['STAFF', 'ADMIN']:
+            return Response(
+                {'error': 'Only staff can post transaction batches'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = TransactionBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = TransactionService.create_transactions_batch(
+            serializer.validated_data['transactions'],
+            created_by=request.user
+        )
+        completed = sum(1 for result in results if result['status'] == 'COMPLETED')
+        return Response(
+            {
+                'total': len(results),
+                'completed': completed,
+                'failed': len(results) - completed,
+                'results': results
+            },
+            status=status.HTTP_201_CREATED if completed else status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['get'])
+    def rule_cache_stats(self, request):
+        if request.user.role.name != 'ADMIN':
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        return Response(TransactionRuleCache.stats())
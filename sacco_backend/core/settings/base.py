@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from celery.schedules import crontab
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
@@ -33,6 +35,8 @@ INSTALLED_APPS = [
     'apps.risk_management',
     'apps.integrations',
     'apps.ledger',
+    'apps.outbox',
+    'apps.sequences',
 ]
 
 MIDDLEWARE = [
@@ -122,6 +126,45 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'ledger-balance-checkpoints': {
+        'task': 'apps.ledger.tasks.create_ledger_balance_checkpoints',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'prune-transaction-volume-counters': {
+        'task': 'apps.transactions.tasks.prune_transaction_volume_counters',
+        'schedule': crontab(hour=1, minute=0, day_of_month=1),
+    },
+    'post-monthly-savings-interest': {
+        'task': 'apps.savings.tasks.calculate_monthly_interest',
+        'schedule': crontab(hour=1, minute=30, day_of_month=1),
+    },
+    'scan-loan-delinquency': {
+        'task': 'apps.loans.tasks.scan_loan_delinquency',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'capture-portfolio-snapshot': {
+        'task': 'apps.reporting.tasks.capture_portfolio_snapshot',
+        'schedule': crontab(hour=0, minute=45),
+    },
+    'generate-scheduled-reports': {
+        'task': 'apps.reporting.tasks.generate_scheduled_reports',
+        'schedule': crontab(minute='*/5'),
+    },
+    'relay-outbox-events': {
+        'task': 'apps.outbox.tasks.relay_outbox_events',
+        'schedule': 5.0,
+    },
+    'prune-outbox-events': {
+        'task': 'apps.outbox.tasks.prune_outbox_events',
+        'schedule': crontab(hour=2, minute=0),
+    },
+}
+
+# Reference generation
+REFERENCE_GENERATOR = 'shared.utils.reference_generator.TimeOrderedReferenceGenerator'
+# Distinct per host or container; processes on one host are told apart by pid
+REFERENCE_NODE_ID = os.environ.get('REFERENCE_NODE_ID')
 
 # Channels Configuration
 CHANNEL_LAYERS = {
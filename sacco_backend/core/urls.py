@@ -25,6 +25,7 @@ urlpatterns = [
     path('api/v1/', include('apps.loans.urls')),
     path('api/v1/', include('apps.members.urls')),
     path('api/v1/', include('apps.risk_management.urls')),
+    path('api/v1/', include('apps.transactions.urls')),
     path('api/v1/', include('apps.ledger.urls')),
     path('api/v1/', include('apps.reporting.urls')),
 ]
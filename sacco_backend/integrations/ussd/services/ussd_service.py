@@ -4,7 +4,7 @@ from typing import Tuple
 
 from apps.integrations.models import USSDSession
 from apps.loans.models import Loan
-from apps.loans.services.loan_service import LoanService
+from apps.loans.services.eligibility_service import LoanEligibilityService
 from apps.members.models import Member
 from apps.notifications.services.notification_service import NotificationService
 from apps.transactions.models import Transaction
@@ -296,7 +296,7 @@ Next Payment: {active_loan.next_payment_date}"""
         elif text == "3":
             # Apply for Loan
             # Check eligibility
-            eligible, reason = LoanService.check_eligibility(session.member)
+            eligible, reason = LoanEligibilityService.check(session.member)
             if not eligible:
                 return f"Loan application not possible: {reason}", False
 
@@ -1,11 +1,15 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 # shared/services/ledger_service.py
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 
 from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
 
-from apps.ledger.models import LedgerEntry
+from apps.ledger.models import (
+    LedgerEntry, LedgerAccountBalance, LedgerBalanceCheckpoint, LedgerPeriod, LedgerPeriodBalance
+)
 from apps.loans.models import LoanRepayment, Loan
 from apps.transactions.models import Transaction
 
@@ -16,179 +20,482 @@ class LedgerService:
         'SAVINGS': '2000',
         'FEES_INCOME': '4000',
         'LOAN_RECEIVABLE': '1100',
-        'INTEREST_INCOME': '4100'
+        'INTEREST_INCOME': '4100',
+        'PENALTY_INCOME': '4200'
     }
 
     @staticmethod
-    @transaction.atomic
+    def post_journal(lines: list[dict]) -> list[LedgerEntry]:
+        """Validate and post journal lines with a single INSERT.
+
+        Each line is a dict with `transaction`, `account_code`, `entry_type`,
+        `amount` and `description`. Lines are grouped by transaction and every
+        group must balance (total debits == total credits). Zero-amount lines are
+        skipped. `balance_after` is filled from the locked running balances.
+        """
+        entries = []
+        totals = {}
+
+        for line in lines:
+            amount = line['amount']
+            if amount < 0:
+                raise ValueError(f"Negative amount on journal line for account {line['account_code']}")
+            if amount == 0:
+                continue
+            if line['entry_type'] not in ('DEBIT', 'CREDIT'):
+                raise ValueError(f"Invalid entry type: {line['entry_type']}")
+            if line['transaction'].pk is None:
+                raise ValueError("Journal lines must reference a saved transaction")
+
+            group = totals.setdefault(line['transaction'].pk, {'DEBIT': Decimal('0'), 'CREDIT': Decimal('0')})
+            group[line['entry_type']] += amount
+            entries.append(LedgerEntry(
+                transaction=line['transaction'],
+                account_code=line['account_code'],
+                entry_type=line['entry_type'],
+                amount=amount,
+                description=line['description']
+            ))
+
+        for transaction_id, group in totals.items():
+            if group['DEBIT'] != group['CREDIT']:
+                raise ValueError(
+                    f"Unbalanced journal for transaction {transaction_id}: "
+                    f"debits {group['DEBIT']} != credits {group['CREDIT']}"
+                )
+
+        if not entries:
+            return []
+
+        # Validation happens before the atomic block so a rejected journal leaves
+        # the caller's transaction usable; no savepoint is needed for the writes.
+        with transaction.atomic(savepoint=False):
+            LedgerService._update_account_balances(entries)
+            return LedgerEntry.objects.bulk_create(entries)
+
+    @staticmethod
+    def deposit_lines(_transaction: Transaction, fee: Decimal) -> list[dict]:
+        return [
+            # Debit cash/bank account
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                'entry_type': 'DEBIT',
+                'amount': _transaction.amount,
+                'description': f"Cash deposit {_transaction.transaction_ref}"
+            },
+            # Credit member savings account
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['SAVINGS'],
+                'entry_type': 'CREDIT',
+                'amount': _transaction.amount - fee,
+                'description': f"Savings deposit {_transaction.transaction_ref}"
+            },
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['FEES_INCOME'],
+                'entry_type': 'CREDIT',
+                'amount': fee,
+                'description': f"Deposit fee {_transaction.transaction_ref}"
+            }
+        ]
+
+    @staticmethod
+    def withdrawal_lines(_transaction: Transaction, fee: Decimal) -> list[dict]:
+        return [
+            # Credit cash/bank account
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                'entry_type': 'CREDIT',
+                'amount': _transaction.amount,
+                'description': f"Cash withdrawal {_transaction.transaction_ref}"
+            },
+            # Debit member savings account
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['SAVINGS'],
+                'entry_type': 'DEBIT',
+                'amount': _transaction.amount + fee,
+                'description': f"Savings withdrawal {_transaction.transaction_ref}"
+            },
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['FEES_INCOME'],
+                'entry_type': 'CREDIT',
+                'amount': fee,
+                'description': f"Withdrawal fee {_transaction.transaction_ref}"
+            }
+        ]
+
+    @staticmethod
+    def loan_disbursement_lines(loan: 'Loan') -> list[dict]:
+        return [
+            {
+                'transaction': loan.disbursement_transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['LOAN_RECEIVABLE'],
+                'entry_type': 'DEBIT',
+                'amount': loan.amount,
+                'description': f"Loan disbursement - {loan.reference}"
+            },
+            {
+                'transaction': loan.disbursement_transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                'entry_type': 'CREDIT',
+                'amount': loan.amount,
+                'description': f"Loan disbursement - {loan.reference}"
+            }
+        ]
+
+    @staticmethod
+    def loan_repayment_lines(repayment: 'LoanRepayment') -> list[dict]:
+        return [
+            {
+                'transaction': repayment.transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                'entry_type': 'DEBIT',
+                'amount': repayment.amount,
+                'description': f"Loan repayment - {repayment.reference}"
+            },
+            {
+                'transaction': repayment.transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['LOAN_RECEIVABLE'],
+                'entry_type': 'CREDIT',
+                'amount': repayment.principal_component,
+                'description': f"Loan principal repayment - {repayment.reference}"
+            },
+            {
+                'transaction': repayment.transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['INTEREST_INCOME'],
+                'entry_type': 'CREDIT',
+                'amount': repayment.interest_component,
+                'description': f"Loan interest payment - {repayment.reference}"
+            }
+        ]
+
+    @staticmethod
+    def loan_allocation_lines(
+            _transaction: Transaction,
+            principal: Decimal,
+            interest: Decimal,
+            penalty: Decimal,
+            reference: str
+    ) -> list[dict]:
+        """Lines for a repayment split across principal, interest and penalty."""
+        return [
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['CASH'],
+                'entry_type': 'DEBIT',
+                'amount': principal + interest + penalty,
+                'description': f"Loan repayment - {reference}"
+            },
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['LOAN_RECEIVABLE'],
+                'entry_type': 'CREDIT',
+                'amount': principal,
+                'description': f"Loan principal repayment - {reference}"
+            },
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['INTEREST_INCOME'],
+                'entry_type': 'CREDIT',
+                'amount': interest,
+                'description': f"Loan interest payment - {reference}"
+            },
+            {
+                'transaction': _transaction,
+                'account_code': LedgerService.ACCOUNT_CODES['PENALTY_INCOME'],
+                'entry_type': 'CREDIT',
+                'amount': penalty,
+                'description': f"Loan penalty payment - {reference}"
+            }
+        ]
+
+    @staticmethod
     def create_deposit_entries(_transaction: Transaction, fee: Decimal) -> None:
-        # Debit cash/bank account
-        LedgerEntry.objects.create(
-            transaction=transaction,
-            account_code=LedgerService.ACCOUNT_CODES['CASH'],
-            entry_type='DEBIT',
-            amount=_transaction.amount,
-            description=f"Cash deposit {_transaction.transaction_ref}"
-        )
+        LedgerService.post_journal(LedgerService.deposit_lines(_transaction, fee))
 
-        # Credit member savings account
-        net_amount = _transaction.amount - fee
-        LedgerEntry.objects.create(
-            transaction=transaction,
-            account_code=LedgerService.ACCOUNT_CODES['SAVINGS'],
-            entry_type='CREDIT',
-            amount=net_amount,
-            description=f"Savings deposit {_transaction.transaction_ref}"
-        )
+    @staticmethod
+    def create_withdrawal_entries(_transaction: Transaction, fee: Decimal) -> None:
+        LedgerService.post_journal(LedgerService.withdrawal_lines(_transaction, fee))
 
-        if fee > 0:
-            LedgerEntry.objects.create(
-                transaction=transaction,
-                account_code=LedgerService.ACCOUNT_CODES['FEES_INCOME'],
-                entry_type='CREDIT',
-                amount=fee,
-                description=f"Deposit fee {_transaction.transaction_ref}"
+    @staticmethod
+    def create_loan_disbursement_entries(loan: 'Loan') -> None:
+        LedgerService.post_journal(LedgerService.loan_disbursement_lines(loan))
+
+    @staticmethod
+    def create_loan_repayment_entries(repayment: 'LoanRepayment') -> None:
+        LedgerService.post_journal(LedgerService.loan_repayment_lines(repayment))
+
+    @staticmethod
+    def _lock_account_balances(account_codes: Iterable[str]) -> dict:
+        """Lock the running balance rows for the given accounts, creating missing ones.
+
+        Rows are locked in account code order so concurrent postings touching the
+        same accounts cannot deadlock. A missing row is seeded once from the
+        entries already in the ledger so pre-existing history is not lost.
+        """
+        account_codes = sorted(set(account_codes))
+        locked = LedgerAccountBalance.objects.select_for_update().filter(
+            account_code__in=account_codes
+        ).order_by('account_code')
+        balances = {balance.account_code: balance for balance in locked}
+
+        missing = [code for code in account_codes if code not in balances]
+        if missing:
+            totals = LedgerService._aggregate_by_account(
+                LedgerEntry.objects.filter(account_code__in=missing)
+            )
+            LedgerAccountBalance.objects.bulk_create(
+                [
+                    LedgerAccountBalance(
+                        account_code=code,
+                        debit_total=totals.get(code, {}).get('debit_total', Decimal('0')),
+                        credit_total=totals.get(code, {}).get('credit_total', Decimal('0')),
+                        balance=totals.get(code, {}).get('net_balance', Decimal('0'))
+                    )
+                    for code in missing
+                ],
+                ignore_conflicts=True
             )
+            balances = {balance.account_code: balance for balance in locked.all()}
+
+        return balances
 
     @staticmethod
-    @transaction.atomic
-    def create_withdrawal_entries(_transaction: Transaction, fee: Decimal) -> None:
-        # Credit cash/bank account
-        LedgerEntry.objects.create(
-            transaction=_transaction,
-            account_code=LedgerService.ACCOUNT_CODES['CASH'],
-            entry_type='CREDIT',
-            amount=_transaction.amount,
-            description=f"Cash withdrawal {_transaction.transaction_ref}"
-        )
+    def _update_account_balances(entries: list[LedgerEntry]) -> None:
+        """Apply unsaved entries to the locked running balances and fill `balance_after`."""
+        balances = LedgerService._lock_account_balances(entry.account_code for entry in entries)
+        now = timezone.now()
 
-        # Debit member savings account
-        total_amount = _transaction.amount + fee
-        LedgerEntry.objects.create(
-            transaction=transaction,
-            account_code=LedgerService.ACCOUNT_CODES['SAVINGS'],
-            entry_type='DEBIT',
-            amount=total_amount,
-            description=f"Savings withdrawal {_transaction.transaction_ref}"
+        for entry in entries:
+            account = balances[entry.account_code]
+            if entry.entry_type == 'DEBIT':
+                account.debit_total += entry.amount
+                account.balance += entry.amount
+            else:
+                account.credit_total += entry.amount
+                account.balance -= entry.amount
+            account.updated_at = now
+            entry.balance_after = account.balance
+
+        LedgerAccountBalance.objects.bulk_update(
+            balances.values(),
+            ['debit_total', 'credit_total', 'balance', 'updated_at']
         )
 
-        if fee > 0:
-            LedgerEntry.objects.create(
-                transaction=_transaction,
-                account_code=LedgerService.ACCOUNT_CODES['FEES_INCOME'],
-                entry_type='CREDIT',
-                amount=fee,
-                description=f"Withdrawal fee {_transaction.transaction_ref}"
+    @staticmethod
+    def _aggregate_by_account(queryset) -> dict:
+        """Sum debits and credits per account code in the database."""
+        rows = queryset.values('account_code').annotate(
+            debit_total=Sum('amount', filter=Q(entry_type='DEBIT')),
+            credit_total=Sum('amount', filter=Q(entry_type='CREDIT'))
+        ).order_by()
+
+        totals = {}
+        for row in rows:
+            debit_total = row['debit_total'] or Decimal('0')
+            credit_total = row['credit_total'] or Decimal('0')
+            totals[row['account_code']] = {
+                'debit_total': debit_total,
+                'credit_total': credit_total,
+                'net_balance': debit_total - credit_total
+            }
+        return totals
+
+    @staticmethod
+    def _as_of_boundary(as_of_date) -> datetime:
+        """Exclusive upper bound for an as-of query; a plain date covers the whole day."""
+        if isinstance(as_of_date, datetime):
+            boundary = as_of_date
+        else:
+            boundary = datetime.combine(as_of_date + timedelta(days=1), time.min)
+
+        if timezone.is_naive(boundary):
+            boundary = timezone.make_aware(boundary)
+        return boundary
+
+    @staticmethod
+    def get_account_balance(account_code: str, as_of_date: Optional[date] = None) -> Decimal:
+        """Calculate account balance as of specified date"""
+        if as_of_date is None:
+            balance = LedgerAccountBalance.objects.filter(
+                account_code=account_code
+            ).values_list('balance', flat=True).first()
+            if balance is not None:
+                return balance
+
+            totals = LedgerService._aggregate_by_account(
+                LedgerEntry.objects.filter(account_code=account_code)
             )
+            return totals.get(account_code, {}).get('net_balance', Decimal('0'))
+
+        boundary = LedgerService._as_of_boundary(as_of_date)
+        query = LedgerEntry.objects.filter(account_code=account_code, created_at__lt=boundary)
+
+        # Start from the closest checkpoint and only sum the entries posted after it
+        checkpoint = LedgerBalanceCheckpoint.objects.filter(
+            account_code=account_code,
+            as_of__lte=boundary
+        ).order_by('-as_of').first()
+
+        balance = Decimal('0')
+        if checkpoint:
+            balance = checkpoint.balance
+            query = query.filter(created_at__gte=checkpoint.as_of)
+
+        totals = LedgerService._aggregate_by_account(query)
+        return balance + totals.get(account_code, {}).get('net_balance', Decimal('0'))
 
     @staticmethod
     @transaction.atomic
-    def create_loan_disbursement_entries(loan: 'Loan') -> None:
-        LedgerEntry.objects.create(
-            transaction=loan.disbursement_transaction,
-            account_code=LedgerService.ACCOUNT_CODES['LOAN_RECEIVABLE'],
-            entry_type='DEBIT',
-            amount=loan.amount,
-            description=f"Loan disbursement - {loan.reference}"
-        )
+    def create_balance_checkpoints(as_of: Optional[datetime] = None) -> int:
+        """Snapshot cumulative balances for every account as of `as_of` (default: start of today).
+
+        Each run only aggregates the entries posted since the previous checkpoint.
+        Re-running for an existing `as_of` is a no-op.
+        """
+        if as_of is None:
+            as_of = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if LedgerBalanceCheckpoint.objects.filter(as_of=as_of).exists():
+            return 0
 
-        LedgerEntry.objects.create(
-            transaction=loan.disbursement_transaction,
-            account_code=LedgerService.ACCOUNT_CODES['CASH'],
-            entry_type='CREDIT',
-            amount=loan.amount,
-            description=f"Loan disbursement - {loan.reference}"
+        previous_as_of = LedgerBalanceCheckpoint.objects.filter(
+            as_of__lt=as_of
+        ).order_by('-as_of').values_list('as_of', flat=True).first()
+
+        checkpoints = {}
+        delta_query = LedgerEntry.objects.filter(created_at__lt=as_of)
+        if previous_as_of:
+            for checkpoint in LedgerBalanceCheckpoint.objects.filter(as_of=previous_as_of):
+                checkpoints[checkpoint.account_code] = LedgerBalanceCheckpoint(
+                    account_code=checkpoint.account_code,
+                    as_of=as_of,
+                    debit_total=checkpoint.debit_total,
+                    credit_total=checkpoint.credit_total,
+                    balance=checkpoint.balance
+                )
+            delta_query = delta_query.filter(created_at__gte=previous_as_of)
+
+        for account_code, totals in LedgerService._aggregate_by_account(delta_query).items():
+            checkpoint = checkpoints.setdefault(account_code, LedgerBalanceCheckpoint(
+                account_code=account_code,
+                as_of=as_of,
+                debit_total=Decimal('0'),
+                credit_total=Decimal('0'),
+                balance=Decimal('0')
+            ))
+            checkpoint.debit_total += totals['debit_total']
+            checkpoint.credit_total += totals['credit_total']
+            checkpoint.balance += totals['net_balance']
+
+        LedgerBalanceCheckpoint.objects.bulk_create(checkpoints.values(), ignore_conflicts=True)
+        return len(checkpoints)
+
+    @staticmethod
+    def _date_range_filter(start_date: date, end_date: date) -> Q:
+        """Entries created on any day from `start_date` to `end_date` inclusive."""
+        return Q(
+            created_at__gte=LedgerService._as_of_boundary(start_date - timedelta(days=1)),
+            created_at__lt=LedgerService._as_of_boundary(end_date)
         )
 
     @staticmethod
     @transaction.atomic
-    def create_loan_repayment_entries(repayment: 'LoanRepayment') -> None:
-        LedgerEntry.objects.create(
-            transaction=repayment.transaction,
-            account_code=LedgerService.ACCOUNT_CODES['CASH'],
-            entry_type='DEBIT',
-            amount=repayment.amount,
-            description=f"Loan repayment - {repayment.reference}"
+    def close_period(start_date: date, end_date: date, closed_by=None) -> LedgerPeriod:
+        """Freeze per-account totals for a period so later trial balances can reuse them"""
+        if start_date > end_date:
+            raise ValueError("Period start date must be before end date")
+
+        # Entries can still be posted today, and would miss the frozen totals
+        if end_date >= timezone.localdate():
+            raise ValueError("Only periods ending before today can be closed")
+
+        if LedgerPeriod.objects.filter(start_date__lte=end_date, end_date__gte=start_date).exists():
+            raise ValueError("Period overlaps an already closed period")
+
+        period = LedgerPeriod.objects.create(
+            start_date=start_date,
+            end_date=end_date,
+            closed_by=closed_by
         )
 
-        LedgerEntry.objects.bulk_create([
-            LedgerEntry(
-                transaction=repayment.transaction,
-                account_code=LedgerService.ACCOUNT_CODES['LOAN_RECEIVABLE'],
-                entry_type='CREDIT',
-                amount=repayment.principal_component,
-                description=f"Loan principal repayment - {repayment.reference}"
-            ),
-            LedgerEntry(
-                transaction=repayment.transaction,
-                account_code=LedgerService.ACCOUNT_CODES['INTEREST_INCOME'],
-                entry_type='CREDIT',
-                amount=repayment.interest_component,
-                description=f"Loan interest payment - {repayment.reference}"
+        totals = LedgerService._aggregate_by_account(
+            LedgerEntry.objects.filter(LedgerService._date_range_filter(start_date, end_date))
+        )
+        LedgerPeriodBalance.objects.bulk_create([
+            LedgerPeriodBalance(
+                period=period,
+                account_code=account_code,
+                debit_total=account_totals['debit_total'],
+                credit_total=account_totals['credit_total']
             )
+            for account_code, account_totals in totals.items()
         ])
 
-    @staticmethod
-    def get_account_balance(account_code: str, as_of_date: Optional[date] = None) -> Decimal:
-        """Calculate account balance as of specified date"""
-        query = LedgerEntry.objects.filter(account_code=account_code)
+        return period
 
-        if as_of_date:
-            query = query.filter(created_at__lte=as_of_date)
+    @staticmethod
+    def generate_trial_balance(start_date: date, end_date: date) -> dict:
+        """Generate trial balance for specified period
 
-        balance = Decimal('0')
-        for entry in query.iterator():
-            if entry.entry_type == 'DEBIT':
-                balance += entry.amount
-            else:
-                balance -= entry.amount
+        Closed periods inside the range contribute their stored totals; only the
+        days not covered by a closed period are aggregated from raw entries.
+        """
+        periods = list(LedgerPeriod.objects.filter(
+            start_date__gte=start_date,
+            end_date__lte=end_date
+        ).order_by('start_date'))
 
-        return balance
+        # Days of the range not covered by a closed period
+        gaps = Q(pk__in=[])
+        cursor = start_date
+        for period in periods:
+            if cursor < period.start_date:
+                gaps |= LedgerService._date_range_filter(cursor, period.start_date - timedelta(days=1))
+            cursor = period.end_date + timedelta(days=1)
+        if cursor <= end_date:
+            gaps |= LedgerService._date_range_filter(cursor, end_date)
 
-    @staticmethod
-    def generate_trial_balance(start_date: date, end_date: date) -> dict:
-        """Generate trial balance for specified period"""
-        accounts = {}
+        accounts = LedgerService._aggregate_by_account(LedgerEntry.objects.filter(gaps))
 
-        # Get all entries within date range
-        entries = LedgerEntry.objects.filter(
-            created_at__range=[start_date, end_date]
-        ).select_related('transaction')
+        if periods:
+            closed_totals = LedgerPeriodBalance.objects.filter(period__in=periods).values(
+                'account_code'
+            ).annotate(
+                debit_sum=Sum('debit_total'),
+                credit_sum=Sum('credit_total')
+            ).order_by()
 
-        # Calculate totals for each account
-        for entry in entries:
-            if entry.account_code not in accounts:
-                accounts[entry.account_code] = {
-                    'account_name': LedgerService.ACCOUNT_CODES.get(entry.account_code, 'Unknown'),
+            for row in closed_totals:
+                account = accounts.setdefault(row['account_code'], {
                     'debit_total': Decimal('0'),
                     'credit_total': Decimal('0'),
                     'net_balance': Decimal('0')
-                }
-
-            if entry.entry_type == 'DEBIT':
-                accounts[entry.account_code]['debit_total'] += entry.amount
-                accounts[entry.account_code]['net_balance'] += entry.amount
-            else:
-                accounts[entry.account_code]['credit_total'] += entry.amount
-                accounts[entry.account_code]['net_balance'] -= entry.amount
+                })
+                account['debit_total'] += row['debit_sum']
+                account['credit_total'] += row['credit_sum']
+                account['net_balance'] += row['debit_sum'] - row['credit_sum']
 
-        # Calculate totals
-        total_debits = sum(acc['debit_total'] for acc in accounts.values())
-        total_credits = sum(acc['credit_total'] for acc in accounts.values())
-        net_balance = sum(acc['net_balance'] for acc in accounts.values())
+        account_names = {code: name for name, code in LedgerService.ACCOUNT_CODES.items()}
 
         return {
             'accounts': [
                 {
                     'account_code': code,
-                    **account_data
+                    'account_name': account_names.get(code, 'Unknown'),
+                    **accounts[code]
                 }
-                for code, account_data in accounts.items()
+                for code in sorted(accounts)
             ],
             'totals': {
-                'total_debits': total_debits,
-                'total_credits': total_credits,
-                'net_balance': net_balance
+                'total_debits': sum((acc['debit_total'] for acc in accounts.values()), Decimal('0')),
+                'total_credits': sum((acc['credit_total'] for acc in accounts.values()), Decimal('0')),
+                'net_balance': sum((acc['net_balance'] for acc in accounts.values()), Decimal('0'))
             },
             'period': {
                 'start_date': start_date,
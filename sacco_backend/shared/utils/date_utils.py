@@ -73,4 +73,11 @@ def is_valid_date(year: int, month: int, day: int) -> bool:
         return False
     if day < 1 or day > days_in_month(year, month):
         return False
-    return True
\ No newline at end of file
+    return True
+
+
+def add_months(from_date: date, months: int) -> date:
+    """Same day ``months`` later, clamped to the end of shorter months."""
+    month_index = from_date.month - 1 + months
+    year, month = from_date.year + month_index // 12, month_index % 12 + 1
+    return from_date.replace(year=year, month=month, day=min(from_date.day, days_in_month(year, month)))
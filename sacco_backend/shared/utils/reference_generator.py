@@ -0,0 +1,121 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Crockford base32: sorts the same as the integer it encodes
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+
+class ReferenceGenerator:
+    def next(self, prefix: str) -> str:
+        raise NotImplementedError
+
+
+class RandomReferenceGenerator(ReferenceGenerator):
+    """Date plus 8 random hex characters; relies on the unique index for collisions."""
+
+    def next(self, prefix: str) -> str:
+        return f"{prefix}{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:8].upper()}"
+
+
+class TimeOrderedReferenceGenerator(ReferenceGenerator):
+    """Snowflake-style references: millisecond time, node id, pid and a sequence.
+
+    The 85-bit id packs 41 bits of milliseconds since EPOCH_MS, a 10-bit
+    node id, the 22-bit process id and a 12-bit per-millisecond sequence,
+    encoded as 17 base32 characters after the UTC date. References from one
+    process are strictly increasing and cluster at the right-hand edge of
+    the index. Live processes on a host have distinct pids, so forked
+    gunicorn or Celery children sharing REFERENCE_NODE_ID cannot collide;
+    set it per host (or container), otherwise it is hashed from the host
+    name. No database round-trip is needed.
+    """
+    EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+    NODE_BITS = 10
+    PID_BITS = 22  # Linux pid_max is at most 2**22
+    SEQUENCE_BITS = 12
+    MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+    LENGTH = 17
+
+    def __init__(self, node_id=None):
+        self._configured_node_id = node_id
+        self._lock = threading.Lock()
+        self._pid = None
+        self._worker_id = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next(self, prefix: str) -> str:
+        value, ms = self.next_id()
+        day = datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc).strftime('%Y%m%d')
+        return f"{prefix}{day}{self._encode(value)}"
+
+    def next_id(self) -> tuple[int, int]:
+        """Return the next id and the millisecond timestamp it carries."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's pid and sequence state do not apply
+                self._pid = os.getpid()
+                self._worker_id = (
+                    self._resolve_node_id() << self.PID_BITS | self._pid & ((1 << self.PID_BITS) - 1)
+                )
+                self._last_ms = -1
+
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond or the clock stepped back: stay monotonic
+                self._sequence += 1
+                if self._sequence > self.MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+
+            value = (
+                (self._last_ms - self.EPOCH_MS) << (self.NODE_BITS + self.PID_BITS + self.SEQUENCE_BITS)
+                | self._worker_id << self.SEQUENCE_BITS
+                | self._sequence
+            )
+            return value, self._last_ms
+
+    def _resolve_node_id(self) -> int:
+        node_id = self._configured_node_id
+        if node_id is None:
+            node_id = getattr(settings, 'REFERENCE_NODE_ID', None)
+        if node_id is None:
+            seed = socket.gethostname().encode()
+            node_id = int.from_bytes(hashlib.blake2b(seed, digest_size=2).digest(), 'big')
+        return int(node_id) & ((1 << self.NODE_BITS) - 1)
+
+    @staticmethod
+    def _encode(value: int) -> str:
+        chars = []
+        for _ in range(TimeOrderedReferenceGenerator.LENGTH):
+            value, remainder = divmod(value, 32)
+            chars.append(_ALPHABET[remainder])
+        return ''.join(reversed(chars))
+
+
+_generators: dict[str, ReferenceGenerator] = {}
+_generators_lock = threading.Lock()
+
+
+def get_reference_generator() -> ReferenceGenerator:
+    """Return the generator named by settings.REFERENCE_GENERATOR (one per process)."""
+    path = getattr(
+        settings,
+        'REFERENCE_GENERATOR',
+        'shared.utils.reference_generator.TimeOrderedReferenceGenerator'
+    )
+    with _generators_lock:
+        if path not in _generators:
+            _generators[path] = import_string(path)()
+        return _generators[path]
@@ -0,0 +1,91 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.savings.models import InterestRate, SavingsAccount
+from apps.savings.services.account_service import SavingsAccountService
+from apps.savings.services.rate_table import InterestRateTable
+
+User = get_user_model()
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'Set RUN_BENCHMARKS=1 to run benchmarks')
+class AccountOpeningBenchmark(TransactionTestCase):
+    """Concurrent account openings drawing numbers from the shared sequence.
+
+    Run with: RUN_BENCHMARKS=1 python manage.py test tests.benchmarks
+    BENCHMARK_ROWS controls the number of accounts and BENCHMARK_WORKERS the
+    number of threads. SQLite serialises writers, so run it against
+    PostgreSQL to measure contention on the sequence row.
+    """
+    ROWS = int(os.environ.get('BENCHMARK_ROWS', 2000))
+    WORKERS = int(os.environ.get('BENCHMARK_WORKERS', 8))
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='opening@example.com',
+            password='testpass123',
+            first_name='Opening',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000112',
+            national_id='OPENING1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024OPENING',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Clerk',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='OPENING1',
+            membership_number='SACCOM2024OPENING',
+            membership_type='INDIVIDUAL'
+        )
+        InterestRate.objects.create(
+            account_type='REGULAR', minimum_balance=Decimal('0'), rate=Decimal('3.00'), effective_date=date(2024, 1, 1)
+        )
+        self.addCleanup(InterestRateTable.invalidate)
+
+    def _open(self, count):
+        opened = 0
+        try:
+            while opened < count:
+                try:
+                    SavingsAccountService.open_account(self.member.id, 'REGULAR', Decimal('1000'))
+                except OperationalError:
+                    # SQLite reports a busy writer rather than waiting on the row lock
+                    time.sleep(0.001)
+                    continue
+                opened += 1
+        finally:
+            connection.close()
+        return opened
+
+    def test_concurrent_openings(self):
+        per_worker = self.ROWS // self.WORKERS
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.WORKERS) as pool:
+            opened = sum(pool.map(self._open, [per_worker] * self.WORKERS))
+        elapsed = time.perf_counter() - started
+
+        numbers = list(SavingsAccount.objects.values_list('account_number', flat=True))
+        self.assertEqual(len(numbers), opened)
+        self.assertEqual(len(set(numbers)), opened)
+        print(
+            f"\nAccount openings: {opened} across {self.WORKERS} threads in {elapsed:.2f}s "
+            f"({opened / elapsed:,.0f} openings/s)"
+        )
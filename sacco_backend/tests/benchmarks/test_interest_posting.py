@@ -0,0 +1,89 @@
+import os
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.savings.models import SavingsAccount, SavingsTransaction
+from apps.savings.services.interest_posting import InterestPostingService
+
+User = get_user_model()
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'Set RUN_BENCHMARKS=1 to run benchmarks')
+class InterestPostingBenchmark(TestCase):
+    """Throughput of a monthly interest run.
+
+    Run with: RUN_BENCHMARKS=1 python manage.py test tests.benchmarks
+    BENCHMARK_ROWS controls the number of savings accounts.
+    """
+    ROWS = int(os.environ.get('BENCHMARK_ROWS', 20000))
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='interest@example.com',
+            password='testpass123',
+            first_name='Interest',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000111',
+            national_id='INTEREST1'
+        )
+        member = Member.objects.create(
+            user=user,
+            member_number='M2024INTEREST',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Clerk',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='INTEREST1',
+            membership_number='SACCOM2024INTEREST',
+            membership_type='INDIVIDUAL'
+        )
+        SavingsAccount.objects.bulk_create(
+            [
+                SavingsAccount(
+                    member=member,
+                    account_number=f'SAVBENCH{n:08d}',
+                    account_type='REGULAR',
+                    balance=Decimal('150000.00'),
+                    interest_rate=Decimal('6.00'),
+                    minimum_balance=Decimal('0.00'),
+                    status='ACTIVE'
+                )
+                for n in range(self.ROWS)
+            ],
+            batch_size=5000
+        )
+        SavingsTransaction.objects.bulk_create(
+            [
+                SavingsTransaction(
+                    account_id=account_id,
+                    transaction_type='DEPOSIT',
+                    amount=Decimal('150000.00'),
+                    balance_after=Decimal('150000.00'),
+                    reference=f'INITBENCH{account_id}'
+                )
+                for account_id in SavingsAccount.objects.values_list('id', flat=True)
+            ],
+            batch_size=5000
+        )
+        SavingsTransaction.objects.update(date=timezone.make_aware(datetime(2024, 4, 15)))
+
+    def test_post_period(self):
+        started = time.perf_counter()
+        result = InterestPostingService.post_period(date(2024, 5, 31))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result['transactions'], self.ROWS)
+        print(f"\nInterest posting: {self.ROWS} accounts in {elapsed:.2f}s ({self.ROWS / elapsed:,.0f} accounts/s)")
@@ -0,0 +1,78 @@
+import os
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.transactions.models import Transaction
+from shared.utils.reference_generator import RandomReferenceGenerator, TimeOrderedReferenceGenerator
+
+User = get_user_model()
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'Set RUN_BENCHMARKS=1 to run benchmarks')
+class ReferenceInsertBenchmark(TestCase):
+    """Insert throughput on Transaction for random vs time-ordered references.
+
+    Run with: RUN_BENCHMARKS=1 python manage.py test tests.benchmarks
+    BENCHMARK_ROWS controls the rows inserted per scheme.
+    """
+    ROWS = int(os.environ.get('BENCHMARK_ROWS', 20000))
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='bench@example.com',
+            password='testpass123',
+            first_name='Bench',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000030',
+            national_id='BENCH1'
+        )
+        self.member = Member.objects.create(
+            user=user,
+            member_number='M2024BENCH',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Engineer',
+            monthly_income=Decimal('700000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='BENCH1',
+            membership_number='SACCOM2024BENCH',
+            membership_type='INDIVIDUAL'
+        )
+
+    def _insert(self, generator, prefix):
+        started = time.perf_counter()
+        with transaction.atomic():
+            for _ in range(self.ROWS):
+                Transaction.objects.create(
+                    transaction_ref=generator.next(prefix),
+                    member_id=self.member.id,
+                    transaction_type='DEPOSIT',
+                    amount=Decimal('1000'),
+                    payment_method='CASH',
+                    status='COMPLETED'
+                )
+        return self.ROWS / (time.perf_counter() - started)
+
+    def test_insert_throughput(self):
+        # Same prefix length for both schemes so only the suffix ordering differs
+        random_rate = self._insert(RandomReferenceGenerator(), 'RND')
+        ordered_rate = self._insert(TimeOrderedReferenceGenerator(node_id=1), 'ORD')
+
+        print(
+            f"\nTransaction inserts ({self.ROWS} rows each): "
+            f"random {random_rate:,.0f}/s, time-ordered {ordered_rate:,.0f}/s "
+            f"({ordered_rate / random_rate:.2f}x)"
+        )
+        self.assertEqual(Transaction.objects.count(), 2 * self.ROWS)
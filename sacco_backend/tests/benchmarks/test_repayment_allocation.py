@@ -0,0 +1,93 @@
+import os
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.loans.models import Loan, LoanRepayment
+from apps.loans.services.loan_service import LoanService
+from apps.loans.services.repayment_service import RepaymentService
+from apps.members.models import Member
+
+User = get_user_model()
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'Set RUN_BENCHMARKS=1 to run benchmarks')
+class PayrollRepaymentBenchmark(TestCase):
+    """Throughput of RepaymentService.process_repayments on a payroll file.
+
+    Run with: RUN_BENCHMARKS=1 python manage.py test tests.benchmarks
+    BENCHMARK_ROWS controls the number of repayments (two per loan).
+    """
+    ROWS = int(os.environ.get('BENCHMARK_ROWS', 20000))
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='payroll@example.com',
+            password='testpass123',
+            first_name='Payroll',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000070',
+            national_id='PAYROLL1'
+        )
+        member = Member.objects.create(
+            user=user,
+            member_number='M2024PAYROLL',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Teacher',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='PAYROLL1',
+            membership_number='SACCOM2024PAYROLL',
+            membership_type='INDIVIDUAL'
+        )
+
+        now = timezone.now()
+        loans = Loan.objects.bulk_create([
+            Loan(
+                reference=f'LN2024PR{n:06d}',
+                member=member,
+                loan_type='PAYROLL',
+                amount=Decimal('1200000'),
+                interest_rate=Decimal('15.00'),
+                term_months=12,
+                status='DISBURSED',
+                disbursement_date=now,
+                total_amount_payable=Decimal('0'),
+                total_interest=Decimal('0'),
+                outstanding_balance=Decimal('0')
+            )
+            for n in range(self.ROWS // 2)
+        ])
+        repayments = [repayment for loan in loans for repayment in LoanService.build_repayments(loan)]
+        Loan.objects.bulk_update(loans, ['total_interest', 'total_amount_payable', 'outstanding_balance', 'next_payment_date'])
+        LoanRepayment.objects.bulk_create(repayments, batch_size=5000)
+
+        self.items = [
+            {'loan_id': loan.id, 'amount': Decimal('75000'), 'payment_reference': f'PR-{loan.id}-{n}'}
+            for loan in loans for n in range(2)
+        ]
+
+    def test_payroll_file_throughput(self):
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            results = RepaymentService.process_repayments(self.items)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\nPayroll repayments: {len(self.items)} in {elapsed:.2f}s "
+            f"({len(self.items) / elapsed:,.0f}/s, {len(queries.captured_queries)} queries)"
+        )
+        self.assertTrue(all(result['status'] == 'COMPLETED' for result in results))
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.authentication.models import Role
+from apps.members.models import Member
+from apps.reporting.services.report_exporter import ReportExporter
+from apps.reporting.services.report_generator import ReportGenerator
+from apps.transactions.models import Transaction
+
+User = get_user_model()
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'Set RUN_BENCHMARKS=1 to run benchmarks')
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportExportBenchmark(TestCase):
+    """Time and peak Python memory of a transaction detail export per format.
+
+    Run with: RUN_BENCHMARKS=1 python manage.py test tests.benchmarks
+    BENCHMARK_ROWS controls the number of transactions exported.
+    """
+    ROWS = int(os.environ.get('BENCHMARK_ROWS', 20000))
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='export@example.com',
+            password='testpass123',
+            first_name='Export',
+            last_name='Member',
+            role=Role.objects.create(name='MEMBER'),
+            phone_number='+256700000092',
+            national_id='EXPORT1'
+        )
+        member = Member.objects.create(
+            user=user,
+            member_number='M2024EXPORT',
+            date_of_birth=date(1990, 1, 1),
+            marital_status='SINGLE',
+            employment_status='EMPLOYED',
+            occupation='Clerk',
+            monthly_income=Decimal('900000'),
+            physical_address='Test Address',
+            city='Kampala',
+            district='Central',
+            national_id='EXPORT1',
+            membership_number='SACCOM2024EXPORT',
+            membership_type='INDIVIDUAL'
+        )
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    transaction_ref=f'TXNEXPORT{n:08d}',
+                    member=member,
+                    transaction_type='DEPOSIT',
+                    amount=Decimal('1500.00'),
+                    payment_method='CASH',
+                    status='COMPLETED'
+                )
+                for n in range(self.ROWS)
+            ],
+            batch_size=5000
+        )
+        self.today = timezone.localdate()
+
+    def test_export_memory_is_flat(self):
+        for export_format in ReportExporter.FORMATS:
+            section = ReportExporter.queryset_section(
+                'Transactions',
+                ReportGenerator.transaction_detail(self.today, self.today),
+                ReportGenerator.TRANSACTION_DETAIL_FIELDS
+            )
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            ReportExporter.export([section], f'bench.{export_format.lower()}', export_format)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"\n{export_format} export: {self.ROWS} rows in {elapsed:.2f}s "
+                f"({self.ROWS / elapsed:,.0f} rows/s, peak {peak / 1024 / 1024:.1f} MiB)"
+            )